@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Rollup backfill script for StudyFun Backend
+Rebuilds the derived score tables (user_game_best, user_stats) from the full scores history.
+Run it once after upgrading an existing database, or any time the rollups drift.
+"""
+
+from datetime import datetime
+from flask import Flask
+from database import db, configure_database
+from config.config import get_config
+
+# Create Flask app instance
+app = Flask(__name__)
+app.config.from_object(get_config())
+
+# Initialize database
+configure_database(app)
+
+# Import all models
+from models.user import User
+from models.class_model import Class
+from models.subject import Subject
+from models.game import Game
+from models.score import Score
+from models.user_game_best import UserGameBest
+from models.user_stats import UserStats
+
+BATCH_SIZE = 1000
+
+def backfill_user_game_best():
+    """Rebuild user_game_best with a single INSERT ... SELECT over the scores table"""
+    partition = (Score.user_id, Score.game_id)
+    ranked = db.select(
+        Score.id,
+        Score.user_id,
+        Score.game_id,
+        Score.score,
+        Score.percentage,
+        Score.created_at,
+        db.func.row_number().over(
+            partition_by=partition,
+            order_by=(Score.percentage.desc(), Score.created_at.asc(), Score.id.asc())
+        ).label('position'),
+        db.func.count(Score.id).over(partition_by=partition).label('attempts'),
+        db.func.max(Score.created_at).over(partition_by=partition).label('last_played')
+    ).subquery()
+
+    best_rows = db.select(
+        ranked.c.user_id,
+        ranked.c.game_id,
+        ranked.c.id,
+        ranked.c.score,
+        ranked.c.percentage,
+        ranked.c.created_at,
+        ranked.c.attempts,
+        ranked.c.last_played
+    ).where(ranked.c.position == 1)
+
+    table = UserGameBest.__table__
+    db.session.execute(table.delete())
+    db.session.execute(table.insert().from_select(
+        ['user_id', 'game_id', 'best_score_id', 'best_score', 'best_percentage',
+         'best_achieved_at', 'attempts', 'last_played'],
+        best_rows
+    ))
+    db.session.commit()
+
+    count = db.session.query(db.func.count()).select_from(table).scalar()
+    print(f"✓ user_game_best rebuilt ({count} rows)")
+
+def backfill_user_stats():
+    """Rebuild user_stats from three grouped queries and bulk inserts"""
+    totals = db.session.query(
+        Score.user_id,
+        db.func.count(Score.id),
+        db.func.coalesce(db.func.sum(Score.score), 0),
+        db.func.coalesce(db.func.sum(Score.percentage), 0.0)
+    ).group_by(Score.user_id)
+
+    # Same tie-break as user_game_best: highest percentage, then earliest
+    ranked = db.select(
+        Score.user_id,
+        Score.id,
+        Score.percentage,
+        db.func.row_number().over(
+            partition_by=Score.user_id,
+            order_by=(Score.percentage.desc(), Score.created_at.asc(), Score.id.asc())
+        ).label('position')
+    ).subquery()
+    bests = {
+        user_id: (score_id, percentage)
+        for user_id, score_id, percentage in db.session.execute(
+            db.select(ranked.c.user_id, ranked.c.id, ranked.c.percentage).where(ranked.c.position == 1)
+        )
+    }
+
+    by_subject = {}
+    subject_counts = db.session.query(Score.user_id, Game.subject_id, db.func.count(Score.id)) \
+        .join(Game, Game.id == Score.game_id).group_by(Score.user_id, Game.subject_id)
+    for user_id, subject_id, count in subject_counts:
+        by_subject.setdefault(user_id, {})[str(subject_id)] = count
+
+    now = datetime.utcnow()
+    rows = []
+    for user_id, games_played, total_score, percentage_sum in totals:
+        best_score_id, best_percentage = bests.get(user_id, (None, 0.0))
+        rows.append({
+            'user_id': user_id,
+            'total_games_played': games_played,
+            'total_score': int(total_score),
+            'percentage_sum': float(percentage_sum),
+            'best_score_id': best_score_id,
+            'best_percentage': best_percentage,
+            'games_by_subject': by_subject.get(user_id, {}),
+            'updated_at': now
+        })
+
+    table = UserStats.__table__
+    db.session.execute(table.delete())
+    for start in range(0, len(rows), BATCH_SIZE):
+        db.session.execute(table.insert(), rows[start:start + BATCH_SIZE])
+    db.session.commit()
+
+    print(f"✓ user_stats rebuilt ({len(rows)} rows)")
+
+def backfill_all():
+    """Rebuild every score rollup table"""
+    print("🔄 Rebuilding score rollups...")
+    print("=" * 50)
+
+    with app.app_context():
+        db.create_all()
+        backfill_user_game_best()
+        backfill_user_stats()
+
+        print("=" * 50)
+        print("✅ Rollups rebuilt successfully!")
+
+if __name__ == "__main__":
+    backfill_all()
@@ -0,0 +1,64 @@
+"""
+Shared helpers for the StudyFun benchmark and check scripts
+Seeds a database created by the caller's app and counts the SQL statements
+an endpoint sends. Importing this module changes no configuration: each script
+sets DATABASE_URL and friends itself before importing the app.
+"""
+
+import random
+from datetime import datetime, timedelta
+
+from database import db
+from models.user import User
+from models.game import Game
+from models.score import Score
+from services.passwords import password_hasher
+
+class QueryCounter:
+    """Counts statements sent to the database while attached to an engine"""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        self.count += 1
+
+def seed(app, users, scores_per_user):
+    """Catalog from init_db plus `users` players with `scores_per_user` scores each"""
+    import init_db
+    import backfill_rollups
+
+    with app.app_context():
+        db.create_all()
+        init_db.init_classes()
+        init_db.init_subjects()
+        init_db.init_games()
+        init_db.create_sample_user()
+
+        password_hash = password_hasher.hash('password123')
+        now = datetime.utcnow()
+        db.session.execute(User.__table__.insert(), [{
+            'username': f'player{i}', 'password_hash': password_hash, 'full_name': f'Player {i}',
+            'email': f'player{i}@studyfun.com', 'created_at': now, 'updated_at': now,
+            'is_active': True, 'token_version': 0, 'theme_preference': 'light'
+        } for i in range(users)])
+
+        rng = random.Random(42)
+        games = [(game.id, game.max_score) for game in Game.query.all()]
+        user_ids = [user_id for (user_id,) in db.session.query(User.id)]
+        rows = []
+        for user_id in user_ids:
+            for _ in range(scores_per_user):
+                game_id, max_score = rng.choice(games)
+                score = rng.randint(0, max_score)
+                played_at = now - timedelta(minutes=rng.randint(0, 60 * 24 * 30))
+                rows.append({
+                    'user_id': user_id, 'game_id': game_id, 'score': score, 'max_score': max_score,
+                    'percentage': score / max_score * 100, 'time_taken': rng.randint(10, 300),
+                    'attempts': 1, 'is_completed': True, 'created_at': played_at, 'updated_at': played_at
+                })
+        db.session.execute(Score.__table__.insert(), rows)
+        db.session.commit()
+
+        backfill_rollups.backfill_user_game_best()
+        backfill_rollups.backfill_user_stats()
@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+Endpoint benchmark suite for StudyFun Backend
+Seeds an in-memory database and drives every blueprint route (auth, classes,
+subjects, games, scores) through the Flask test client. For each route it
+reports latency percentiles, sequential throughput and SQL queries per request.
+
+Results can be saved as a JSON baseline and later compared against it. The
+comparison flags routes that got slower than --threshold (and more than
+--min-delta-ms) at p50 or p95, or that issue more queries, and exits non-zero.
+
+Usage:
+    python benchmark_endpoints.py --save benchmark_baseline.json
+    python benchmark_endpoints.py --compare benchmark_baseline.json --threshold 0.25
+    python benchmark_endpoints.py --only scores --iterations 500
+"""
+
+import argparse
+import itertools
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime
+
+# In-memory database and inline hashing; must be set before the config is imported
+os.environ['DATABASE_URL'] = 'sqlite://'
+os.environ.setdefault('PASSWORD_HASH_WORKERS', '0')
+
+from bench_support import QueryCounter, seed
+from database import db
+from main import create_app
+from models.score import Score
+from sqlalchemy import event
+
+# Hashing a password is slow by design; these routes run fewer iterations
+AUTH_HASHING_ITERATIONS = 20
+
+def scenarios(state):
+    """(name, method, url, request kwargs factory, iterations override) for every route"""
+    auth = {'Authorization': f"Bearer {state['token']}"}
+    refresh = {'Authorization': f"Bearer {state['refresh_token']}"}
+    counter = itertools.count()
+
+    def headers(extra=None):
+        return lambda: {'headers': dict(auth, **(extra or {}))}
+
+    def body(payload_factory, with_auth=True, extra=None):
+        return lambda: {'headers': dict(auth if with_auth else {}, **(extra or {})), 'json': payload_factory()}
+
+    return [
+        # auth
+        ('auth: register', 'POST', '/api/auth/register', body(lambda: {
+            'username': f'bench{next(counter)}', 'password': 'password123'
+        }, with_auth=False), AUTH_HASHING_ITERATIONS),
+        ('auth: login', 'POST', '/api/auth/login', body(lambda: {
+            'username': 'testuser', 'password': 'password123'
+        }, with_auth=False), AUTH_HASHING_ITERATIONS),
+        ('auth: refresh', 'POST', '/api/auth/refresh', lambda: {'headers': refresh}, None),
+        ('auth: profile', 'GET', '/api/auth/profile', headers(), None),
+        ('auth: update profile', 'PUT', '/api/auth/profile', body(lambda: {
+            'theme_preference': 'dark' if next(counter) % 2 else 'light'
+        }), None),
+        # classes
+        ('classes: list', 'GET', '/api/classes/', headers(), None),
+        ('classes: get', 'GET', '/api/classes/1', headers(), None),
+        ('classes: my-class', 'GET', '/api/classes/my-class', headers(), None),
+        ('classes: select', 'POST', '/api/classes/select', body(lambda: {'class_id': 3}), None),
+        # subjects
+        ('subjects: list', 'GET', '/api/subjects/', headers(), None),
+        ('subjects: get', 'GET', '/api/subjects/1?include=games', headers(), None),
+        ('subjects: by-class', 'GET', '/api/subjects/by-class/3', headers(), None),
+        ('subjects: my-subjects', 'GET', '/api/subjects/my-subjects?include=games', headers(), None),
+        # games
+        ('games: list', 'GET', '/api/games/', headers(), None),
+        ('games: list (304)', 'GET', '/api/games/', headers({'If-None-Match': state['games_etag']}), None),
+        ('games: get', 'GET', '/api/games/1', headers(), None),
+        ('games: by-subject', 'GET', '/api/games/by-subject/1', headers(), None),
+        ('games: math-games', 'GET', '/api/games/math-games', headers(), None),
+        ('games: lookup', 'GET', '/api/games/lookup?name=Addition', headers(), None),
+        ('games: my-progress', 'GET', '/api/games/my-progress', headers(), None),
+        ('games: start', 'POST', '/api/games/start/1', headers(), None),
+        # scores
+        ('scores: submit', 'POST', '/api/scores/', body(lambda: {
+            'game_id': 1 + next(counter) % 4, 'score': 50, 'time_taken': 60
+        }), None),
+        ('scores: submit (replay)', 'POST', '/api/scores/', body(lambda: {'game_id': 1, 'score': 70},
+                                                                 extra={'Idempotency-Key': 'bench-replay'}), None),
+        ('scores: batch x20', 'POST', '/api/scores/batch', body(lambda: {
+            'scores': [{'game_id': 1 + i % 4, 'score': i, 'time_taken': 30} for i in range(20)]
+        }), None),
+        ('scores: my-scores', 'GET', '/api/scores/my-scores?limit=50', headers(), None),
+        ('scores: leaderboard', 'GET', '/api/scores/leaderboard?limit=50', headers(), None),
+        ('scores: game leaderboard', 'GET', '/api/scores/leaderboard?game_id=1&limit=50', headers(), None),
+        ('scores: rank', 'GET', '/api/scores/rank?game_id=1', headers(), None),
+        ('scores: stats', 'GET', '/api/scores/stats', headers(), None),
+        ('scores: get', 'GET', f"/api/scores/{state['score_id']}", headers(), None),
+        ('scores: export', 'GET', '/api/scores/export', headers(), None),
+    ] + ([
+        # Only when the player has more than one page of history (see main)
+        ('scores: my-scores page 2', 'GET', f"/api/scores/my-scores?limit=10&cursor={state['my_scores_cursor']}",
+         headers(), None),
+    ] if state['my_scores_cursor'] else [])
+
+def prepare(app):
+    """Tokens and ids the scenarios need"""
+    client = app.test_client()
+    tokens = client.post('/api/auth/login', json={
+        'username': 'testuser', 'password': 'password123'
+    }).get_json()['data']
+    auth = {'Authorization': f"Bearer {tokens['access_token']}"}
+    with app.app_context():
+        score_id = db.session.query(Score.id).filter(Score.user_id == tokens['user']['id']).first()[0]
+    return {
+        'token': tokens['access_token'],
+        'refresh_token': tokens['refresh_token'],
+        'score_id': score_id,
+        'games_etag': client.get('/api/games/', headers=auth).headers['ETag'],
+        'my_scores_cursor': client.get('/api/scores/my-scores?limit=10', headers=auth).get_json()['data']['next_cursor']
+    }
+
+def percentile(ordered, fraction):
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+def measure(app, counter, method, url, make_kwargs, iterations, warmup):
+    """Latency samples, queries per request and statuses for one route"""
+    client = app.test_client()
+    samples = []
+    queries = []
+    statuses = set()
+    for i in range(warmup + iterations):
+        kwargs = make_kwargs()
+        counter.count = 0
+        started = time.perf_counter()
+        response = client.open(url, method=method, **kwargs)
+        response.get_data()  # drain streamed bodies
+        elapsed = time.perf_counter() - started
+        if i >= warmup:
+            samples.append(elapsed)
+            queries.append(counter.count)
+            statuses.add(response.status_code)
+    samples.sort()
+    return {
+        'iterations': iterations,
+        'p50_ms': percentile(samples, 0.50) * 1000,
+        'p95_ms': percentile(samples, 0.95) * 1000,
+        'p99_ms': percentile(samples, 0.99) * 1000,
+        'mean_ms': statistics.fmean(samples) * 1000,
+        'throughput_rps': iterations / sum(samples),
+        'queries': statistics.fmean(queries),
+        'statuses': sorted(statuses)
+    }
+
+def compare(results, baseline, threshold, min_delta_ms):
+    """Regression messages for results against a saved baseline"""
+    regressions = []
+    for name, result in results.items():
+        before = baseline.get('results', {}).get(name)
+        if not before:
+            continue
+        for metric in ('p50_ms', 'p95_ms'):
+            delta = result[metric] - before[metric]
+            if delta > min_delta_ms and delta > before[metric] * threshold:
+                regressions.append(f"{name}: {metric} {before[metric]:.2f} -> {result[metric]:.2f} "
+                                   f"(+{delta / before[metric] * 100:.0f}%)")
+        # Averages: an occasional background query (e.g. a purge) is not a regression
+        if result['queries'] - before['queries'] >= 0.5:
+            regressions.append(f"{name}: queries {before['queries']:.2f} -> {result['queries']:.2f}")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark every API route against a seeded in-memory database')
+    parser.add_argument('--users', type=int, default=300)
+    parser.add_argument('--scores-per-user', type=int, default=20)
+    parser.add_argument('--iterations', type=int, default=200, help='Timed requests per route')
+    parser.add_argument('--warmup', type=int, default=5, help='Untimed requests per route')
+    parser.add_argument('--only', default=None, help='Run routes whose name starts with this (e.g. scores)')
+    parser.add_argument('--save', metavar='PATH', help='Write the results as a JSON baseline')
+    parser.add_argument('--compare', metavar='PATH', help='Compare against a JSON baseline')
+    parser.add_argument('--threshold', type=float, default=0.25, help='Allowed relative slowdown (0.25 = 25%%)')
+    parser.add_argument('--min-delta-ms', type=float, default=0.5, help='Ignore slowdowns smaller than this')
+    args = parser.parse_args()
+
+    app = create_app()
+    print('⏱️  StudyFun Endpoint Benchmark')
+    print('=' * 104)
+    print(f'Seeding {args.users} users x {args.scores_per_user} scores...')
+    seed(app, args.users, args.scores_per_user)
+    state = prepare(app)
+    if not state['my_scores_cursor']:
+        print('⚠️  testuser has a single page of scores; skipping "scores: my-scores page 2" '
+              '(raise --scores-per-user above 10)')
+
+    counter = QueryCounter()
+    with app.app_context():
+        event.listen(db.engine, 'before_cursor_execute', counter)
+
+    plan = [entry for entry in scenarios(state) if not args.only or entry[0].startswith(args.only)]
+    covered = {(method, app.url_map.bind('localhost').match(url.split('?')[0], method=method)[0])
+               for _, method, url, _, _ in plan}
+
+    print('=' * 104)
+    print(f"{'route':28} {'p50':>9} {'p95':>9} {'p99':>9} {'req/s':>9} {'queries':>8}  status")
+    results = {}
+    for name, method, url, make_kwargs, iterations in plan:
+        result = measure(app, counter, method, url, make_kwargs, iterations or args.iterations, args.warmup)
+        results[name] = result
+        print(f"{name:28} {result['p50_ms']:>7.2f}ms {result['p95_ms']:>7.2f}ms {result['p99_ms']:>7.2f}ms "
+              f"{result['throughput_rps']:>9.0f} {result['queries']:>8.1f}  {result['statuses']}")
+    print('=' * 104)
+
+    failing = [name for name, result in results.items() if any(status >= 400 for status in result['statuses'])]
+    if failing:
+        print(f"⚠️  Routes answering with errors (their timings are not meaningful): {', '.join(failing)}")
+
+    if not args.only:
+        missing = sorted(rule.endpoint for rule in app.url_map.iter_rules()
+                         if rule.endpoint.split('.')[0] in ('auth', 'classes', 'subjects', 'games', 'scores')
+                         and not any(endpoint == rule.endpoint for _, endpoint in covered))
+        if missing:
+            print(f"⚠️  Routes without a benchmark: {', '.join(missing)}")
+
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as handle:
+            json.dump({
+                'created_at': datetime.utcnow().isoformat(),
+                'python': platform.python_version(),
+                'machine': platform.machine(),
+                'parameters': {'users': args.users, 'scores_per_user': args.scores_per_user,
+                               'iterations': args.iterations},
+                'results': results
+            }, handle, indent=2)
+        print(f'💾 Baseline written to {args.save}')
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as handle:
+            baseline = json.load(handle)
+        regressions = compare(results, baseline, args.threshold, args.min_delta_ms)
+        if regressions:
+            print(f'❌ {len(regressions)} regressions against {args.compare}:')
+            for regression in regressions:
+                print(f'   {regression}')
+            return 1
+        print(f'✅ No regressions against {args.compare}')
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Score ingestion throughput benchmark for StudyFun Backend
+Submits scores from many threads through the Flask test client against a
+SQLite file database, once per ingestion mode: a commit per request
+('direct'), group commit acknowledged after the flush ('buffered/flush'), and
+group commit acknowledged from the fsynced log ('buffered/log').
+
+Each mode runs twice: once with a warm user cache, and once with a cold one
+(USER_CACHE_TTL=0) and an Idempotency-Key on every request. Both keep a
+database transaction open in the request before the score is handed to the
+flusher. Every acknowledged (2xx) submission must end up stored, so 'stored'
+should equal the 2xx count on every line. A request answered with an error
+(under heavy direct-mode contention a writer can outwait busy_timeout) is not
+a loss: the client was told and keeps the score to retry.
+
+Usage:
+    python benchmark_ingest.py --threads 16 --per-thread 100
+    STUDYFUN_ENV=production python benchmark_ingest.py   # WAL + synchronous=NORMAL
+"""
+
+import argparse
+import os
+import statistics
+import tempfile
+import threading
+import time
+
+# Throwaway database and log directory; must be set before the config is imported
+WORKDIR = tempfile.mkdtemp(prefix='studyfun-ingest-')
+os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(WORKDIR, 'bench.db')
+os.environ['SCORE_INGEST_LOG_DIR'] = os.path.join(WORKDIR, 'ingest_log')
+os.environ.setdefault('PASSWORD_HASH_WORKERS', '0')
+# Writers queueing for the lock would flood the output as slow queries
+os.environ.setdefault('SLOW_QUERY_MS', '0')
+
+from database import db
+from main import create_app
+from models.score import Score
+from services.score_ingest import score_ingestor
+
+MODES = [
+    ('direct', 'direct', 'flush'),
+    ('buffered/flush', 'buffered', 'flush'),
+    ('buffered/log', 'buffered', 'log'),
+]
+
+# (label, keyed requests with a cold user cache)
+SCENARIOS = [
+    ('', False),
+    ('+keys,cold', True),
+]
+
+def setup(app):
+    import init_db
+
+    with app.app_context():
+        db.create_all()
+        init_db.init_classes()
+        init_db.init_subjects()
+        init_db.init_games()
+        init_db.create_sample_user()
+
+    return app.test_client().post('/api/auth/login', json={
+        'username': 'testuser', 'password': 'password123'
+    }).get_json()['data']['access_token']
+
+def run(app, token, threads, per_thread, key_prefix=None):
+    """(seconds, per-request latencies, status counts) for threads x per_thread submissions"""
+    auth = {'Authorization': f'Bearer {token}'}
+    barrier = threading.Barrier(threads + 1)
+    latencies = []
+    statuses = {}
+    lock = threading.Lock()
+
+    def worker(index):
+        client = app.test_client()
+        mine = []
+        codes = []
+        barrier.wait()
+        for i in range(per_thread):
+            headers = dict(auth, **{'Idempotency-Key': f'{key_prefix}-{index}-{i}'}) if key_prefix else auth
+            started = time.perf_counter()
+            response = client.post('/api/scores/', headers=headers,
+                                   json={'game_id': 1 + (index + i) % 4, 'score': i % 100, 'time_taken': 30})
+            mine.append(time.perf_counter() - started)
+            codes.append(response.status_code)
+        with lock:
+            latencies.extend(mine)
+            for code in codes:
+                statuses[code] = statuses.get(code, 0) + 1
+
+    workers = [threading.Thread(target=worker, args=(index,)) for index in range(threads)]
+    for thread in workers:
+        thread.start()
+    barrier.wait()
+    started = time.perf_counter()
+    for thread in workers:
+        thread.join()
+    # Buffered modes are only done once the last group is committed
+    score_ingestor.shutdown()
+    return time.perf_counter() - started, latencies, statuses
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare per-request commits with group-committed score ingestion')
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--per-thread', type=int, default=100)
+    parser.add_argument('--flush-ms', type=int, default=None, help='Override SCORE_INGEST_FLUSH_MS')
+    parser.add_argument('--batch-size', type=int, default=None, help='Override SCORE_INGEST_BATCH_SIZE')
+    args = parser.parse_args()
+
+    app = create_app()
+    if args.flush_ms is not None:
+        app.config['SCORE_INGEST_FLUSH_MS'] = args.flush_ms
+    if args.batch_size is not None:
+        app.config['SCORE_INGEST_BATCH_SIZE'] = args.batch_size
+    token = setup(app)
+    total = args.threads * args.per_thread
+
+    print('⏱️  StudyFun Score Ingestion Benchmark')
+    print('=' * 78)
+    print(f"{args.threads} threads x {args.per_thread} scores, database in {WORKDIR}")
+    print(f"{'mode':26} {'scores/s':>10} {'p50':>9} {'p99':>9} {'stored':>8}  statuses")
+
+    cache_ttl = app.config.get('USER_CACHE_TTL', 60.0)
+    lost = []
+    for label, mode, durability in MODES:
+        for suffix, keyed in SCENARIOS:
+            app.config['SCORE_INGEST_MODE'] = mode
+            app.config['SCORE_INGEST_DURABILITY'] = durability
+            app.config['USER_CACHE_TTL'] = 0 if keyed else cache_ttl
+            with app.app_context():
+                before = Score.query.count()
+            seconds, latencies, statuses = run(app, token, args.threads, args.per_thread,
+                                               f'{label}{suffix}' if keyed else None)
+            with app.app_context():
+                stored = Score.query.count() - before
+            acknowledged = sum(count for code, count in statuses.items() if 200 <= code < 300)
+            if stored != acknowledged:
+                lost.append(label + suffix)
+            latencies.sort()
+            p50 = statistics.median(latencies) * 1000
+            p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000
+            print(f"{label + suffix:26} {total / seconds:>10.0f} {p50:>7.2f}ms {p99:>7.2f}ms {stored:>8}  {statuses}")
+
+    print('=' * 78)
+    if lost:
+        print(f"❌ Stored scores differ from acknowledged ones after: {', '.join(lost)}")
+        return 1
+    return 0
+
+if __name__ == '__main__':
+    raise SystemExit(main())
\ No newline at end of file
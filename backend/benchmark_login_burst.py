@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Login burst benchmark for StudyFun Backend
+Fires a burst of simultaneous logins at a running server (a class of students
+signing in at once) while one client keeps submitting scores. Reports
+p50/p99 latency for both, so a regression in how logins starve other
+endpoints shows up as numbers.
+
+Usage:
+    python init_db.py && python main.py          # in another terminal
+    python benchmark_login_burst.py --logins 40 --rounds 3
+"""
+
+import argparse
+import json
+import statistics
+import threading
+import time
+import urllib.error
+import urllib.request
+
+def post_json(url, payload, token=None):
+    """POST a JSON body; returns (status code, seconds taken)"""
+    headers = {'Content-Type': 'application/json'}
+    if token:
+        headers['Authorization'] = f'Bearer {token}'
+    request = urllib.request.Request(url, data=json.dumps(payload).encode('utf-8'), headers=headers)
+    started = time.perf_counter()
+    try:
+        with urllib.request.urlopen(request, timeout=60) as response:
+            response.read()
+            status = response.status
+    except urllib.error.HTTPError as e:
+        status = e.code
+    except urllib.error.URLError:
+        status = 0
+    return status, time.perf_counter() - started
+
+def percentile(samples, pct):
+    """Nearest-rank percentile of a list of seconds"""
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100.0 * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+def report(name, samples, statuses):
+    ok = sum(1 for status in statuses if 200 <= status < 300)
+    if not samples:
+        print(f"   {name}: no requests")
+        return
+    print(f"   {name}: {len(samples)} requests, {ok} ok, "
+          f"p50 {percentile(samples, 50) * 1000:.0f} ms, "
+          f"p99 {percentile(samples, 99) * 1000:.0f} ms, "
+          f"max {max(samples) * 1000:.0f} ms, "
+          f"mean {statistics.mean(samples) * 1000:.0f} ms")
+    failures = sorted({status for status in statuses if not 200 <= status < 300})
+    if failures:
+        print(f"      non-2xx statuses: {failures}")
+
+def run_burst(base_url, username, password, logins, token, game_id):
+    """One burst: `logins` threads released together, plus a score submitter until they finish"""
+    barrier = threading.Barrier(logins + 1)
+    login_samples, login_statuses = [], []
+    score_samples, score_statuses = [], []
+    lock = threading.Lock()
+    done = threading.Event()
+
+    def login():
+        barrier.wait()
+        status, seconds = post_json(f'{base_url}/api/auth/login', {'username': username, 'password': password})
+        with lock:
+            login_samples.append(seconds)
+            login_statuses.append(status)
+
+    def submit_scores():
+        barrier.wait()
+        while not done.is_set():
+            status, seconds = post_json(f'{base_url}/api/scores/', {'game_id': game_id, 'score': 50}, token)
+            with lock:
+                score_samples.append(seconds)
+                score_statuses.append(status)
+
+    threads = [threading.Thread(target=login) for _ in range(logins)]
+    submitter = threading.Thread(target=submit_scores)
+    for thread in threads:
+        thread.start()
+    submitter.start()
+
+    started = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    done.set()
+    submitter.join()
+
+    return elapsed, login_samples, login_statuses, score_samples, score_statuses
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark a burst of simultaneous logins')
+    parser.add_argument('--url', default='http://localhost:5000', help='Backend base URL')
+    parser.add_argument('--username', default='testuser')
+    parser.add_argument('--password', default='password123')
+    parser.add_argument('--logins', type=int, default=40, help='Simultaneous logins per burst')
+    parser.add_argument('--rounds', type=int, default=3, help='Number of bursts')
+    parser.add_argument('--game-id', type=int, default=1, help='Game used for the concurrent score submissions')
+    args = parser.parse_args()
+
+    print('🔐 StudyFun Login Burst Benchmark')
+    print('=' * 60)
+
+    # Warm-up login gives the score submitter its token and starts the hashing pool
+    request = urllib.request.Request(
+        f'{args.url}/api/auth/login',
+        data=json.dumps({'username': args.username, 'password': args.password}).encode('utf-8'),
+        headers={'Content-Type': 'application/json'}
+    )
+    try:
+        with urllib.request.urlopen(request, timeout=60) as response:
+            token = json.loads(response.read())['data']['access_token']
+    except (urllib.error.URLError, KeyError, ValueError) as e:
+        print(f'❌ Could not log in as {args.username} at {args.url}: {e}')
+        return 1
+
+    all_logins, all_login_statuses, all_scores, all_score_statuses = [], [], [], []
+    for round_number in range(1, args.rounds + 1):
+        elapsed, logins, login_statuses, scores, score_statuses = run_burst(
+            args.url, args.username, args.password, args.logins, token, args.game_id
+        )
+        print(f'Round {round_number}: burst of {args.logins} logins finished in {elapsed:.2f} s')
+        report('login', logins, login_statuses)
+        report('score submit during burst', scores, score_statuses)
+        all_logins += logins
+        all_login_statuses += login_statuses
+        all_scores += scores
+        all_score_statuses += score_statuses
+
+    print('=' * 60)
+    print('Overall:')
+    report('login', all_logins, all_login_statuses)
+    report('score submit during burst', all_scores, all_score_statuses)
+    return 0
+
+if __name__ == '__main__':
+    raise SystemExit(main())
\ No newline at end of file
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+JSON serialization micro-benchmark for StudyFun Backend
+Seeds an in-memory database, captures the payload each endpoint returns, and
+times encoding that payload with the stdlib and orjson backends of
+StudyFunJSONProvider. It also reports the endpoint's full request time, which
+shows the share of each response that is spent in JSON.
+
+Usage:
+    python benchmark_serialization.py --users 300 --scores-per-user 20 --repeat 200
+"""
+
+import argparse
+import os
+import statistics
+import time
+
+# In-memory database and inline hashing; must be set before the config is imported
+os.environ['DATABASE_URL'] = 'sqlite://'
+os.environ.setdefault('PASSWORD_HASH_WORKERS', '0')
+
+from bench_support import seed
+from main import create_app
+from services.json_provider import StudyFunJSONProvider, orjson
+
+ENDPOINTS = [
+    '/api/games/',
+    '/api/subjects/my-subjects?include=games',
+    '/api/games/my-progress',
+    '/api/scores/my-scores?limit=200',
+    '/api/scores/leaderboard?limit=100',
+    '/api/scores/leaderboard?game_id=1&limit=100',
+    '/api/scores/stats',
+]
+
+def capture_payloads(app, token):
+    """Payload object each endpoint hands to the JSON provider, plus its median request time"""
+    captured = {}
+    prepare = app.json._prepare_response_obj
+
+    def capture(args, kwargs):
+        obj = prepare(args, kwargs)
+        captured['obj'] = obj
+        return obj
+
+    app.json._prepare_response_obj = capture
+    client = app.test_client()
+    headers = {'Authorization': f'Bearer {token}'}
+    results = {}
+    try:
+        for endpoint in ENDPOINTS:
+            timings = []
+            for _ in range(20):
+                started = time.perf_counter()
+                response = client.get(endpoint, headers=headers)
+                timings.append(time.perf_counter() - started)
+            if response.status_code != 200:
+                raise RuntimeError(f'{endpoint} returned {response.status_code}: {response.get_data(as_text=True)}')
+            results[endpoint] = (captured['obj'], statistics.median(timings))
+    finally:
+        app.json._prepare_response_obj = prepare
+    return results
+
+def time_encode(provider, obj, repeat):
+    """Median seconds to turn obj into a response with this provider"""
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        provider.response(obj)
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples)
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare stdlib json and orjson on real endpoint payloads')
+    parser.add_argument('--users', type=int, default=300)
+    parser.add_argument('--scores-per-user', type=int, default=20)
+    parser.add_argument('--repeat', type=int, default=200, help='Encodes timed per endpoint and backend')
+    args = parser.parse_args()
+
+    app = create_app()
+    print('⏱️  StudyFun JSON Serialization Benchmark')
+    print('=' * 100)
+    print(f'Seeding {args.users} users x {args.scores_per_user} scores...')
+    seed(app, args.users, args.scores_per_user)
+
+    token = app.test_client().post('/api/auth/login', json={
+        'username': 'testuser', 'password': 'password123'
+    }).get_json()['data']['access_token']
+    payloads = capture_payloads(app, token)
+
+    providers = {}
+    for backend in ('stdlib', 'orjson'):
+        if backend == 'orjson' and orjson is None:
+            print('orjson is not installed; only the stdlib backend is measured')
+            continue
+        app.config['JSON_BACKEND'] = backend
+        providers[backend] = StudyFunJSONProvider(app)
+
+    print('=' * 100)
+    print(f"{'endpoint':45} {'bytes':>8} {'request':>9} {'stdlib':>9} {'share':>6} {'orjson':>9} {'speedup':>8}")
+    for endpoint, (obj, request_seconds) in payloads.items():
+        size = len(providers['stdlib'].response(obj).get_data())
+        stdlib_seconds = time_encode(providers['stdlib'], obj, args.repeat)
+        line = (f"{endpoint:45} {size:>8} {request_seconds * 1000:>7.2f}ms {stdlib_seconds * 1000:>7.3f}ms "
+                f"{stdlib_seconds / request_seconds * 100:>5.1f}%")
+        if 'orjson' in providers:
+            orjson_seconds = time_encode(providers['orjson'], obj, args.repeat)
+            line += f" {orjson_seconds * 1000:>7.3f}ms {stdlib_seconds / orjson_seconds:>7.1f}x"
+        print(line)
+    print('=' * 100)
+    print("request = median full request time with the app's configured backend; "
+          "share = stdlib encode time / request time")
+    return 0
+
+if __name__ == '__main__':
+    raise SystemExit(main())
\ No newline at end of file
@@ -4,8 +4,8 @@ Simple database check script to verify StudyFun backend data
 """
 
 from flask import Flask
-from database import db
-from config.config import Config
+from database import db, configure_database
+from config.config import get_config
 
 # Import all models in the correct order
 from models.user import User
@@ -17,8 +17,8 @@ from models.score import Score
 def check_database():
     """Check database contents and health"""
     app = Flask(__name__)
-    app.config.from_object(Config)
-    db.init_app(app)
+    app.config.from_object(get_config())
+    configure_database(app)
     
     with app.app_context():
         print('📊 StudyFun Database Health Check')
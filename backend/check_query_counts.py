@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Query count regression check for StudyFun Backend
+Requests every catalog endpoint, plus the per-user game endpoints, twice: with
+a small catalog (5 games) and a short score history, then with a larger
+catalog (25 games) and a longer history spread over every game. Each runs with
+the catalog cache cold and warm. It exits non-zero if any endpoint sends more
+SQL statements the second time: a count that grows with the data is an N+1.
+"""
+
+import os
+import sys
+
+# In-memory database and inline hashing; must be set before the config is imported
+os.environ['DATABASE_URL'] = 'sqlite://'
+os.environ.setdefault('PASSWORD_HASH_WORKERS', '0')
+
+from sqlalchemy import event
+from bench_support import QueryCounter
+from database import db
+from main import create_app
+from models.game import Game
+from models.subject import Subject
+from services.catalog import catalog_cache, invalidate_version
+
+SMALL_CATALOG = 5
+LARGE_CATALOG = 25
+# Scores the user has played on each game, per stage
+SMALL_HISTORY = 2
+LARGE_HISTORY = 8
+
+ENDPOINTS = [
+    ('GET', '/api/classes/'),
+    ('GET', '/api/classes/1'),
+    ('GET', '/api/classes/my-class'),
+    ('GET', '/api/subjects/'),
+    ('GET', '/api/subjects/?include=games'),
+    ('GET', '/api/subjects/1?include=games'),
+    ('GET', '/api/subjects/by-class/3'),
+    ('GET', '/api/subjects/my-subjects?include=games'),
+    ('GET', '/api/games/'),
+    ('GET', '/api/games/1'),
+    ('GET', '/api/games/by-subject/1'),
+    ('GET', '/api/games/math-games'),
+    ('GET', '/api/games/lookup?name=Addition'),
+    ('GET', '/api/games/my-progress'),
+    ('POST', '/api/games/start/1'),
+]
+
+def add_games(total):
+    """Top the catalog up to `total` active games, spread over the subjects"""
+    subjects = Subject.query.order_by(Subject.id).all()
+    existing = Game.query.filter_by(is_active=True).count()
+    for n in range(existing, total):
+        subject = subjects[n % len(subjects)]
+        db.session.add(Game(
+            name=f'{subject.name} Challenge {n + 1}', subject_id=subject.id, emoji=subject.emoji,
+            description=f'{subject.name} practice', game_type='quiz', difficulty_level='beginner',
+            instructions='Answer as many questions as you can', max_score=100, time_limit=300
+        ))
+    db.session.commit()
+
+def play_games(client, headers, per_game):
+    """Top the user's history up to per_game scores on every active game, through the batch API"""
+    games = client.get('/api/games/', headers=headers).get_json()['data']['games']
+    progress = {game['id']: (game['user_progress'] or {}).get('total_attempts', 0)
+                for game in client.get('/api/games/my-progress', headers=headers).get_json()['data']['games']}
+    scores = [{'game_id': game['id'], 'score': (game['id'] * 7 + n) % game['max_score']}
+              for game in games for n in range(progress.get(game['id'], 0), per_game)]
+    for start in range(0, len(scores), 50):
+        response = client.post('/api/scores/batch', headers=headers, json={'scores': scores[start:start + 50]})
+        if response.status_code != 201:
+            raise RuntimeError(f'POST /api/scores/batch returned {response.status_code}')
+
+def count_queries(app, client, headers):
+    """{(method, url, 'cold'|'warm'): statements} for every endpoint"""
+    counts = {}
+    counter = QueryCounter()
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'after_cursor_execute', counter)
+    try:
+        # Load the caller into the identity cache first; that lookup is not a catalog query
+        client.get('/api/auth/profile', headers=headers)
+        for method, url in ENDPOINTS:
+            for state in ('cold', 'warm'):
+                if state == 'cold':
+                    catalog_cache.clear()
+                    invalidate_version()
+                counter.count = 0
+                response = client.open(url, method=method, headers=headers)
+                if response.status_code != 200:
+                    raise RuntimeError(f'{method} {url} returned {response.status_code}')
+                counts[(method, url, state)] = counter.count
+    finally:
+        event.remove(engine, 'after_cursor_execute', counter)
+    return counts
+
+def check_query_counts():
+    """Compare statements per endpoint at both data sizes; returns the number that grew"""
+    import init_db
+
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        init_db.init_classes()
+        init_db.init_subjects()
+        init_db.init_games()
+        init_db.create_sample_user()
+        add_games(SMALL_CATALOG)
+
+    client = app.test_client()
+    login = client.post('/api/auth/login', json={'username': 'testuser', 'password': 'password123'})
+    headers = {'Authorization': f"Bearer {login.get_json()['data']['access_token']}"}
+
+    play_games(client, headers, SMALL_HISTORY)
+    small = count_queries(app, client, headers)
+    with app.app_context():
+        add_games(LARGE_CATALOG)
+    play_games(client, headers, LARGE_HISTORY)
+    large = count_queries(app, client, headers)
+
+    print('🔍 StudyFun Query Count Check')
+    print('=' * 66)
+    print(f'{"endpoint":<50} {SMALL_CATALOG:>4} {LARGE_CATALOG:>4} games')
+    failures = 0
+    for key in small:
+        method, url, state = key
+        ok = large[key] == small[key]
+        failures += not ok
+        label = f'{method} {url} ({state})'
+        print(f'{"✅" if ok else "❌"} {label:<48} {small[key]:>4} {large[key]:>4}')
+
+    print('=' * 66)
+    if failures:
+        print(f'❌ {failures} requests send more queries as the catalog and score history grow')
+    else:
+        print('✅ Query counts do not depend on the catalog size or score history')
+    return failures
+
+if __name__ == '__main__':
+    sys.exit(1 if check_query_counts() else 0)
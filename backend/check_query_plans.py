@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Query plan regression check for StudyFun Backend
+Seeds an in-memory SQLite database, requests every hot read endpoint through
+the Flask test client, and captures the SELECT statements they actually send
+(with their bound parameters) from the engine's cursor hooks. Each distinct
+statement is run through EXPLAIN QUERY PLAN, and the check exits non-zero if
+any of them falls back to a full table scan.
+"""
+
+import os
+import re
+import sys
+
+# In-memory database and inline hashing; must be set before the config is imported
+os.environ['DATABASE_URL'] = 'sqlite://'
+os.environ.setdefault('PASSWORD_HASH_WORKERS', '0')
+
+from sqlalchemy import event
+from bench_support import seed
+from database import db
+from main import create_app
+from services.catalog import catalog_cache, invalidate_version
+
+USERS = 200
+SCORES_PER_USER = 15
+# services.catalog loads these tables whole (no WHERE) once per catalog version; that scan is the point
+CATALOG_SNAPSHOT_TABLES = {'classes', 'subjects', 'games'}
+
+# (method, url); '{...}' fields are filled from earlier responses (see cursors())
+ENDPOINTS = [
+    ('GET', '/api/auth/profile'),
+    ('GET', '/api/scores/my-scores?limit=10'),
+    ('GET', '/api/scores/my-scores?limit=10&cursor={my_scores}'),
+    ('GET', '/api/scores/my-scores?limit=10&game_id=1'),
+    ('GET', '/api/scores/stats'),
+    ('GET', '/api/scores/{score_id}'),
+    ('GET', '/api/scores/export'),
+    ('GET', '/api/scores/leaderboard?game_id=1&limit=10'),
+    ('GET', '/api/scores/leaderboard?game_id=1&limit=10&cursor={game_leaderboard}'),
+    ('GET', '/api/scores/leaderboard?limit=10'),
+    ('GET', '/api/scores/leaderboard?limit=10&cursor={leaderboard}'),
+    ('GET', '/api/scores/rank?game_id=1'),
+    ('POST', '/api/games/start/1'),
+    ('GET', '/api/games/my-progress'),
+    ('GET', '/api/classes/'),
+    ('GET', '/api/classes/my-class'),
+    ('GET', '/api/subjects/?include=games'),
+    ('GET', '/api/subjects/by-class/3'),
+    ('GET', '/api/subjects/my-subjects?include=games'),
+    ('GET', '/api/games/'),
+    ('GET', '/api/games/by-subject/1'),
+    ('GET', '/api/games/lookup?name=Addition'),
+]
+
+class StatementRecorder:
+    """Collects each distinct SELECT sent while attached, with the endpoint that sent it first"""
+
+    def __init__(self):
+        self.endpoint = None
+        self.statements = {}  # statement -> (endpoint, parameters)
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        if executemany or not re.match(r'\s*(SELECT|WITH)\b', statement, re.IGNORECASE):
+            return
+        self.statements.setdefault(statement, (self.endpoint, parameters))
+
+def cursors(client, headers):
+    """Second-page cursors and a score id, so the paging queries are captured too"""
+    def get(url):
+        return client.get(url, headers=headers).get_json()['data']
+
+    return {
+        'my_scores': get('/api/scores/my-scores?limit=10')['next_cursor'],
+        'score_id': get('/api/scores/my-scores?limit=1')['scores'][0]['id'],
+        'game_leaderboard': get('/api/scores/leaderboard?game_id=1&limit=10')['next_cursor'],
+        'leaderboard': get('/api/scores/leaderboard?limit=10')['next_cursor'],
+    }
+
+def capture_statements(app, client, headers):
+    """{statement: (endpoint, parameters)} for every SELECT the endpoints send"""
+    fields = cursors(client, headers)
+    recorder = StatementRecorder()
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'after_cursor_execute', recorder)
+    try:
+        for method, url in ENDPOINTS:
+            # Cold catalog cache, so catalog routes reach the database
+            catalog_cache.clear()
+            invalidate_version()
+            recorder.endpoint = f'{method} {url}'
+            response = client.open(url.format(**fields), method=method, headers=headers)
+            response.get_data()  # drain streamed bodies
+            if response.status_code != 200:
+                raise RuntimeError(f'{method} {url} returned {response.status_code}')
+    finally:
+        event.remove(engine, 'after_cursor_execute', recorder)
+    return recorder.statements
+
+def explain(statement, parameters):
+    """EXPLAIN QUERY PLAN detail lines for a captured statement and its parameters"""
+    rows = db.session.connection().exec_driver_sql('EXPLAIN QUERY PLAN ' + statement, parameters).all()
+    return [row[-1] for row in rows]
+
+def is_table_scan(detail):
+    # "SCAN scores" is a full scan; "SCAN games USING INDEX ..." walks an index instead
+    return detail.startswith('SCAN ') and 'USING' not in detail and 'SUBQUERY' not in detail
+
+def is_snapshot_load(statement, detail):
+    """The catalog snapshot reading a whole catalog table, which no index could serve"""
+    return detail.split()[1] in CATALOG_SNAPSHOT_TABLES and not re.search(r'\bWHERE\b', statement, re.IGNORECASE)
+
+def one_line(statement, width=100):
+    statement = re.sub(r'\s+', ' ', statement).strip()
+    return statement if len(statement) <= width else statement[:width - 3] + '...'
+
+def check_query_plans():
+    """Explain every statement the hot endpoints send; returns the number that scan a table"""
+    app = create_app()
+    seed(app, USERS, SCORES_PER_USER)
+    with app.app_context():
+        # Let the planner see the indexes and the seeded row counts
+        db.session.execute(db.text('ANALYZE'))
+        db.session.commit()
+
+    client = app.test_client()
+    login = client.post('/api/auth/login', json={'username': 'testuser', 'password': 'password123'})
+    headers = {'Authorization': f"Bearer {login.get_json()['data']['access_token']}"}
+    statements = capture_statements(app, client, headers)
+
+    print('🔍 StudyFun Query Plan Check')
+    print('=' * 60)
+    failures = 0
+    with app.app_context():
+        for statement, (endpoint, parameters) in statements.items():
+            details = explain(statement, parameters)
+            scans = [detail for detail in details if is_table_scan(detail)]
+            snapshot = bool(scans) and all(is_snapshot_load(statement, detail) for detail in scans)
+            failures += bool(scans) and not snapshot
+            if snapshot:
+                print(f'✅ {endpoint} (catalog snapshot, read whole by design)')
+            else:
+                print(f'{"❌" if scans else "✅"} {endpoint}')
+            print(f'     {one_line(statement)}')
+            for detail in details:
+                print(f'       {detail}')
+        db.session.remove()
+
+    print('=' * 60)
+    if failures:
+        print(f'❌ {failures} of {len(statements)} statements fall back to a table scan')
+    else:
+        print(f'✅ All {len(statements)} statements the hot endpoints send are served by an index')
+    return failures
+
+if __name__ == '__main__':
+    sys.exit(1 if check_query_plans() else 0)
@@ -1,10 +1,35 @@
 import os
 from datetime import timedelta
 
+def database_url():
+    """DATABASE_URL with the legacy postgres:// scheme mapped to the one SQLAlchemy accepts"""
+    url = os.environ.get('DATABASE_URL') or 'sqlite:///studyfun.db'
+    if url.startswith('postgres://'):
+        url = 'postgresql://' + url[len('postgres://'):]
+    return url
+
+def pool_options():
+    """Connection pool settings for server databases (SQLite picks its own pool)"""
+    return {
+        'pool_size': int(os.environ.get('DB_POOL_SIZE', 10)),
+        'max_overflow': int(os.environ.get('DB_MAX_OVERFLOW', 20)),
+        'pool_timeout': int(os.environ.get('DB_POOL_TIMEOUT', 30)),
+        'pool_recycle': int(os.environ.get('DB_POOL_RECYCLE', 1800)),
+        'pool_pre_ping': True
+    }
+
 class Config:
     # Database configuration
-    SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or 'sqlite:///studyfun.db'
+    SQLALCHEMY_DATABASE_URI = database_url()
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    SQLALCHEMY_ENGINE_OPTIONS = {} if SQLALCHEMY_DATABASE_URI.startswith('sqlite') else pool_options()
+    
+    # SQLite connection tuning, applied to every new connection (see database.configure_database).
+    # None leaves the SQLite default in place.
+    SQLITE_BUSY_TIMEOUT_MS = int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', 5000))
+    SQLITE_JOURNAL_MODE = os.environ.get('SQLITE_JOURNAL_MODE') or None
+    SQLITE_SYNCHRONOUS = os.environ.get('SQLITE_SYNCHRONOUS') or None
+    SQLITE_BEGIN_IMMEDIATE = os.environ.get('SQLITE_BEGIN_IMMEDIATE', '').lower() in ('1', 'true', 'yes')
     
     # JWT configuration
     JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY') or 'your-secret-key-change-this-in-production'
@@ -15,4 +40,100 @@ class Config:
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'your-flask-secret-key'
     
     # CORS configuration
-    CORS_HEADERS = 'Content-Type'
\ No newline at end of file
+    CORS_HEADERS = 'Content-Type'
+    
+    # Response encoder: 'orjson', 'stdlib', or 'auto' (orjson when it is installed)
+    JSON_BACKEND = os.environ.get('JSON_BACKEND', 'auto')
+    
+    # Response compression (brotli needs the Brotli package; gzip is always available)
+    COMPRESSION_ENABLED = os.environ.get('COMPRESSION_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+    COMPRESSION_MIN_SIZE = int(os.environ.get('COMPRESSION_MIN_SIZE', 1024))  # bytes
+    COMPRESSION_GZIP_LEVEL = int(os.environ.get('COMPRESSION_GZIP_LEVEL', 6))  # 1-9
+    COMPRESSION_BROTLI_QUALITY = int(os.environ.get('COMPRESSION_BROTLI_QUALITY', 5))  # 0-11
+    COMPRESSION_CACHE_SIZE = int(os.environ.get('COMPRESSION_CACHE_SIZE', 256))  # precompressed catalog bodies
+    
+    # Maximum number of results accepted by POST /api/scores/batch
+    SCORE_BATCH_MAX_ITEMS = int(os.environ.get('SCORE_BATCH_MAX_ITEMS', 500))
+    
+    # Score ingestion: 'direct' commits each submission; 'buffered' group-commits them every
+    # SCORE_INGEST_FLUSH_MS or SCORE_INGEST_BATCH_SIZE rows. Durability 'flush' answers after the
+    # commit, 'log' as soon as the score is fsynced to a replayable log in SCORE_INGEST_LOG_DIR
+    SCORE_INGEST_MODE = os.environ.get('SCORE_INGEST_MODE', 'direct')
+    SCORE_INGEST_DURABILITY = os.environ.get('SCORE_INGEST_DURABILITY', 'flush')
+    SCORE_INGEST_FLUSH_MS = int(os.environ.get('SCORE_INGEST_FLUSH_MS', 20))
+    SCORE_INGEST_BATCH_SIZE = int(os.environ.get('SCORE_INGEST_BATCH_SIZE', 200))
+    SCORE_INGEST_MAX_PENDING = int(os.environ.get('SCORE_INGEST_MAX_PENDING', 5000))
+    SCORE_INGEST_ACK_TIMEOUT = float(os.environ.get('SCORE_INGEST_ACK_TIMEOUT', 10.0))
+    SCORE_INGEST_LOG_DIR = os.environ.get('SCORE_INGEST_LOG_DIR', 'ingest_log')
+    
+    # Idempotency-Key retention for score submissions (hours), and seconds between purges of expired keys
+    IDEMPOTENCY_KEY_TTL_HOURS = float(os.environ.get('IDEMPOTENCY_KEY_TTL_HOURS', 24))
+    IDEMPOTENCY_PURGE_INTERVAL = int(os.environ.get('IDEMPOTENCY_PURGE_INTERVAL', 300))
+    
+    # Largest page (limit) served by the cursor-paginated listings: my-scores and leaderboards
+    PAGE_MAX_SIZE = int(os.environ.get('PAGE_MAX_SIZE', 100))
+    
+    # Score export: rows fetched and written per chunk, and usernames allowed to export every
+    # user's scores (comma-separated; everyone else can only export their own)
+    SCORE_EXPORT_BATCH_SIZE = int(os.environ.get('SCORE_EXPORT_BATCH_SIZE', 1000))
+    SCORE_EXPORT_USERS = {name.strip() for name in os.environ.get('SCORE_EXPORT_USERS', '').split(',') if name.strip()}
+    
+    # SQL instrumentation: per-endpoint query count/time histograms on /api/metrics, and
+    # X-Query-Count / X-Query-Time-Ms response headers (unset: only in debug mode). Statements
+    # slower than SLOW_QUERY_MS (0 disables) are logged, without their parameters, to the
+    # 'studyfun.slow_queries' logger and SLOW_QUERY_LOG_FILE, as is any statement a request
+    # repeats QUERY_REPEAT_WARN times (0 disables), the signature of an N+1 loop
+    QUERY_STATS_ENABLED = os.environ.get('QUERY_STATS_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+    QUERY_STATS_HEADERS = (os.environ['QUERY_STATS_HEADERS'].lower() in ('1', 'true', 'yes')
+                           if os.environ.get('QUERY_STATS_HEADERS') else None)
+    SLOW_QUERY_MS = float(os.environ.get('SLOW_QUERY_MS', 100))
+    SLOW_QUERY_LOG_FILE = os.environ.get('SLOW_QUERY_LOG_FILE') or None
+    QUERY_REPEAT_WARN = int(os.environ.get('QUERY_REPEAT_WARN', 10))
+    
+    # GET /api/metrics: served only when METRICS_ENABLED (off in production unless set), and
+    # then only to requests sending "Authorization: Bearer <METRICS_TOKEN>" when a token is set
+    METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+    METRICS_TOKEN = os.environ.get('METRICS_TOKEN') or None
+    
+    # Catalog ETags: seconds a process trusts its cached catalog version before re-reading it
+    CATALOG_VERSION_TTL = float(os.environ.get('CATALOG_VERSION_TTL', 1.0))
+    
+    # Rank engine: seconds before a game's in-memory rank index is re-seeded from the database
+    RANK_ENGINE_REFRESH_SECONDS = int(os.environ.get('RANK_ENGINE_REFRESH_SECONDS', 300))
+    
+    # Identity cache: user rows kept per process for protected handlers (size, seconds before re-read)
+    USER_CACHE_SIZE = int(os.environ.get('USER_CACHE_SIZE', 1024))
+    USER_CACHE_TTL = float(os.environ.get('USER_CACHE_TTL', 60.0))
+    
+    # Password hashing pool: worker processes (0 hashes on the request thread), operations allowed
+    # in flight, and seconds a login waits for a slot before getting a 503
+    PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', max(1, (os.cpu_count() or 2) // 2)))
+    PASSWORD_HASH_MAX_PENDING = int(os.environ.get('PASSWORD_HASH_MAX_PENDING', 64))
+    PASSWORD_HASH_QUEUE_TIMEOUT = float(os.environ.get('PASSWORD_HASH_QUEUE_TIMEOUT', 10.0))
+
+class ProductionConfig(Config):
+    """Production profile: pooled connections, and WAL mode with write locks taken up front on SQLite"""
+    DEBUG = False
+    
+    # Readers no longer block the writer, and commits skip the per-transaction fsync of the WAL
+    SQLITE_JOURNAL_MODE = os.environ.get('SQLITE_JOURNAL_MODE', 'WAL')
+    SQLITE_SYNCHRONOUS = os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL')
+    # Write transactions (database.begin_write) take the lock at BEGIN and queue on busy_timeout
+    # instead of failing when a read transaction has to upgrade; reads still begin DEFERRED
+    SQLITE_BEGIN_IMMEDIATE = os.environ.get('SQLITE_BEGIN_IMMEDIATE', 'true').lower() in ('1', 'true', 'yes')
+    
+    # Process metrics are not public: scrapers opt in with METRICS_ENABLED (and METRICS_TOKEN)
+    METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'false').lower() in ('1', 'true', 'yes')
+
+config_by_name = {
+    'development': Config,
+    'production': ProductionConfig
+}
+
+def get_config(name=None):
+    """Config class for name, or for the STUDYFUN_ENV environment variable (default: development)"""
+    name = name or os.environ.get('STUDYFUN_ENV', 'development')
+    try:
+        return config_by_name[name]
+    except KeyError:
+        raise ValueError(f"Unknown STUDYFUN_ENV '{name}' (expected one of: {', '.join(config_by_name)})")
\ No newline at end of file
@@ -3,6 +3,91 @@ Centralized database module for StudyFun Backend
 This module provides a single SQLAlchemy instance to be used across all models and the application.
 """
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event
 
 # Create single database instance
-db = SQLAlchemy()
\ No newline at end of file
+db = SQLAlchemy()
+
+SQLITE_SYNCHRONOUS_MODES = ('OFF', 'NORMAL', 'FULL', 'EXTRA')
+SQLITE_JOURNAL_MODES = ('DELETE', 'TRUNCATE', 'PERSIST', 'MEMORY', 'WAL', 'OFF')
+
+def _sqlite_connect_hook(busy_timeout_ms, journal_mode, synchronous, begin_immediate):
+    def on_connect(dbapi_connection, connection_record):
+        if begin_immediate:
+            # Let SQLAlchemy's begin hook issue BEGIN instead of pysqlite's implicit one
+            dbapi_connection.isolation_level = None
+        cursor = dbapi_connection.cursor()
+        try:
+            cursor.execute(f'PRAGMA busy_timeout = {int(busy_timeout_ms)}')
+            if journal_mode:
+                cursor.execute(f'PRAGMA journal_mode = {journal_mode}')
+            if synchronous:
+                cursor.execute(f'PRAGMA synchronous = {synchronous}')
+        finally:
+            cursor.close()
+    return on_connect
+
+def _begin_sqlite(connection):
+    # Reads begin DEFERRED and never take the write lock, so a slow read cannot block writers.
+    # Write transactions opt in to IMMEDIATE (see begin_write): waiting for the lock at BEGIN is
+    # covered by busy_timeout, while upgrading a read transaction to a write one can fail outright.
+    mode = connection.get_execution_options().get('sqlite_begin', 'DEFERRED')
+    connection.exec_driver_sql(f'BEGIN {mode}')
+
+def begin_write():
+    """
+    Start the session's transaction for a read-then-write unit of work
+
+    Ends the request's read transaction so far, then begins a new one that takes the SQLite
+    write lock up front (with SQLITE_BEGIN_IMMEDIATE). Call it right before the reads the
+    write depends on, and keep slow work (password hashing, waiting on other threads) out of it.
+    """
+    if db.session().in_transaction():
+        db.session.commit()
+    db.session.connection(execution_options={'sqlite_begin': 'IMMEDIATE'})
+
+def insert_missing(model, rows):
+    """
+    Insert rows for model, skipping any whose primary key already exists
+
+    Used to create rollup rows before locking them: a locking SELECT cannot lock a row that
+    does not exist yet, so two first writes for one key would both insert it and one would fail
+    its commit. With ON CONFLICT DO NOTHING the second insert waits for the first and skips.
+    """
+    if not rows:
+        return
+    dialect = db.session.get_bind().dialect.name
+    if dialect == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        raise NotImplementedError(f'insert_missing does not support {dialect}')
+    table = model.__table__
+    statement = insert(table).on_conflict_do_nothing(index_elements=[column.name for column in table.primary_key])
+    db.session.execute(statement, rows)
+
+def configure_database(app):
+    """Initialize db for app and apply the SQLITE_* connection settings from its config"""
+    db.init_app(app)
+    
+    with app.app_context():
+        engine = db.engine
+        if engine.dialect.name != 'sqlite':
+            return
+        
+        journal_mode = (app.config.get('SQLITE_JOURNAL_MODE') or '').upper() or None
+        synchronous = (app.config.get('SQLITE_SYNCHRONOUS') or '').upper() or None
+        if journal_mode and journal_mode not in SQLITE_JOURNAL_MODES:
+            raise ValueError(f'Unsupported SQLITE_JOURNAL_MODE: {journal_mode}')
+        if synchronous and synchronous not in SQLITE_SYNCHRONOUS_MODES:
+            raise ValueError(f'Unsupported SQLITE_SYNCHRONOUS: {synchronous}')
+        begin_immediate = bool(app.config.get('SQLITE_BEGIN_IMMEDIATE'))
+        
+        event.listen(engine, 'connect', _sqlite_connect_hook(
+            app.config.get('SQLITE_BUSY_TIMEOUT_MS', 5000), journal_mode, synchronous, begin_immediate
+        ))
+        if begin_immediate:
+            event.listen(engine, 'begin', _begin_sqlite)
+        # Connections opened before the listeners (none in practice) would miss the pragmas
+        engine.dispose()
\ No newline at end of file
@@ -5,15 +5,15 @@ This script creates the database tables and populates them with initial data.
 """
 
 from flask import Flask
-from database import db
-from config.config import Config
+from database import db, configure_database
+from config.config import get_config
 
 # Create Flask app instance
 app = Flask(__name__)
-app.config.from_object(Config)
+app.config.from_object(get_config())
 
 # Initialize database
-db.init_app(app)
+configure_database(app)
 
 # Import all models
 from models.user import User
@@ -21,6 +21,14 @@ from models.class_model import Class
 from models.subject import Subject  
 from models.game import Game
 from models.score import Score
+from models.user_game_best import UserGameBest
+from models.user_stats import UserStats
+from models.catalog_version import CatalogVersion
+from models.ingest_checkpoint import IngestCheckpoint
+from models.idempotency_key import IdempotencyKey
+
+# Catalog edits made here must bump the catalog version too
+import services.catalog
 
 def init_classes():
     """Initialize the classes (grade levels) table"""
@@ -34,8 +42,9 @@ def init_classes():
         {"name": "12th Grade", "grade_level": 12, "description": "High School Senior"}
     ]
     
+    existing = {name for (name,) in db.session.query(Class.name)}
     for class_data in classes_data:
-        if not Class.query.filter_by(name=class_data["name"]).first():
+        if class_data["name"] not in existing:
             new_class = Class(
                 name=class_data["name"],
                 grade_level=class_data["grade_level"],
@@ -57,8 +66,9 @@ def init_subjects():
         {"name": "Comp Sci", "emoji": "💻", "description": "Computer science and programming", "color_primary": "#85C1E9", "color_secondary": "#F8C471"}
     ]
     
+    existing = {name for (name,) in db.session.query(Subject.name)}
     for subject_data in subjects_data:
-        if not Subject.query.filter_by(name=subject_data["name"]).first():
+        if subject_data["name"] not in existing:
             new_subject = Subject(
                 name=subject_data["name"],
                 emoji=subject_data["emoji"],
@@ -132,8 +142,9 @@ def init_games():
         }
     ]
     
+    existing = {name for (name,) in db.session.query(Game.name).filter_by(subject_id=maths_subject.id)}
     for game_data in math_games_data:
-        if not Game.query.filter_by(name=game_data["name"], subject_id=maths_subject.id).first():
+        if game_data["name"] not in existing:
             new_game = Game(
                 name=game_data["name"],
                 subject_id=maths_subject.id,
@@ -171,6 +182,33 @@ def create_sample_user():
         print("  Username: testuser")
         print("  Password: password123")
 
+def ensure_indexes():
+    """Create indexes added to existing tables (create_all only indexes new tables)"""
+    for table in db.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=db.engine, checkfirst=True)
+    print("✓ Indexes verified successfully!")
+
+def ensure_columns():
+    """Add columns introduced after a table was created (create_all never alters tables)"""
+    inspector = db.inspect(db.engine)
+    preparer = db.engine.dialect.identifier_preparer
+    for table in db.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {column['name'] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing:
+                continue
+            ddl = (f'ALTER TABLE {preparer.format_table(table)} ADD COLUMN {preparer.format_column(column)} '
+                   f'{column.type.compile(dialect=db.engine.dialect)}')
+            if column.server_default is not None:
+                ddl += f" DEFAULT {column.server_default.arg}"
+            with db.engine.begin() as connection:
+                connection.execute(db.text(ddl))
+            print(f"  + {table.name}.{column.name}")
+    print("✓ Columns verified successfully!")
+
 def initialize_database():
     """Main function to initialize the entire database"""
     print("🚀 Initializing StudyFun Database...")
@@ -180,6 +218,8 @@ def initialize_database():
         # Drop all tables and recreate them (for development)
         print("📦 Creating database tables...")
         db.create_all()
+        ensure_columns()
+        ensure_indexes()
         
         # Initialize data in order
         init_classes()
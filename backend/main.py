@@ -1,53 +1,88 @@
-from flask import Flask
+import hmac
+from flask import Flask, Response, request
 from flask_cors import CORS
 from flask_jwt_extended import JWTManager
-from database import db
-from config.config import Config
-import os
+from database import db, configure_database
+from config.config import get_config
 
-# Initialize Flask app
-app = Flask(__name__)
-app.config.from_object(Config)
-
-# Initialize extensions
-db.init_app(app)
-cors = CORS(app)
-jwt = JWTManager(app)
+# Import models so every table is registered with SQLAlchemy
+from models.user import User
+from models.class_model import Class
+from models.subject import Subject
+from models.game import Game
+from models.score import Score
+from models.user_game_best import UserGameBest
+from models.user_stats import UserStats
+from models.catalog_version import CatalogVersion
+from models.ingest_checkpoint import IngestCheckpoint
+from models.idempotency_key import IdempotencyKey
 
-# Import routes after db initialization to avoid circular imports
 from routes.auth_routes import auth_bp
 from routes.class_routes import class_bp
 from routes.subject_routes import subject_bp
 from routes.game_routes import game_bp
 from routes.score_routes import score_bp
+from services.compression import init_compression
+from services.identity import is_token_revoked
+from services.json_provider import StudyFunJSONProvider
+from services.metrics import metrics, PROMETHEUS_CONTENT_TYPE
+from services.query_stats import init_query_stats, QUERY_COUNT_HEADER, QUERY_TIME_HEADER
 
-# Register blueprints
-app.register_blueprint(auth_bp, url_prefix='/api/auth')
-app.register_blueprint(class_bp, url_prefix='/api/classes')
-app.register_blueprint(subject_bp, url_prefix='/api/subjects')
-app.register_blueprint(game_bp, url_prefix='/api/games')
-app.register_blueprint(score_bp, url_prefix='/api/scores')
+def create_app(config_name=None):
+    """
+    Application factory
 
-# Import models after db initialization
-from models.user import User
-from models.class_model import Class
-from models.subject import Subject
-from models.game import Game
-from models.score import Score
+    config_name picks a profile from config.config_by_name ('development', 'production');
+    by default it comes from STUDYFUN_ENV. Tables are not created here: run init_db.py
+    once per database (it also adds new columns and indexes to existing tables), or
+    start the development server with `python main.py`, which creates missing tables.
+    """
+    app = Flask(__name__)
+    app.config.from_object(get_config(config_name))
+    app.json = StudyFunJSONProvider(app)
+
+    # Initialize extensions
+    configure_database(app)
+    CORS(app, expose_headers=['ETag', 'Idempotent-Replayed', QUERY_COUNT_HEADER, QUERY_TIME_HEADER])
+    init_compression(app)
+    init_query_stats(app)
+    jwt = JWTManager(app)
+
+    # Tokens of deleted, deactivated or token_version-bumped users are refused
+    jwt.token_in_blocklist_loader(is_token_revoked)
+
+    # Register blueprints
+    app.register_blueprint(auth_bp, url_prefix='/api/auth')
+    app.register_blueprint(class_bp, url_prefix='/api/classes')
+    app.register_blueprint(subject_bp, url_prefix='/api/subjects')
+    app.register_blueprint(game_bp, url_prefix='/api/games')
+    app.register_blueprint(score_bp, url_prefix='/api/scores')
+
+    @app.route('/')
+    def home():
+        return {'message': 'StudyFun Backend API is running!', 'status': 'success'}
+
+    @app.route('/api/health')
+    def health_check():
+        return {'status': 'healthy', 'message': 'Backend is operational'}
 
-@app.route('/')
-def home():
-    return {'message': 'StudyFun Backend API is running!', 'status': 'success'}
+    @app.route('/api/metrics')
+    def metrics_endpoint():
+        if not app.config.get('METRICS_ENABLED'):
+            return {'success': False, 'message': 'Not found'}, 404
+        token = app.config.get('METRICS_TOKEN')
+        if token and not hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}'):
+            return {'success': False, 'message': 'Metrics token required'}, 401
+        return Response(metrics.render(), mimetype=PROMETHEUS_CONTENT_TYPE)
 
-@app.route('/api/health')
-def health_check():
-    return {'status': 'healthy', 'message': 'Backend is operational'}
+    return app
 
 if __name__ == '__main__':
+    # Development server; use serve.py in production
+    app = create_app()
     with app.app_context():
-        # Create tables if they don't exist
+        # Create tables if they don't exist (init_db.py also seeds data and upgrades existing tables)
         db.create_all()
         print("Database tables created successfully!")
     
-    # Run the app
     app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
@@ -0,0 +1,23 @@
+from database import db
+from datetime import datetime
+
+class CatalogVersion(db.Model):
+    """Single-row stamp bumped whenever a Class, Subject or Game row changes"""
+    __tablename__ = 'catalog_version'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=1)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    # The one row every process reads and bumps
+    SINGLETON_ID = 1
+    
+    def __repr__(self):
+        return f'<CatalogVersion {self.version}>'
+
+# Seed the singleton row whenever the table is created
+db.event.listen(
+    CatalogVersion.__table__,
+    'after_create',
+    db.DDL("INSERT INTO catalog_version (id, version, updated_at) VALUES (1, 1, CURRENT_TIMESTAMP)")
+)
@@ -11,6 +11,12 @@ class Class(db.Model):
     is_active = db.Column(db.Boolean, default=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
+    # Partial index: the class picker lists active classes by grade
+    __table_args__ = (
+        db.Index('ix_classes_active_grade', grade_level,
+                 sqlite_where=is_active == True, postgresql_where=is_active == True),
+    )
+    
     # Relationships
     subjects = db.relationship('Subject', backref='class_ref', lazy=True)
     
@@ -26,7 +32,7 @@ class Class(db.Model):
             'description': self.description,
             'grade_level': self.grade_level,
             'is_active': self.is_active,
-            'created_at': self.created_at.isoformat() if self.created_at else None
+            'created_at': self.created_at
         }
     
     def __repr__(self):
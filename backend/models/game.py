@@ -17,6 +17,12 @@ class Game(db.Model):
     is_active = db.Column(db.Boolean, default=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
+    # Partial index: catalog queries only ever list active games
+    __table_args__ = (
+        db.Index('ix_games_active_subject', subject_id,
+                 sqlite_where=is_active == True, postgresql_where=is_active == True),
+    )
+    
     # Relationships
     scores = db.relationship('Score', backref='game', lazy=True)
     
@@ -45,7 +51,7 @@ class Game(db.Model):
             'max_score': self.max_score,
             'time_limit': self.time_limit,
             'is_active': self.is_active,
-            'created_at': self.created_at.isoformat() if self.created_at else None
+            'created_at': self.created_at
         }
     
     def __repr__(self):
@@ -0,0 +1,30 @@
+from database import db
+from datetime import datetime
+
+class IdempotencyKey(db.Model):
+    """Client-chosen key for a score submission, so a retried request returns the original score"""
+    __tablename__ = 'idempotency_keys'
+
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
+    key = db.Column(db.String(255), primary_key=True)
+    request_hash = db.Column(db.String(64), nullable=False)  # same key with a different body is refused
+    score_id = db.Column(db.Integer, db.ForeignKey('scores.id'), nullable=False)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    # Expired keys are purged oldest first
+    __table_args__ = (
+        db.Index('ix_idempotency_keys_created', created_at),
+    )
+
+    # Relationships
+    score = db.relationship('Score', lazy=True)
+
+    def __init__(self, user_id, key, request_hash, score_id):
+        self.user_id = user_id
+        self.key = key
+        self.request_hash = request_hash
+        self.score_id = score_id
+        self.created_at = datetime.utcnow()
+
+    def __repr__(self):
+        return f'<IdempotencyKey user_id={self.user_id} key={self.key}>'
\ No newline at end of file
@@ -0,0 +1,32 @@
+from database import db
+from datetime import datetime
+
+class IngestCheckpoint(db.Model):
+    """Last score-ingest log sequence committed to the database, one row per log file"""
+    __tablename__ = 'ingest_checkpoints'
+
+    log_name = db.Column(db.String(100), primary_key=True)
+    last_sequence = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __init__(self, log_name):
+        self.log_name = log_name
+        self.last_sequence = 0
+
+    @classmethod
+    def last_committed(cls, log_name):
+        row = cls.query.get(log_name)
+        return row.last_sequence if row else 0
+
+    @classmethod
+    def advance(cls, log_name, sequence):
+        """Move the checkpoint to sequence inside the caller's transaction"""
+        row = cls.query.get(log_name)
+        if not row:
+            row = cls(log_name=log_name)
+            db.session.add(row)
+        row.last_sequence = max(row.last_sequence, sequence)
+        return row
+
+    def __repr__(self):
+        return f'<IngestCheckpoint {self.log_name} seq={self.last_sequence}>'
\ No newline at end of file
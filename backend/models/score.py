@@ -16,6 +16,16 @@ class Score(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    # Indexes for the hot read paths (see check_query_plans.py)
+    __table_args__ = (
+        # my-scores, stats: a user's history, newest first
+        db.Index('ix_scores_user_created', user_id, created_at),
+        # start_game, my-scores?game_id=: one user's attempts at one game, best first
+        db.Index('ix_scores_user_game_percentage', user_id, game_id, percentage),
+        # per-game rankings and rollup backfills
+        db.Index('ix_scores_game_percentage_created', game_id, percentage, created_at),
+    )
+    
     def __init__(self, user_id, game_id, score, max_score=100, time_taken=None, attempts=1, is_completed=True):
         self.user_id = user_id
         self.game_id = game_id
@@ -45,8 +55,8 @@ class Score(db.Model):
             'time_taken': self.time_taken,
             'attempts': self.attempts,
             'is_completed': self.is_completed,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+            'created_at': self.created_at,
+            'updated_at': self.updated_at
         }
     
     def __repr__(self):
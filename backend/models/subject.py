@@ -14,6 +14,12 @@ class Subject(db.Model):
     is_active = db.Column(db.Boolean, default=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
+    # Partial index: catalog queries only ever list active subjects
+    __table_args__ = (
+        db.Index('ix_subjects_active_class', class_id,
+                 sqlite_where=is_active == True, postgresql_where=is_active == True),
+    )
+    
     # Relationships
     games = db.relationship('Game', backref='subject', lazy=True)
     
@@ -35,7 +41,7 @@ class Subject(db.Model):
             'color_primary': self.color_primary,
             'color_secondary': self.color_secondary,
             'is_active': self.is_active,
-            'created_at': self.created_at.isoformat() if self.created_at else None
+            'created_at': self.created_at
         }
     
     def __repr__(self):
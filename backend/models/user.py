@@ -1,6 +1,6 @@
 from database import db
 from datetime import datetime
-from werkzeug.security import generate_password_hash, check_password_hash
+from services.passwords import password_hasher
 
 class User(db.Model):
     __tablename__ = 'users'
@@ -15,6 +15,7 @@ class User(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     is_active = db.Column(db.Boolean, default=True)
+    token_version = db.Column(db.Integer, nullable=False, default=0, server_default='0')  # bump to revoke issued tokens
     
     # Relationships
     scores = db.relationship('Score', backref='user', lazy=True)
@@ -22,12 +23,13 @@ class User(db.Model):
     
     def __init__(self, username, password, email=None, full_name=None):
         self.username = username
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = password_hasher.hash(password)
         self.email = email
         self.full_name = full_name
+        self.token_version = 0
     
     def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
+        return password_hasher.verify(self.password_hash, password)
     
     def to_dict(self):
         return {
@@ -37,7 +39,7 @@ class User(db.Model):
             'full_name': self.full_name,
             'selected_class_id': self.selected_class_id,
             'theme_preference': self.theme_preference,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'created_at': self.created_at,
             'is_active': self.is_active
         }
     
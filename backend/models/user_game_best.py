@@ -0,0 +1,84 @@
+from database import db, insert_missing
+from datetime import datetime
+
+class UserGameBest(db.Model):
+    """Per-user, per-game rollup of the scores table, maintained on every submission"""
+    __tablename__ = 'user_game_best'
+
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
+    game_id = db.Column(db.Integer, db.ForeignKey('games.id'), primary_key=True)
+    best_score_id = db.Column(db.Integer, db.ForeignKey('scores.id'), nullable=True)
+    best_score = db.Column(db.Integer, nullable=False, default=0)
+    best_percentage = db.Column(db.Float, nullable=False, default=0.0)
+    best_achieved_at = db.Column(db.DateTime, nullable=True)  # earlier bests rank higher on ties
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    last_played = db.Column(db.DateTime, nullable=True)
+
+    # Leaderboards read a top-N straight off this index instead of scanning score history
+    __table_args__ = (
+        db.Index('ix_user_game_best_leaderboard', game_id, best_percentage.desc(), best_achieved_at, user_id),
+    )
+
+    # Relationships
+    user = db.relationship('User', lazy=True)
+    best_score_ref = db.relationship('Score', lazy=True)
+
+    def __init__(self, user_id, game_id):
+        self.user_id = user_id
+        self.game_id = game_id
+        self.best_score = 0
+        self.best_percentage = 0.0
+        self.attempts = 0
+
+    def apply_score(self, score):
+        """Fold a flushed Score row into this rollup"""
+        self.attempts += 1
+        played_at = score.created_at or datetime.utcnow()
+        if self.last_played is None or played_at > self.last_played:
+            self.last_played = played_at
+
+        # Strictly greater, so the first time a user reaches a percentage is the one that counts
+        if self.best_score_id is None or score.percentage > self.best_percentage:
+            self.best_score_id = score.id
+            self.best_score = score.score
+            self.best_percentage = score.percentage
+            self.best_achieved_at = played_at
+
+    @classmethod
+    def record(cls, score):
+        """Update (or create) the rollup row for a score inside the caller's transaction"""
+        return cls.record_many([score])[(score.user_id, score.game_id)]
+
+    @classmethod
+    def record_many(cls, scores):
+        """Batch form of record(): one upsert and one locking SELECT for every (user, game) pair touched"""
+        keys = {(score.user_id, score.game_id) for score in scores}
+        user_ids = {user_id for user_id, _ in keys}
+        game_ids = {game_id for _, game_id in keys}
+
+        # Rows must exist before FOR UPDATE can lock them (first score of a pair)
+        insert_missing(cls, [{'user_id': user_id, 'game_id': game_id, 'best_score': 0, 'best_percentage': 0.0,
+                              'attempts': 0} for user_id, game_id in sorted(keys)])
+
+        bests = {}
+        for best in cls.query.filter(cls.user_id.in_(user_ids), cls.game_id.in_(game_ids)).with_for_update():
+            if (best.user_id, best.game_id) in keys:
+                bests[(best.user_id, best.game_id)] = best
+
+        for score in scores:
+            bests[(score.user_id, score.game_id)].apply_score(score)
+        return bests
+
+    def to_dict(self):
+        return {
+            'user_id': self.user_id,
+            'game_id': self.game_id,
+            'best_score_id': self.best_score_id,
+            'best_score': self.best_score,
+            'best_percentage': round(self.best_percentage, 2),
+            'attempts': self.attempts,
+            'last_played': self.last_played
+        }
+
+    def __repr__(self):
+        return f'<UserGameBest user_id={self.user_id} game_id={self.game_id} best={self.best_percentage}>'
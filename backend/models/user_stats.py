@@ -0,0 +1,90 @@
+from database import db, insert_missing
+from datetime import datetime
+
+class UserStats(db.Model):
+    """Per-user rollup of the scores table behind /api/scores/stats, maintained on every submission"""
+    __tablename__ = 'user_stats'
+
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
+    total_games_played = db.Column(db.Integer, nullable=False, default=0)
+    total_score = db.Column(db.Integer, nullable=False, default=0)
+    percentage_sum = db.Column(db.Float, nullable=False, default=0.0)  # average = percentage_sum / total_games_played
+    best_score_id = db.Column(db.Integer, db.ForeignKey('scores.id'), nullable=True)
+    best_percentage = db.Column(db.Float, nullable=False, default=0.0)
+    games_by_subject = db.Column(db.JSON, nullable=False, default=dict)  # {"<subject_id>": count}
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    # The overall leaderboard pages through this index (see check_query_plans.py)
+    __table_args__ = (
+        db.Index('ix_user_stats_total_score', total_score.desc(), user_id),
+    )
+
+    # Relationships
+    user = db.relationship('User', lazy=True)
+    best_score_ref = db.relationship('Score', lazy=True)
+
+    def __init__(self, user_id):
+        self.user_id = user_id
+        self.total_games_played = 0
+        self.total_score = 0
+        self.percentage_sum = 0.0
+        self.best_percentage = 0.0
+        self.games_by_subject = {}
+
+    @property
+    def average_percentage(self):
+        if not self.total_games_played:
+            return 0.0
+        return self.percentage_sum / self.total_games_played
+
+    def apply_score(self, score, subject_id):
+        """Fold a flushed Score row (for a game in subject_id) into this rollup"""
+        self.total_games_played += 1
+        self.total_score += score.score
+        self.percentage_sum += score.percentage
+
+        # Strictly greater, matching UserGameBest: the first score to reach a percentage is the best
+        if self.best_score_id is None or score.percentage > self.best_percentage:
+            self.best_score_id = score.id
+            self.best_percentage = score.percentage
+
+        if subject_id is not None:
+            # Reassign rather than mutate so the JSON column is marked dirty
+            counts = dict(self.games_by_subject or {})
+            counts[str(subject_id)] = counts.get(str(subject_id), 0) + 1
+            self.games_by_subject = counts
+
+    @classmethod
+    def record(cls, score, subject_id):
+        """Update (or create) the user's stats row for a score inside the caller's transaction"""
+        return cls.record_many([score], {score.game_id: subject_id})[score.user_id]
+
+    @classmethod
+    def record_many(cls, scores, subject_ids):
+        """Batch form of record(); subject_ids maps each score's game_id to its subject_id"""
+        user_ids = {score.user_id for score in scores}
+        # A new player's row must exist before FOR UPDATE can lock it
+        now = datetime.utcnow()
+        insert_missing(cls, [{'user_id': user_id, 'total_games_played': 0, 'total_score': 0, 'percentage_sum': 0.0,
+                              'best_percentage': 0.0, 'games_by_subject': {}, 'updated_at': now}
+                             for user_id in sorted(user_ids)])
+        stats = {row.user_id: row for row in cls.query.filter(cls.user_id.in_(user_ids)).with_for_update()}
+
+        for score in scores:
+            stats[score.user_id].apply_score(score, subject_ids.get(score.game_id))
+        return stats
+
+    def to_dict(self):
+        return {
+            'user_id': self.user_id,
+            'total_games_played': self.total_games_played,
+            'total_score': self.total_score,
+            'average_percentage': round(self.average_percentage, 2),
+            'best_score_id': self.best_score_id,
+            'best_percentage': round(self.best_percentage, 2),
+            'games_by_subject': dict(self.games_by_subject or {}),
+            'updated_at': self.updated_at
+        }
+
+    def __repr__(self):
+        return f'<UserStats user_id={self.user_id} games={self.total_games_played}>'
\ No newline at end of file
@@ -1,9 +1,10 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, create_access_token, create_refresh_token, get_jwt_identity
-from werkzeug.security import check_password_hash
-from database import db
+from database import db, begin_write
 from models.user import User
-from models.class_model import Class
+from services.catalog import catalog_cache
+from services.identity import identity_claims, user_cache
+from services.passwords import PasswordHasherBusy
 
 auth_bp = Blueprint('auth', __name__)
 
@@ -42,12 +43,15 @@ def register():
             full_name=data.get('full_name')
         )
         
+        # Hashing happened above, outside the write transaction
+        begin_write()
         db.session.add(new_user)
         db.session.commit()
         
         # Create access token
-        access_token = create_access_token(identity=new_user.id)
-        refresh_token = create_refresh_token(identity=new_user.id)
+        claims = identity_claims(new_user)
+        access_token = create_access_token(identity=new_user.id, additional_claims=claims)
+        refresh_token = create_refresh_token(identity=new_user.id, additional_claims=claims)
         
         return jsonify({
             'success': True,
@@ -59,6 +63,14 @@ def register():
             }
         }), 201
         
+    except PasswordHasherBusy:
+        db.session.rollback()
+        response = jsonify({
+            'success': False,
+            'message': 'Server is busy, please try again shortly'
+        })
+        response.headers['Retry-After'] = '1'
+        return response, 503
     except Exception as e:
         db.session.rollback()
         return jsonify({
@@ -95,8 +107,9 @@ def login():
             }), 401
         
         # Create tokens
-        access_token = create_access_token(identity=user.id)
-        refresh_token = create_refresh_token(identity=user.id)
+        claims = identity_claims(user)
+        access_token = create_access_token(identity=user.id, additional_claims=claims)
+        refresh_token = create_refresh_token(identity=user.id, additional_claims=claims)
         
         return jsonify({
             'success': True,
@@ -108,6 +121,13 @@ def login():
             }
         }), 200
         
+    except PasswordHasherBusy:
+        response = jsonify({
+            'success': False,
+            'message': 'Server is busy, please try again shortly'
+        })
+        response.headers['Retry-After'] = '1'
+        return response, 503
     except Exception as e:
         return jsonify({
             'success': False,
@@ -120,7 +140,7 @@ def get_profile():
     """Get current user profile"""
     try:
         user_id = get_jwt_identity()
-        user = User.query.get(user_id)
+        user = user_cache.get(user_id)
         
         if not user:
             return jsonify({
@@ -147,6 +167,7 @@ def update_profile():
     """Update current user profile"""
     try:
         user_id = get_jwt_identity()
+        begin_write()
         user = User.query.get(user_id)
         
         if not user:
@@ -173,14 +194,15 @@ def update_profile():
             
         if 'selected_class_id' in data:
             # Validate class exists
+            class_obj = None
             if data['selected_class_id']:
-                class_obj = Class.query.get(data['selected_class_id'])
+                class_obj = catalog_cache.snapshot().class_for(data['selected_class_id'])
                 if not class_obj:
                     return jsonify({
                         'success': False,
                         'message': 'Invalid class selected'
                     }), 400
-            user.selected_class_id = data['selected_class_id']
+            user.selected_class_id = class_obj.id if class_obj else None
             
         if 'theme_preference' in data:
             if data['theme_preference'] in ['light', 'dark']:
@@ -222,7 +244,8 @@ def refresh():
                 'message': 'Invalid user'
             }), 401
         
-        access_token = create_access_token(identity=user_id)
+        # Carries the current token_version; a revoked refresh token never gets here
+        access_token = create_access_token(identity=user_id, additional_claims=identity_claims(user))
         
         return jsonify({
             'success': True,
@@ -1,16 +1,18 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from database import db
-from models.class_model import Class
+from database import db, begin_write
+from services.catalog import catalog_etag, catalog_cache
 from models.user import User
+from services.identity import user_cache
 
 class_bp = Blueprint('classes', __name__)
 
 @class_bp.route('/', methods=['GET'])
+@catalog_etag
 def get_classes():
     """Get all available classes/grade levels"""
     try:
-        classes = Class.query.filter_by(is_active=True).order_by(Class.grade_level).all()
+        classes = catalog_cache.snapshot().active_classes
         
         classes_data = [class_obj.to_dict() for class_obj in classes]
         
@@ -29,10 +31,11 @@ def get_classes():
         }), 500
 
 @class_bp.route('/<int:class_id>', methods=['GET'])
+@catalog_etag
 def get_class(class_id):
     """Get a specific class by ID"""
     try:
-        class_obj = Class.query.get(class_id)
+        class_obj = catalog_cache.snapshot().classes.get(class_id)
         
         if not class_obj:
             return jsonify({
@@ -59,6 +62,7 @@ def select_class():
     """Allow user to select their class"""
     try:
         user_id = get_jwt_identity()
+        begin_write()
         user = User.query.get(user_id)
         
         if not user:
@@ -77,7 +81,7 @@ def select_class():
             }), 400
         
         # Validate class exists
-        class_obj = Class.query.get(class_id)
+        class_obj = catalog_cache.snapshot().class_for(class_id)
         if not class_obj or not class_obj.is_active:
             return jsonify({
                 'success': False,
@@ -85,7 +89,7 @@ def select_class():
             }), 400
         
         # Update user's selected class
-        user.selected_class_id = class_id
+        user.selected_class_id = class_obj.id
         db.session.commit()
         
         return jsonify({
@@ -110,7 +114,7 @@ def get_my_class():
     """Get the current user's selected class"""
     try:
         user_id = get_jwt_identity()
-        user = User.query.get(user_id)
+        user = user_cache.get(user_id)
         
         if not user:
             return jsonify({
@@ -127,7 +131,7 @@ def get_my_class():
                 }
             }), 200
         
-        class_obj = Class.query.get(user.selected_class_id)
+        class_obj = catalog_cache.snapshot().classes.get(user.selected_class_id)
         
         return jsonify({
             'success': True,
@@ -1,14 +1,14 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from database import db
-from models.game import Game
-from models.subject import Subject
-from models.user import User
+from services.catalog import catalog_etag, catalog_cache
+from services.identity import user_cache
 from models.score import Score
+from models.user_game_best import UserGameBest
 
 game_bp = Blueprint('games', __name__)
 
 @game_bp.route('/', methods=['GET'])
+@catalog_etag
 def get_games():
     """Get all available games"""
     try:
@@ -16,15 +16,14 @@ def get_games():
         subject_id = request.args.get('subject_id', type=int)
         difficulty = request.args.get('difficulty')
         
-        query = Game.query.filter_by(is_active=True)
+        games = catalog_cache.snapshot().active_games
         
         if subject_id:
-            query = query.filter_by(subject_id=subject_id)
+            games = [game for game in games if game.subject_id == subject_id]
         
         if difficulty:
-            query = query.filter_by(difficulty_level=difficulty)
+            games = [game for game in games if game.difficulty_level == difficulty]
         
-        games = query.all()
         games_data = [game.to_dict() for game in games]
         
         return jsonify({
@@ -41,11 +40,51 @@ def get_games():
             'message': f'Failed to get games: {str(e)}'
         }), 500
 
+@game_bp.route('/lookup', methods=['GET'])
+@catalog_etag
+def lookup_game():
+    """Find active games by name: case-insensitive exact match first, then prefix matches"""
+    try:
+        name = request.args.get('name', '')
+        limit = request.args.get('limit', type=int, default=10)
+        
+        if not name.strip():
+            return jsonify({
+                'success': False,
+                'message': 'name is required'
+            }), 400
+        
+        matches = catalog_cache.snapshot().find_games(name, max(1, min(limit, 50)))
+        
+        if not matches:
+            return jsonify({
+                'success': False,
+                'message': 'Game not found'
+            }), 404
+        
+        return jsonify({
+            'success': True,
+            'data': {
+                'game': matches[0].to_dict(),
+                'exact': matches[0].name.lower() == name.strip().lower(),
+                'matches': [game.to_dict() for game in matches],
+                'count': len(matches)
+            }
+        }), 200
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Failed to look up game: {str(e)}'
+        }), 500
+
 @game_bp.route('/<int:game_id>', methods=['GET'])
+@catalog_etag
 def get_game(game_id):
     """Get a specific game by ID"""
     try:
-        game = Game.query.get(game_id)
+        catalog = catalog_cache.snapshot()
+        game = catalog.games.get(game_id)
         
         if not game:
             return jsonify({
@@ -56,8 +95,9 @@ def get_game(game_id):
         game_data = game.to_dict()
         
         # Include subject information
-        if game.subject:
-            game_data['subject'] = game.subject.to_dict()
+        subject = catalog.subjects.get(game.subject_id)
+        if subject:
+            game_data['subject'] = subject.to_dict()
         
         return jsonify({
             'success': True,
@@ -73,18 +113,20 @@ def get_game(game_id):
         }), 500
 
 @game_bp.route('/by-subject/<int:subject_id>', methods=['GET'])
+@catalog_etag
 def get_games_by_subject(subject_id):
     """Get games for a specific subject"""
     try:
         # Validate subject exists
-        subject = Subject.query.get(subject_id)
+        catalog = catalog_cache.snapshot()
+        subject = catalog.subjects.get(subject_id)
         if not subject:
             return jsonify({
                 'success': False,
                 'message': 'Subject not found'
             }), 404
         
-        games = Game.query.filter_by(subject_id=subject_id, is_active=True).all()
+        games = [game for game in catalog.games_by_subject.get(subject_id, []) if game.is_active]
         games_data = [game.to_dict() for game in games]
         
         return jsonify({
@@ -103,11 +145,13 @@ def get_games_by_subject(subject_id):
         }), 500
 
 @game_bp.route('/math-games', methods=['GET'])
+@catalog_etag
 def get_math_games():
     """Get all math games specifically"""
     try:
         # Find the Maths subject
-        maths_subject = Subject.query.filter_by(name='Maths').first()
+        catalog = catalog_cache.snapshot()
+        maths_subject = catalog.subject_named('Maths')
         
         if not maths_subject:
             return jsonify({
@@ -115,7 +159,7 @@ def get_math_games():
                 'message': 'Maths subject not found'
             }), 404
         
-        games = Game.query.filter_by(subject_id=maths_subject.id, is_active=True).all()
+        games = [game for game in catalog.games_by_subject.get(maths_subject.id, []) if game.is_active]
         games_data = [game.to_dict() for game in games]
         
         return jsonify({
@@ -139,7 +183,7 @@ def get_my_game_progress():
     """Get current user's game progress"""
     try:
         user_id = get_jwt_identity()
-        user = User.query.get(user_id)
+        user = user_cache.get(user_id)
         
         if not user:
             return jsonify({
@@ -147,23 +191,23 @@ def get_my_game_progress():
                 'message': 'User not found'
             }), 404
         
-        # Get all games with user's scores
-        games = Game.query.filter_by(is_active=True).all()
-        games_data = []
+        # Games and subjects come from the catalog cache; one query for the user's rollup rows
+        catalog = catalog_cache.snapshot()
+        bests = {best.game_id: best for best in UserGameBest.query.filter_by(user_id=user_id).all()}
         
-        for game in games:
+        games_data = []
+        for game in catalog.active_games:
             game_data = game.to_dict()
-            game_data['subject'] = game.subject.to_dict() if game.subject else None
-            
-            # Get user's best score for this game
-            best_score = Score.query.filter_by(user_id=user_id, game_id=game.id).order_by(Score.percentage.desc()).first()
+            subject = catalog.subjects.get(game.subject_id)
+            game_data['subject'] = subject.to_dict() if subject else None
             
-            if best_score:
+            best = bests.get(game.id)
+            if best:
                 game_data['user_progress'] = {
-                    'best_score': best_score.score,
-                    'best_percentage': best_score.percentage,
-                    'total_attempts': Score.query.filter_by(user_id=user_id, game_id=game.id).count(),
-                    'last_played': best_score.updated_at.isoformat() if best_score.updated_at else None
+                    'best_score': best.best_score,
+                    'best_percentage': best.best_percentage,
+                    'total_attempts': best.attempts,
+                    'last_played': best.last_played
                 }
             else:
                 game_data['user_progress'] = None
@@ -190,7 +234,7 @@ def start_game(game_id):
     """Start a game session (returns game details and instructions)"""
     try:
         user_id = get_jwt_identity()
-        user = User.query.get(user_id)
+        user = user_cache.get(user_id)
         
         if not user:
             return jsonify({
@@ -198,7 +242,8 @@ def start_game(game_id):
                 'message': 'User not found'
             }), 404
         
-        game = Game.query.get(game_id)
+        catalog = catalog_cache.snapshot()
+        game = catalog.games.get(game_id)
         
         if not game or not game.is_active:
             return jsonify({
@@ -207,7 +252,8 @@ def start_game(game_id):
             }), 404
         
         game_data = game.to_dict()
-        game_data['subject'] = game.subject.to_dict() if game.subject else None
+        subject = catalog.subjects.get(game.subject_id)
+        game_data['subject'] = subject.to_dict() if subject else None
         
         # Get user's previous scores for this game
         previous_scores = Score.query.filter_by(user_id=user_id, game_id=game_id).order_by(Score.created_at.desc()).limit(5).all()
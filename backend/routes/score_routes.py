@@ -1,20 +1,99 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, request, jsonify, current_app, stream_with_context
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from datetime import datetime
-from database import db
+from datetime import datetime, timezone
+from sqlalchemy.exc import IntegrityError
+from database import db, begin_write
 from models.score import Score
-from models.game import Game
 from models.user import User
+from models.user_game_best import UserGameBest
+from models.user_stats import UserStats
+from services.rank_engine import percentage_bucket, rank_engine
+from services.catalog import catalog_cache
+from services.identity import user_cache
+from services.idempotency import (InvalidIdempotencyKey, check_key, fingerprint, header_key, lookup, purge_expired,
+                                  remember, remember_many)
+from services.pagination import InvalidCursor, keyset_page, page_size
+from services.score_export import EXPORT_FORMATS, export_query, stream_csv, stream_ndjson
+from services.score_ingest import ScoreIngestBusy, ScoreIngestTimeout, ingest_record, score_ingestor
 
 score_bp = Blueprint('scores', __name__)
 
+def _catalog_game(catalog, game_id):
+    """Cached game for a client-supplied id, or None if it is missing or malformed"""
+    try:
+        return catalog.games.get(int(game_id))
+    except (TypeError, ValueError):
+        return None
+
+def _score_payload_error(data, game):
+    """Validation message for a submitted score, or None if it can be stored"""
+    for field in ('game_id', 'score'):
+        if field not in data:
+            return f'{field} is required'
+    
+    if not game or not game.is_active:
+        return 'Invalid game'
+    
+    score_value = data['score']
+    if isinstance(score_value, bool) or not isinstance(score_value, (int, float)):
+        return 'Score must be a number'
+    
+    if score_value < 0 or score_value > game.max_score:
+        return f'Score must be between 0 and {game.max_score}'
+    
+    return None
+
+def _parse_timestamp(value):
+    """Naive UTC datetime for an ISO 8601 string; raises ValueError if it is malformed"""
+    parsed = datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+    if parsed.tzinfo:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+def _build_score(user_id, game, data):
+    """Score row for a validated payload"""
+    return Score(
+        user_id=user_id,
+        game_id=game.id,
+        score=data['score'],
+        max_score=game.max_score,
+        time_taken=data.get('time_taken'),
+        attempts=1,
+        is_completed=data.get('is_completed', True)
+    )
+
+def _replayed_score(user_id, key, request_hash):
+    """Response replaying the score stored under an unexpired idempotency key, or None if the key is new"""
+    row = lookup(user_id, [key]).get(key)
+    if not row:
+        return None
+    
+    if row.request_hash != request_hash:
+        return jsonify({
+            'success': False,
+            'message': 'Idempotency-Key was already used for a different score'
+        }), 422
+    
+    score = db.session.get(Score, row.score_id)
+    game = catalog_cache.snapshot().games.get(score.game_id)
+    response = jsonify({
+        'success': True,
+        'message': 'Score submitted successfully',
+        'data': {
+            'score': score.to_dict(),
+            'game': game.to_dict() if game else None
+        }
+    })
+    response.headers['Idempotent-Replayed'] = 'true'
+    return response, 201
+
 @score_bp.route('/', methods=['POST'])
 @jwt_required()
 def submit_score():
     """Submit a new game score"""
     try:
         user_id = get_jwt_identity()
-        user = User.query.get(user_id)
+        user = user_cache.get(user_id)
         
         if not user:
             return jsonify({
@@ -23,47 +102,71 @@ def submit_score():
             }), 404
         
         data = request.get_json()
+        key = header_key()
         
-        # Validate required fields
-        required_fields = ['game_id', 'score']
-        for field in required_fields:
-            if field not in data:
-                return jsonify({
-                    'success': False,
-                    'message': f'{field} is required'
-                }), 400
-        
-        game_id = data['game_id']
-        score_value = data['score']
+        game = _catalog_game(catalog_cache.snapshot(), data.get('game_id'))
         
-        # Validate game exists
-        game = Game.query.get(game_id)
-        if not game or not game.is_active:
+        error = _score_payload_error(data, game)
+        if error:
             return jsonify({
                 'success': False,
-                'message': 'Invalid game'
+                'message': error
             }), 400
         
-        # Validate score is within valid range
-        if score_value < 0 or score_value > game.max_score:
+        # A retry of a stored submission gets the original score back
+        request_hash = fingerprint(data) if key else None
+        if key:
+            replayed = _replayed_score(user_id, key, request_hash)
+            if replayed:
+                return replayed
+        
+        if current_app.config.get('SCORE_INGEST_MODE') == 'buffered':
+            # Group-committed by the ingest flusher. End this request's transaction first: the
+            # flusher needs the write lock while this thread waits for it
+            db.session.commit()
+            try:
+                score_data, committed = score_ingestor.submit(
+                    current_app._get_current_object(), ingest_record(user_id, game, data, key, request_hash)
+                )
+            except IntegrityError:
+                # A concurrent request with the same key was committed in the same group
+                replayed = _replayed_score(user_id, key, request_hash) if key else None
+                if not replayed:
+                    raise
+                return replayed
+            purge_expired()
             return jsonify({
-                'success': False,
-                'message': f'Score must be between 0 and {game.max_score}'
-            }), 400
+                'success': True,
+                'message': 'Score submitted successfully' if committed else 'Score accepted',
+                'data': {
+                    'score': score_data,
+                    'game': game.to_dict()
+                }
+            }), 201 if committed else 202
         
-        # Create new score record
-        new_score = Score(
-            user_id=user_id,
-            game_id=game_id,
-            score=score_value,
-            max_score=game.max_score,
-            time_taken=data.get('time_taken'),
-            attempts=1,
-            is_completed=data.get('is_completed', True)
-        )
+        begin_write()
+        game_id = game.id
+        new_score = _build_score(user_id, game, data)
         
         db.session.add(new_score)
-        db.session.commit()
+        db.session.flush()  # assigns id/created_at for the rollup
+        
+        # Keep the leaderboard and stats rollups in step with the score history
+        best = UserGameBest.record(new_score)
+        UserStats.record(new_score, game.subject_id)
+        try:
+            if key:
+                remember(user_id, key, request_hash, new_score.id)
+            db.session.commit()
+        except IntegrityError:
+            db.session.rollback()
+            # A concurrent request with the same key committed first
+            replayed = _replayed_score(user_id, key, request_hash) if key else None
+            if not replayed:
+                raise
+            return replayed
+        rank_engine.record(game_id, user_id, best.best_percentage)
+        purge_expired()
         
         return jsonify({
             'success': True,
@@ -74,6 +177,24 @@ def submit_score():
             }
         }), 201
         
+    except InvalidIdempotencyKey as e:
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 400
+    except ScoreIngestBusy:
+        response = jsonify({
+            'success': False,
+            'message': 'Server is busy, please try again shortly'
+        })
+        response.headers['Retry-After'] = '1'
+        return response, 503
+    except ScoreIngestTimeout:
+        # Queued and will still be stored; resubmitting would create a duplicate
+        return jsonify({
+            'success': True,
+            'message': 'Score accepted'
+        }), 202
     except Exception as e:
         db.session.rollback()
         return jsonify({
@@ -81,13 +202,174 @@ def submit_score():
             'message': f'Failed to submit score: {str(e)}'
         }), 500
 
+@score_bp.route('/batch', methods=['POST'])
+@jwt_required()
+def submit_score_batch():
+    """Submit many game scores (e.g. results played offline) in one transaction"""
+    try:
+        user_id = get_jwt_identity()
+        user = user_cache.get(user_id)
+        
+        if not user:
+            return jsonify({
+                'success': False,
+                'message': 'User not found'
+            }), 404
+        
+        data = request.get_json() or {}
+        items = data.get('scores')
+        
+        if not isinstance(items, list) or not items:
+            return jsonify({
+                'success': False,
+                'message': 'scores must be a non-empty list'
+            }), 400
+        
+        max_items = current_app.config.get('SCORE_BATCH_MAX_ITEMS', 500)
+        if len(items) > max_items:
+            return jsonify({
+                'success': False,
+                'message': f'At most {max_items} scores can be submitted per batch'
+            }), 400
+        
+        # Every game_id is checked against the cached catalog
+        catalog = catalog_cache.snapshot()
+        
+        # Items resent with a stored idempotency_key get their original score back
+        stored = lookup(user_id, [item['idempotency_key'] for item in items
+                                  if isinstance(item, dict) and isinstance(item.get('idempotency_key'), str)])
+        stored_scores = {score.id: score for score in Score.query.filter(
+            Score.id.in_([row.score_id for row in stored.values()])
+        )} if stored else {}
+        
+        now = datetime.utcnow()
+        results = []
+        accepted = []
+        repeats = []  # (index, position in accepted) for a key sent twice in this batch
+        batch_keys = {}
+        for index, item in enumerate(items):
+            if not isinstance(item, dict):
+                results.append({'index': index, 'success': False, 'message': 'Each score must be an object'})
+                continue
+            
+            key = item.get('idempotency_key')
+            request_hash = None
+            if key is not None:
+                try:
+                    check_key(key)
+                except InvalidIdempotencyKey as e:
+                    results.append({'index': index, 'success': False, 'message': str(e)})
+                    continue
+                request_hash = fingerprint(item)
+                known_hash = stored[key].request_hash if key in stored else batch_keys.get(key, (None,))[0]
+                if known_hash is not None and known_hash != request_hash:
+                    results.append({'index': index, 'success': False,
+                                    'message': 'idempotency_key was already used for a different score'})
+                    continue
+                if key in stored:
+                    score = stored_scores.get(stored[key].score_id)
+                    results.append({'index': index, 'success': True, 'replayed': True,
+                                    'score': score.to_dict() if score else None})
+                    continue
+                if key in batch_keys:
+                    repeats.append((index, batch_keys[key][1]))
+                    continue
+            
+            game = _catalog_game(catalog, item.get('game_id'))
+            error = _score_payload_error(item, game)
+            
+            played_at = None
+            if not error and item.get('played_at'):
+                # Offline clients report when the game was actually played. A time ahead of ours
+                # is the client's clock running fast; the score itself is real, so keep it as of now
+                try:
+                    played_at = min(_parse_timestamp(item['played_at']), now)
+                except ValueError:
+                    error = 'played_at must be an ISO 8601 timestamp'
+            
+            if error:
+                results.append({'index': index, 'success': False, 'message': error})
+                continue
+            
+            new_score = _build_score(user_id, game, item)
+            new_score.created_at = played_at or now
+            new_score.updated_at = now
+            if key is not None:
+                batch_keys[key] = (request_hash, len(accepted))
+            accepted.append((index, new_score, key, request_hash))
+        
+        if accepted:
+            begin_write()
+            new_scores = [new_score for _, new_score, _, _ in accepted]
+            # One multi-row INSERT ... RETURNING; the Score objects stay out of the session, so
+            # nothing is reloaded row by row after the commit. RETURNING order is unspecified, but
+            # autoincrement ids follow VALUES order (sort_by_parameter_order would fall back to
+            # one INSERT per row on SQLite)
+            table = Score.__table__
+            ids = db.session.execute(
+                table.insert().returning(table.c.id),
+                [{column.name: getattr(new_score, column.key) for column in table.columns if column.key != 'id'}
+                 for new_score in new_scores]
+            ).scalars().all()
+            for new_score, score_id in zip(new_scores, sorted(ids)):
+                new_score.id = score_id
+            
+            # Fold into the rollups oldest first so ties keep the earliest best
+            ordered = sorted(new_scores, key=lambda score: (score.created_at, score.id))
+            bests = UserGameBest.record_many(ordered)
+            UserStats.record_many(ordered, {score.game_id: catalog.games[score.game_id].subject_id
+                                            for score in new_scores})
+            try:
+                remember_many(user_id, [(key, request_hash, new_score.id)
+                                        for _, new_score, key, request_hash in accepted if key is not None])
+                db.session.commit()
+            except IntegrityError:
+                db.session.rollback()
+                # Another request stored one of these keys meanwhile; a retry will replay it
+                response = jsonify({
+                    'success': False,
+                    'message': 'Scores are being submitted concurrently, please retry'
+                })
+                response.headers['Retry-After'] = '1'
+                return response, 503
+            
+            for best in bests.values():
+                rank_engine.record(best.game_id, best.user_id, best.best_percentage)
+            
+            for index, new_score, _, _ in accepted:
+                results.append({'index': index, 'success': True, 'score': new_score.to_dict()})
+            for index, position in repeats:
+                results.append({'index': index, 'success': True, 'replayed': True,
+                                'score': accepted[position][1].to_dict()})
+            purge_expired()
+        results.sort(key=lambda result: result['index'])
+        
+        succeeded = sum(1 for result in results if result['success'])
+        return jsonify({
+            'success': bool(succeeded),
+            'message': f'{succeeded} of {len(items)} scores submitted',
+            'data': {
+                'results': results,
+                'accepted': succeeded,
+                'rejected': len(items) - succeeded,
+                'replayed': sum(1 for result in results if result.get('replayed'))
+            }
+        }), 201 if succeeded else 400
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({
+            'success': False,
+            'message': f'Failed to submit scores: {str(e)}'
+        }), 500
+
 @score_bp.route('/my-scores', methods=['GET'])
 @jwt_required()
 def get_my_scores():
     """Get current user's scores"""
     try:
         user_id = get_jwt_identity()
-        user = User.query.get(user_id)
+        user = user_cache.get(user_id)
         
         if not user:
             return jsonify({
@@ -97,73 +379,152 @@ def get_my_scores():
         
         # Get optional filters
         game_id = request.args.get('game_id', type=int)
-        limit = request.args.get('limit', type=int, default=50)
+        limit = page_size(default=50)
         
         query = Score.query.filter_by(user_id=user_id)
         
         if game_id:
             query = query.filter_by(game_id=game_id)
         
-        scores = query.order_by(Score.created_at.desc()).limit(limit).all()
+        # Newest first; the cursor continues after the last (created_at, id) returned
+        scores, _, next_cursor = keyset_page(
+            query,
+            [(Score.created_at, True), (Score.id, True)],
+            lambda score: (score.created_at, score.id),
+            scope=f'my-scores:{game_id or ""}',
+            limit=limit
+        )
         
+        catalog = catalog_cache.snapshot()
         scores_data = []
         for score in scores:
+            game = catalog.games.get(score.game_id)
             score_data = score.to_dict()
-            score_data['game'] = score.game.to_dict() if score.game else None
+            score_data['game'] = game.to_dict() if game else None
             scores_data.append(score_data)
         
         return jsonify({
             'success': True,
             'data': {
                 'scores': scores_data,
-                'count': len(scores_data)
+                'count': len(scores_data),
+                'next_cursor': next_cursor
             }
         }), 200
         
+    except InvalidCursor as e:
+        return jsonify({
+            'success': False,
+            'message': f'Invalid cursor: {str(e)}'
+        }), 400
     except Exception as e:
         return jsonify({
             'success': False,
             'message': f'Failed to get scores: {str(e)}'
         }), 500
 
+@score_bp.route('/export', methods=['GET'])
+@jwt_required()
+def export_scores():
+    """Stream score history as NDJSON or CSV, filtered by class, game and date range"""
+    try:
+        user_id = get_jwt_identity()
+        user = user_cache.get(user_id)
+        
+        if not user:
+            return jsonify({
+                'success': False,
+                'message': 'User not found'
+            }), 404
+        
+        export_format = request.args.get('format', 'ndjson').lower()
+        if export_format not in EXPORT_FORMATS:
+            return jsonify({
+                'success': False,
+                'message': f"format must be one of {', '.join(EXPORT_FORMATS)}"
+            }), 400
+        
+        bounds = {}
+        for param in ('from', 'to'):
+            if request.args.get(param):
+                try:
+                    bounds[param] = _parse_timestamp(request.args[param])
+                except ValueError:
+                    return jsonify({
+                        'success': False,
+                        'message': f'{param} must be an ISO 8601 date or timestamp'
+                    }), 400
+        
+        # Accounts listed in SCORE_EXPORT_USERS export everyone's scores; others only their own
+        everyone = user.username in current_app.config.get('SCORE_EXPORT_USERS', ())
+        query = export_query(
+            user_id=None if everyone else user_id,
+            class_id=request.args.get('class_id', type=int),
+            game_id=request.args.get('game_id', type=int),
+            start=bounds.get('from'),
+            end=bounds.get('to')
+        )
+        
+        stream = stream_csv if export_format == 'csv' else stream_ndjson
+        batch_size = current_app.config.get('SCORE_EXPORT_BATCH_SIZE', 1000)
+        response = Response(
+            stream_with_context(stream(query, catalog_cache.snapshot(), batch_size)),
+            mimetype=EXPORT_FORMATS[export_format]
+        )
+        response.headers['Content-Disposition'] = f'attachment; filename=scores.{export_format}'
+        return response
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Failed to export scores: {str(e)}'
+        }), 500
+
 @score_bp.route('/leaderboard', methods=['GET'])
 def get_leaderboard():
     """Get leaderboard for a specific game or overall"""
     try:
         game_id = request.args.get('game_id', type=int)
-        limit = request.args.get('limit', type=int, default=10)
+        limit = page_size(default=10)
         
         if game_id:
             # Leaderboard for specific game
-            game = Game.query.get(game_id)
+            game = catalog_cache.snapshot().games.get(game_id)
             if not game:
                 return jsonify({
                     'success': False,
                     'message': 'Game not found'
                 }), 404
             
-            # Get best scores for this game (one per user)
-            subquery = db.session.query(
-                Score.user_id,
-                db.func.max(Score.percentage).label('best_percentage')
-            ).filter_by(game_id=game_id).group_by(Score.user_id).subquery()
-            
-            scores = db.session.query(Score).join(
-                subquery,
-                (Score.user_id == subquery.c.user_id) & 
-                (Score.percentage == subquery.c.best_percentage) &
-                (Score.game_id == game_id)
-            ).order_by(Score.percentage.desc(), Score.created_at.asc()).limit(limit).all()
+            # Pages straight off the per-user best rollup (one row per user)
+            query = db.session.query(UserGameBest, Score, User).join(
+                Score, Score.id == UserGameBest.best_score_id
+            ).join(
+                User, User.id == UserGameBest.user_id
+            ).filter(
+                UserGameBest.game_id == game_id
+            )
+            # Ties share a rank, at the rank engine's resolution, so this agrees with /rank
+            rows, ranks, next_cursor = keyset_page(
+                query,
+                [(UserGameBest.best_percentage, True), (UserGameBest.best_achieved_at, False),
+                 (UserGameBest.user_id, False)],
+                lambda row: (row[0].best_percentage, row[0].best_achieved_at, row[0].user_id),
+                scope=f'leaderboard:{game_id}',
+                limit=limit,
+                tie_of=lambda row: percentage_bucket(row[0].best_percentage)
+            )
             
             leaderboard_data = []
-            for i, score in enumerate(scores):
+            for (best, score, user), rank in zip(rows, ranks):
                 score_data = score.to_dict()
                 score_data['user'] = {
-                    'id': score.user.id,
-                    'username': score.user.username,
-                    'full_name': score.user.full_name
-                } if score.user else None
-                score_data['rank'] = i + 1
+                    'id': user.id,
+                    'username': user.username,
+                    'full_name': user.full_name
+                }
+                score_data['total_attempts'] = best.attempts
+                score_data['rank'] = rank
                 leaderboard_data.append(score_data)
             
             return jsonify({
@@ -171,58 +532,132 @@ def get_leaderboard():
                 'data': {
                     'leaderboard': leaderboard_data,
                     'game': game.to_dict(),
-                    'type': 'game_leaderboard'
+                    'type': 'game_leaderboard',
+                    'next_cursor': next_cursor
                 }
             }), 200
         
         else:
-            # Overall leaderboard (total points across all games)
-            # This is a simplified version - you might want to implement a more sophisticated scoring system
-            user_totals = db.session.query(
-                Score.user_id,
-                db.func.sum(Score.score).label('total_score'),
-                db.func.count(Score.id).label('games_played'),
-                db.func.avg(Score.percentage).label('avg_percentage')
-            ).group_by(Score.user_id).order_by(
-                db.func.sum(Score.score).desc()
-            ).limit(limit).all()
+            # Overall leaderboard (total points across all games), read from the stats rollup
+            query = db.session.query(UserStats, User).join(
+                User, User.id == UserStats.user_id
+            ).filter(
+                UserStats.total_games_played > 0
+            )
+            rows, ranks, next_cursor = keyset_page(
+                query,
+                [(UserStats.total_score, True), (UserStats.user_id, False)],
+                lambda row: (row[0].total_score, row[0].user_id),
+                scope='leaderboard:overall',
+                limit=limit,
+                tie_of=lambda row: row[0].total_score
+            )
             
             leaderboard_data = []
-            for i, (user_id, total_score, games_played, avg_percentage) in enumerate(user_totals):
-                user = User.query.get(user_id)
+            for (user_stats, user), rank in zip(rows, ranks):
                 leaderboard_data.append({
-                    'rank': i + 1,
+                    'rank': rank,
                     'user': {
                         'id': user.id,
                         'username': user.username,
                         'full_name': user.full_name
-                    } if user else None,
-                    'total_score': int(total_score) if total_score else 0,
-                    'games_played': int(games_played),
-                    'average_percentage': round(float(avg_percentage), 2) if avg_percentage else 0.0
+                    },
+                    'total_score': user_stats.total_score,
+                    'games_played': user_stats.total_games_played,
+                    'average_percentage': round(user_stats.average_percentage, 2)
                 })
             
             return jsonify({
                 'success': True,
                 'data': {
                     'leaderboard': leaderboard_data,
-                    'type': 'overall_leaderboard'
+                    'type': 'overall_leaderboard',
+                    'next_cursor': next_cursor
                 }
             }), 200
         
+    except InvalidCursor as e:
+        return jsonify({
+            'success': False,
+            'message': f'Invalid cursor: {str(e)}'
+        }), 400
     except Exception as e:
         return jsonify({
             'success': False,
             'message': f'Failed to get leaderboard: {str(e)}'
         }), 500
 
+@score_bp.route('/rank', methods=['GET'])
+@jwt_required()
+def get_my_rank():
+    """Get current user's rank, percentile and neighbours on a game leaderboard"""
+    try:
+        user_id = get_jwt_identity()
+        game_id = request.args.get('game_id', type=int)
+        radius = request.args.get('neighbours', type=int, default=2)
+        
+        if not game_id:
+            return jsonify({
+                'success': False,
+                'message': 'game_id is required'
+            }), 400
+        
+        game = catalog_cache.snapshot().games.get(game_id)
+        if not game:
+            return jsonify({
+                'success': False,
+                'message': 'Game not found'
+            }), 404
+        
+        radius = max(0, min(radius, 25))
+        standing = rank_engine.standing(game_id, user_id, radius)
+        
+        # One lookup for every neighbour's display name
+        neighbour_ids = [entry_user_id for entry_user_id, _, _ in standing['neighbours']]
+        users = {user.id: user for user in User.query.filter(User.id.in_(neighbour_ids)).all()} if neighbour_ids else {}
+        
+        neighbours_data = []
+        best_percentage = None
+        for entry_user_id, rank, percentage in standing['neighbours']:
+            user = users.get(entry_user_id)
+            if entry_user_id == user_id:
+                best_percentage = percentage
+            neighbours_data.append({
+                'rank': rank,
+                'user': {
+                    'id': user.id,
+                    'username': user.username,
+                    'full_name': user.full_name
+                } if user else None,
+                'best_percentage': percentage,
+                'is_current_user': entry_user_id == user_id
+            })
+        
+        return jsonify({
+            'success': True,
+            'data': {
+                'game': game.to_dict(),
+                'rank': standing['rank'],
+                'total_players': standing['total_players'],
+                'percentile': standing['percentile'],
+                'best_percentage': best_percentage,
+                'neighbours': neighbours_data
+            }
+        }), 200
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Failed to get rank: {str(e)}'
+        }), 500
+
 @score_bp.route('/stats', methods=['GET'])
 @jwt_required()
 def get_user_stats():
     """Get current user's statistics"""
     try:
         user_id = get_jwt_identity()
-        user = User.query.get(user_id)
+        user = user_cache.get(user_id)
         
         if not user:
             return jsonify({
@@ -230,29 +665,22 @@ def get_user_stats():
                 'message': 'User not found'
             }), 404
         
-        # Calculate various statistics
-        total_games_played = Score.query.filter_by(user_id=user_id).count()
-        total_score = db.session.query(db.func.sum(Score.score)).filter_by(user_id=user_id).scalar() or 0
-        avg_score = db.session.query(db.func.avg(Score.percentage)).filter_by(user_id=user_id).scalar() or 0
-        best_score = Score.query.filter_by(user_id=user_id).order_by(Score.percentage.desc()).first()
-        
-        # Games by subject
-        games_by_subject = db.session.query(
-            db.func.count(Score.id).label('count'),
-            Game.subject_id
-        ).join(Game).filter(Score.user_id == user_id).group_by(Game.subject_id).all()
+        # Read the rollup maintained by submit_score (no row yet means no games played)
+        user_stats = UserStats.query.get(user_id) or UserStats(user_id=user_id)
+        best_score = Score.query.get(user_stats.best_score_id) if user_stats.best_score_id else None
         
+        # Subject names come from the cached catalog
+        catalog = catalog_cache.snapshot()
         subject_stats = {}
-        for count, subject_id in games_by_subject:
-            from models.subject import Subject
-            subject = Subject.query.get(subject_id)
+        for subject_id, count in user_stats.games_by_subject.items():
+            subject = catalog.subjects.get(int(subject_id))
             if subject:
                 subject_stats[subject.name] = count
         
         stats = {
-            'total_games_played': total_games_played,
-            'total_score': int(total_score),
-            'average_percentage': round(float(avg_score), 2),
+            'total_games_played': user_stats.total_games_played,
+            'total_score': user_stats.total_score,
+            'average_percentage': round(user_stats.average_percentage, 2),
             'best_score': best_score.to_dict() if best_score else None,
             'games_by_subject': subject_stats,
             'user': user.to_dict()
@@ -1,25 +1,38 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from database import db
-from models.subject import Subject
-from models.class_model import Class
-from models.user import User
+from services.catalog import catalog_etag, catalog_cache
+from services.identity import user_cache
 
 subject_bp = Blueprint('subjects', __name__)
 
+def _include_games():
+    """True when the request asked for ?include=games"""
+    return 'games' in request.args.get('include', '').split(',')
+
+def _subject_data(catalog, subject, include_games):
+    """Subject dict with its games count, plus its active games when requested"""
+    subject_data = subject.to_dict()
+    subject_data['games_count'] = catalog.games_count(subject.id)
+    if include_games:
+        subject_data['games'] = [game.to_dict() for game in catalog.active_games_for(subject.id)]
+    return subject_data
+
 @subject_bp.route('/', methods=['GET'])
+@catalog_etag
 def get_subjects():
     """Get all available subjects"""
     try:
         # Get optional class_id from query parameters
         class_id = request.args.get('class_id', type=int)
         
+        catalog = catalog_cache.snapshot()
+        
         if class_id:
             # Get subjects for a specific class
-            subjects = Subject.query.filter_by(class_id=class_id, is_active=True).all()
+            subjects = [subject for subject in catalog.active_subjects if subject.class_id == class_id]
         else:
             # Get all subjects
-            subjects = Subject.query.filter_by(is_active=True).all()
+            subjects = catalog.active_subjects
         
         subjects_data = [subject.to_dict() for subject in subjects]
         
@@ -38,10 +51,12 @@ def get_subjects():
         }), 500
 
 @subject_bp.route('/<int:subject_id>', methods=['GET'])
+@catalog_etag
 def get_subject(subject_id):
     """Get a specific subject by ID"""
     try:
-        subject = Subject.query.get(subject_id)
+        catalog = catalog_cache.snapshot()
+        subject = catalog.subjects.get(subject_id)
         
         if not subject:
             return jsonify({
@@ -50,8 +65,7 @@ def get_subject(subject_id):
             }), 404
         
         # Include games count for this subject
-        subject_data = subject.to_dict()
-        subject_data['games_count'] = len(subject.games) if subject.games else 0
+        subject_data = _subject_data(catalog, subject, _include_games())
         
         return jsonify({
             'success': True,
@@ -72,7 +86,7 @@ def get_my_subjects():
     """Get subjects for the current user's selected class"""
     try:
         user_id = get_jwt_identity()
-        user = User.query.get(user_id)
+        user = user_cache.get(user_id)
         
         if not user:
             return jsonify({
@@ -80,22 +94,18 @@ def get_my_subjects():
                 'message': 'User not found'
             }), 404
         
+        catalog = catalog_cache.snapshot()
+        
         if not user.selected_class_id:
             # Return all subjects if no class selected
-            subjects = Subject.query.filter_by(is_active=True).all()
+            subjects = catalog.active_subjects
         else:
             # Get subjects for user's class or general subjects (class_id is None)
-            subjects = Subject.query.filter(
-                (Subject.class_id == user.selected_class_id) | 
-                (Subject.class_id == None),
-                Subject.is_active == True
-            ).all()
-        
-        subjects_data = []
-        for subject in subjects:
-            subject_data = subject.to_dict()
-            subject_data['games_count'] = len(subject.games) if subject.games else 0
-            subjects_data.append(subject_data)
+            subjects = [subject for subject in catalog.active_subjects
+                        if subject.class_id in (user.selected_class_id, None)]
+        
+        include_games = _include_games()
+        subjects_data = [_subject_data(catalog, subject, include_games) for subject in subjects]
         
         return jsonify({
             'success': True,
@@ -113,11 +123,13 @@ def get_my_subjects():
         }), 500
 
 @subject_bp.route('/by-class/<int:class_id>', methods=['GET'])
+@catalog_etag
 def get_subjects_by_class(class_id):
     """Get subjects for a specific class"""
     try:
         # Validate class exists
-        class_obj = Class.query.get(class_id)
+        catalog = catalog_cache.snapshot()
+        class_obj = catalog.classes.get(class_id)
         if not class_obj:
             return jsonify({
                 'success': False,
@@ -125,16 +137,10 @@ def get_subjects_by_class(class_id):
             }), 404
         
         # Get subjects for this class or general subjects
-        subjects = Subject.query.filter(
-            (Subject.class_id == class_id) | (Subject.class_id == None),
-            Subject.is_active == True
-        ).all()
-        
-        subjects_data = []
-        for subject in subjects:
-            subject_data = subject.to_dict()
-            subject_data['games_count'] = len(subject.games) if subject.games else 0
-            subjects_data.append(subject_data)
+        subjects = [subject for subject in catalog.active_subjects if subject.class_id in (class_id, None)]
+        
+        include_games = _include_games()
+        subjects_data = [_subject_data(catalog, subject, include_games) for subject in subjects]
         
         return jsonify({
             'success': True,
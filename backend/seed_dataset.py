@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+Synthetic dataset generator for StudyFun Backend
+Bulk-loads a production-sized dataset into DATABASE_URL so scaling work can be
+reproduced: the init_db catalog topped up to --games games, --users players and
+--scores scores, then the score rollups. Rows go in with Core executemany
+batches of --batch-size, one transaction per batch.
+
+Volumes follow skewed distributions rather than uniform ones: game popularity
+is Zipf-like (--game-skew), player activity is log-normal (--user-skew), each
+player has a fixed skill, and play happens mostly after school and on weekdays,
+growing over the --days window. The same --seed and arguments (including
+--end) always produce the same rows.
+
+Usage:
+    python seed_dataset.py --users 100000 --games 50 --scores 20000000
+    python seed_dataset.py --users 2000 --scores 200000 --seed 7 --end 2025-01-01
+"""
+
+import argparse
+import bisect
+import math
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+# One hash is computed for every player; no worker pool needed
+os.environ.setdefault('PASSWORD_HASH_WORKERS', '0')
+
+from database import db
+from init_db import app, ensure_columns, ensure_indexes, init_classes, init_subjects, init_games, create_sample_user
+from models.user import User
+from models.class_model import Class
+from models.subject import Subject
+from models.game import Game
+from models.score import Score
+from models.catalog_version import CatalogVersion
+from services.passwords import password_hasher
+
+DIFFICULTIES = [('beginner', 100, 240), ('intermediate', 150, 360), ('advanced', 200, 480)]
+# Skill shift per difficulty, as a fraction of max_score
+DIFFICULTY_SHIFT = {'beginner': 0.1, 'intermediate': 0.0, 'advanced': -0.12}
+# Relative share of play per hour of the day (UTC, treated as local school time)
+HOUR_WEIGHTS = [1, 0, 0, 0, 0, 0, 1, 2, 4, 6, 7, 6, 5, 5, 6, 8, 10, 11, 10, 8, 6, 4, 2, 1]
+WEEKEND_WEIGHT = 0.4
+# Daily volume grows linearly to this multiple of the first day's
+GROWTH = 2.0
+
+def cumulative(weights):
+    total = 0.0
+    result = []
+    for weight in weights:
+        total += weight
+        result.append(total)
+    return result
+
+def zipf_weights(count, exponent, rng):
+    """Weights 1/rank**exponent, with ranks shuffled so popularity does not follow ids"""
+    weights = [1.0 / (rank ** exponent) for rank in range(1, count + 1)]
+    rng.shuffle(weights)
+    return weights
+
+def daily_counts(total, days, end):
+    """Scores per day over the window ending at `end`, summing exactly to total"""
+    start = end - timedelta(days=days)
+    weights = []
+    for offset in range(days):
+        day = start + timedelta(days=offset)
+        weight = 1.0 + (GROWTH - 1.0) * offset / max(days - 1, 1)
+        if day.weekday() >= 5:
+            weight *= WEEKEND_WEIGHT
+        weights.append(weight)
+    scale = total / sum(weights)
+    counts = [int(weight * scale) for weight in weights]
+    # Largest remainders take the rows lost to rounding
+    by_remainder = sorted(range(days), key=lambda i: weights[i] * scale - counts[i], reverse=True)
+    for i in by_remainder[:total - sum(counts)]:
+        counts[i] += 1
+    return [(start + timedelta(days=offset), count) for offset, count in enumerate(counts)]
+
+def insert_batches(table, rows, batch_size, label, expected):
+    """Insert an iterable of row dicts with one executemany and commit per batch"""
+    started = time.perf_counter()
+    inserted = 0
+    batch = []
+    report_every = max(expected // 20, batch_size)
+    next_report = report_every
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            db.session.execute(table.insert(), batch)
+            db.session.commit()
+            inserted += len(batch)
+            batch = []
+            if inserted >= next_report:
+                elapsed = time.perf_counter() - started
+                print(f"  {label}: {inserted:,}/{expected:,} ({inserted / elapsed:,.0f} rows/s)")
+                next_report += report_every
+    if batch:
+        db.session.execute(table.insert(), batch)
+        db.session.commit()
+        inserted += len(batch)
+    elapsed = time.perf_counter() - started
+    print(f"✓ {inserted:,} {label} inserted in {elapsed:.1f}s ({inserted / max(elapsed, 1e-9):,.0f} rows/s)")
+    return inserted
+
+def seed_games(count, rng):
+    """Top the catalog up to `count` active games, spread over the subjects"""
+    existing = Game.query.filter_by(is_active=True).count()
+    subjects = Subject.query.order_by(Subject.id).all()
+    if existing >= count or not subjects:
+        return 0
+
+    now = datetime.utcnow()
+    rows = []
+    for n in range(existing, count):
+        subject = subjects[n % len(subjects)]
+        difficulty, max_score, time_limit = rng.choice(DIFFICULTIES)
+        rows.append({
+            'name': f'{subject.name} Challenge {n + 1}', 'subject_id': subject.id, 'emoji': subject.emoji,
+            'description': f'Synthetic {difficulty} {subject.name} game', 'game_type': 'quiz',
+            'difficulty_level': difficulty, 'instructions': 'Answer as many questions as you can',
+            'max_score': max_score, 'time_limit': time_limit, 'is_active': True, 'created_at': now
+        })
+    db.session.execute(Game.__table__.insert(), rows)
+    # Core inserts skip the session hooks that bump the catalog version
+    table = CatalogVersion.__table__
+    db.session.execute(table.update().where(table.c.id == CatalogVersion.SINGLETON_ID).values(
+        version=table.c.version + 1, updated_at=db.func.now()
+    ))
+    db.session.commit()
+    print(f"✓ {len(rows)} synthetic games added")
+    return len(rows)
+
+def user_rows(count, prefix, class_ids, start, rng):
+    """Players in a few classes (middle grades busiest), some without a class yet"""
+    password_hash = password_hasher.hash('password123')
+    class_weights = cumulative([1.0 / (1 + abs(i - len(class_ids) // 2)) for i in range(len(class_ids))])
+    for i in range(count):
+        joined = start - timedelta(minutes=rng.randint(0, 60 * 24 * 60))
+        yield {
+            'username': f'{prefix}{i}', 'password_hash': password_hash, 'full_name': f'Load Test {i}',
+            'email': f'{prefix}{i}@studyfun.test',
+            'selected_class_id': rng.choices(class_ids, cum_weights=class_weights)[0]
+            if class_ids and rng.random() > 0.1 else None,
+            'theme_preference': 'dark' if rng.random() < 0.3 else 'light',
+            'created_at': joined, 'updated_at': joined, 'is_active': True, 'token_version': 0
+        }
+
+def score_rows(days, user_ids, games, user_skew, game_skew, rng):
+    """Scores in time order, so ids grow with created_at as they do in production"""
+    activity = cumulative([rng.lognormvariate(0.0, user_skew) for _ in user_ids])
+    popularity = cumulative(zipf_weights(len(games), game_skew, rng))
+    skill = {user_id: rng.betavariate(5, 3) for user_id in user_ids}
+    hours = cumulative(HOUR_WEIGHTS)
+    activity_total = activity[-1]
+    popularity_total = popularity[-1]
+    hours_total = hours[-1]
+
+    for day, count in days:
+        moments = sorted(
+            day + timedelta(hours=bisect.bisect(hours, rng.random() * hours_total), seconds=rng.randrange(3600))
+            for _ in range(count)
+        )
+        for played_at in moments:
+            user_id = user_ids[bisect.bisect(activity, rng.random() * activity_total)]
+            game_id, max_score, time_limit, difficulty = games[bisect.bisect(popularity, rng.random() * popularity_total)]
+            mean = skill[user_id] + DIFFICULTY_SHIFT.get(difficulty, 0.0)
+            score = min(max_score, max(0, round(rng.gauss(mean, 0.15) * max_score)))
+            limit = time_limit or 300
+            yield {
+                'user_id': user_id, 'game_id': game_id, 'score': score, 'max_score': max_score,
+                'percentage': score / max_score * 100 if max_score else 0.0,
+                'time_taken': min(limit, max(5, int(rng.lognormvariate(math.log(limit * 0.4), 0.5)))),
+                'attempts': 1, 'is_completed': rng.random() > 0.05,
+                'created_at': played_at, 'updated_at': played_at
+            }
+
+def main():
+    parser = argparse.ArgumentParser(description='Bulk-load a reproducible synthetic dataset into DATABASE_URL')
+    parser.add_argument('--users', type=int, default=10000)
+    parser.add_argument('--games', type=int, default=50, help='Total active games, including the init_db ones')
+    parser.add_argument('--scores', type=int, default=1000000)
+    parser.add_argument('--seed', type=int, default=42, help='Random seed; same seed and arguments, same rows')
+    parser.add_argument('--batch-size', type=int, default=10000, help='Rows per executemany and commit')
+    parser.add_argument('--days', type=int, default=180, help='Length of the play history window')
+    parser.add_argument('--end', type=lambda value: datetime.strptime(value, '%Y-%m-%d'), default=None,
+                        help='Last day of the window, YYYY-MM-DD (default: today)')
+    parser.add_argument('--user-skew', type=float, default=1.0, help='Sigma of the log-normal player activity')
+    parser.add_argument('--game-skew', type=float, default=1.0, help='Zipf exponent of game popularity')
+    parser.add_argument('--prefix', default='loadtest', help='Username prefix for generated players')
+    parser.add_argument('--keep-indexes', action='store_true',
+                        help='Insert scores with their indexes in place instead of rebuilding them afterwards')
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    end = args.end or datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    days = daily_counts(args.scores, args.days, end)
+    window_start = days[0][0]
+
+    print("🌱 Seeding StudyFun synthetic dataset...")
+    print("=" * 60)
+    print(f"{args.users:,} users, {args.games} games, {args.scores:,} scores, seed {args.seed}, "
+          f"{window_start:%Y-%m-%d} to {end:%Y-%m-%d}")
+
+    with app.app_context():
+        db.create_all()
+        ensure_columns()
+        ensure_indexes()
+        init_classes()
+        init_subjects()
+        init_games()
+        create_sample_user()
+
+        if db.session.query(User.id).filter(User.username.like(f'{args.prefix}%')).first():
+            print(f"❌ Users named {args.prefix}* already exist; use a fresh DATABASE_URL or another --prefix")
+            return 1
+
+        seed_games(args.games, rng)
+        class_ids = [class_id for (class_id,) in db.session.query(Class.id).order_by(Class.grade_level)]
+        insert_batches(User.__table__, user_rows(args.users, args.prefix, class_ids, window_start, rng),
+                       args.batch_size, 'users', args.users)
+
+        user_ids = [user_id for (user_id,) in db.session.query(User.id).filter(
+            User.username.like(f'{args.prefix}%')).order_by(User.id)]
+        games = [tuple(row) for row in db.session.query(
+            Game.id, Game.max_score, Game.time_limit, Game.difficulty_level
+        ).filter(Game.is_active == True).order_by(Game.id)]
+        db.session.commit()  # end the read transaction before DDL on another connection
+
+        # Maintaining three indexes row by row costs more than building them once at the end
+        score_indexes = [] if args.keep_indexes else list(Score.__table__.indexes)
+        for index in score_indexes:
+            index.drop(bind=db.engine, checkfirst=True)
+        try:
+            insert_batches(Score.__table__, score_rows(days, user_ids, games, args.user_skew, args.game_skew, rng),
+                           args.batch_size, 'scores', args.scores)
+        finally:
+            if score_indexes:
+                started = time.perf_counter()
+                ensure_indexes()
+                print(f"  (score indexes rebuilt in {time.perf_counter() - started:.1f}s)")
+
+        import backfill_rollups
+        backfill_rollups.backfill_user_game_best()
+        backfill_rollups.backfill_user_stats()
+
+    print("=" * 60)
+    print("✅ Synthetic dataset ready!")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
\ No newline at end of file
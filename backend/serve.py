@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Production server launcher for StudyFun Backend
+Runs the API under gunicorn with several worker processes, each serving requests
+on a thread pool. The app is built once in the master before the workers fork.
+Where gunicorn is not available (Windows), it falls back to waitress: one process,
+many threads. Run `python init_db.py` once before the first start; the server
+itself never creates tables.
+
+Usage:
+    STUDYFUN_ENV=production python serve.py --workers 4 --threads 8 --bind 0.0.0.0:5000
+"""
+
+import argparse
+import os
+import signal
+import sys
+
+from database import db
+from main import create_app
+
+def env_int(name, default):
+    return int(os.environ.get(name, default))
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Run the StudyFun API with a production WSGI server')
+    parser.add_argument('--bind', default=os.environ.get('STUDYFUN_BIND', f"0.0.0.0:{os.environ.get('PORT', 5000)}"),
+                        help='host:port to listen on')
+    parser.add_argument('--workers', type=int, default=env_int('STUDYFUN_WORKERS', os.cpu_count() or 1),
+                        help='Worker processes (gunicorn only; default: one per CPU)')
+    parser.add_argument('--threads', type=int, default=env_int('STUDYFUN_THREADS', 4),
+                        help='Request threads per worker')
+    parser.add_argument('--timeout', type=int, default=env_int('STUDYFUN_TIMEOUT', 60),
+                        help='Seconds before a stuck worker is restarted')
+    parser.add_argument('--graceful-timeout', type=int, default=env_int('STUDYFUN_GRACEFUL_TIMEOUT', 30),
+                        help='Seconds in-flight requests get to finish on shutdown')
+    parser.add_argument('--max-requests', type=int, default=env_int('STUDYFUN_MAX_REQUESTS', 0),
+                        help='Recycle a worker after this many requests (0 = never)')
+    parser.add_argument('--config', default=None, help='Config profile (default: STUDYFUN_ENV or development)')
+    parser.add_argument('--server', choices=('auto', 'gunicorn', 'waitress'), default='auto')
+    return parser.parse_args(argv)
+
+def release_process_resources(app):
+    """Commit buffered scores, stop the password hashing pool and close pooled database connections"""
+    from services.passwords import password_hasher
+    from services.score_ingest import score_ingestor
+    score_ingestor.shutdown()
+    password_hasher.shutdown()
+    with app.app_context():
+        db.engine.dispose()
+
+def run_gunicorn(args):
+    from gunicorn.app.base import BaseApplication
+
+    class StudyFunServer(BaseApplication):
+        def __init__(self, options):
+            self.options = options
+            self.application = None
+            super().__init__()
+
+        def load_config(self):
+            for key, value in self.options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            # With preload_app this runs once, in the master, before any worker forks
+            if self.application is None:
+                self.application = create_app(args.config)
+            return self.application
+
+    server = None
+
+    def post_fork(arbiter, worker):
+        # Connections must never be shared across processes; drop the master's pool without closing it
+        with server.application.app_context():
+            db.engine.dispose(close=False)
+
+    def worker_exit(arbiter, worker):
+        release_process_resources(server.application)
+
+    server = StudyFunServer({
+        'bind': args.bind,
+        'workers': args.workers,
+        'threads': args.threads,
+        'worker_class': 'gthread',
+        'preload_app': True,
+        'timeout': args.timeout,
+        'graceful_timeout': args.graceful_timeout,
+        'max_requests': args.max_requests,
+        'max_requests_jitter': args.max_requests // 10,
+        'keepalive': 5,
+        'accesslog': '-',
+        'post_fork': post_fork,
+        'worker_exit': worker_exit,
+    })
+    server.run()
+
+def run_waitress(args):
+    from waitress import serve
+
+    app = create_app(args.config)
+
+    def stop(signum, frame):
+        raise KeyboardInterrupt
+
+    # waitress exits on KeyboardInterrupt; make SIGTERM (service managers, docker stop) do the same
+    signal.signal(signal.SIGTERM, stop)
+    print(f"Serving on {args.bind} with waitress ({args.threads} threads)")
+    try:
+        serve(app, listen=args.bind, threads=args.threads)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        release_process_resources(app)
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    server = args.server
+    if server == 'auto':
+        try:
+            import gunicorn  # noqa: F401 - availability check
+            server = 'gunicorn' if os.name != 'nt' else 'waitress'
+        except ImportError:
+            server = 'waitress'
+
+    if server == 'gunicorn':
+        run_gunicorn(args)
+    else:
+        run_waitress(args)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
\ No newline at end of file
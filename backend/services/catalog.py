@@ -0,0 +1,240 @@
+"""
+Catalog versioning and caching for StudyFun Backend
+Classes, subjects and games change rarely. Every change bumps a version stamp
+stored in the database. Catalog endpoints use it as a strong ETag so clients
+revalidate with a 304, and each process keeps a read-through snapshot of the
+whole catalog that is reloaded only when the stamp moves.
+"""
+import bisect
+import hashlib
+import threading
+import time
+from functools import wraps
+from flask import current_app, request, make_response
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from database import db
+from services.compression import matching_etag, mark_precompressible, precompressed_response
+from models.class_model import Class
+from models.subject import Subject
+from models.game import Game
+from models.catalog_version import CatalogVersion
+
+CATALOG_MODELS = (Class, Subject, Game)
+
+_lock = threading.Lock()
+_cached_version = None
+_checked_at = 0.0
+
+def _touches_catalog(session):
+    for obj in session.new:
+        if isinstance(obj, CATALOG_MODELS):
+            return True
+    for obj in session.deleted:
+        if isinstance(obj, CATALOG_MODELS):
+            return True
+    for obj in session.dirty:
+        if isinstance(obj, CATALOG_MODELS) and session.is_modified(obj, include_collections=False):
+            return True
+    return False
+
+@event.listens_for(Session, 'before_flush')
+def _note_catalog_changes(session, flush_context, instances):
+    if _touches_catalog(session):
+        session.info['catalog_pending'] = True
+
+@event.listens_for(Session, 'after_flush')
+def _bump_catalog_version(session, flush_context):
+    # Bumped in the same transaction as the change, so every process sees both or neither
+    if session.info.pop('catalog_pending', False):
+        table = CatalogVersion.__table__
+        session.connection().execute(
+            table.update().where(table.c.id == CatalogVersion.SINGLETON_ID).values(
+                version=table.c.version + 1,
+                updated_at=db.func.now()
+            )
+        )
+        session.info['catalog_changed'] = True
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_local_version(session):
+    if session.info.pop('catalog_changed', False):
+        invalidate_version()
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_catalog_flags(session):
+    session.info.pop('catalog_pending', None)
+    session.info.pop('catalog_changed', None)
+
+def invalidate_version():
+    """Force the next current_version() call to re-read the stamp"""
+    global _checked_at
+    with _lock:
+        _checked_at = 0.0
+
+def current_version():
+    """Catalog version, re-read from the database at most every CATALOG_VERSION_TTL seconds"""
+    global _cached_version, _checked_at
+    ttl = current_app.config.get('CATALOG_VERSION_TTL', 1.0)
+    with _lock:
+        if _cached_version is not None and time.monotonic() - _checked_at < ttl:
+            return _cached_version
+
+    query = db.select(CatalogVersion.version).where(CatalogVersion.id == CatalogVersion.SINGLETON_ID)
+    session = db.session()
+    if session.in_transaction():
+        # Reuse the request's connection: checking out a second one per request can exhaust the
+        # pool, and on SQLite it would queue for a write lock this transaction may hold
+        version = session.execute(query).scalar() or 0
+    else:
+        # Own connection, so no session transaction is left open by a plain read
+        with db.engine.connect() as connection:
+            connection.execution_options(sqlite_begin='DEFERRED')
+            version = connection.execute(query).scalar() or 0
+
+    with _lock:
+        _cached_version = version
+        _checked_at = time.monotonic()
+    return version
+
+def catalog_etag_for(version):
+    """Strong ETag for the current request URL at a catalog version"""
+    digest = hashlib.sha1(request.full_path.encode('utf-8')).hexdigest()[:16]
+    return f'catalog-{version}-{digest}'
+
+def catalog_etag(view):
+    """Answer If-None-Match with 304 for endpoints whose payload depends only on the catalog"""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        # Read the version before the handler: a change in between only costs a refetch
+        etag = catalog_etag_for(current_version())
+        matched = matching_etag(request.if_none_match, etag)
+        if matched:
+            response = make_response('', 304)
+            response.set_etag(matched)
+            response.headers['Cache-Control'] = 'no-cache'
+            return response
+
+        # Compressed once per catalog version and encoding; later requests skip the handler
+        response = precompressed_response(etag)
+        if response is None:
+            response = make_response(view(*args, **kwargs))
+            if response.status_code != 200:
+                return response
+            # The identity tag; compression swaps in the per-encoding tag
+            response.set_etag(etag)
+            mark_precompressible(response, etag)
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
+    return wrapper
+
+
+class CachedRow:
+    """Read-only stand-in for a catalog row: attribute access plus to_dict()"""
+    __slots__ = ('_data',)
+
+    def __init__(self, data):
+        self._data = data
+
+    def __getattr__(self, name):
+        try:
+            return self._data[name]
+        except KeyError:
+            raise AttributeError(name)
+
+    def to_dict(self):
+        return dict(self._data)
+
+    def __repr__(self):
+        return f'<CachedRow {self._data.get("name")}>'
+
+class CatalogSnapshot:
+    """Every class, subject and game at one catalog version, indexed for the route lookups"""
+
+    def __init__(self, version, classes, subjects, games):
+        self.version = version
+        self.classes = {row.id: row for row in classes}
+        self.subjects = {row.id: row for row in subjects}
+        self.games = {row.id: row for row in games}
+
+        self.active_classes = sorted((row for row in classes if row.is_active), key=lambda row: row.grade_level)
+        self.active_subjects = [row for row in subjects if row.is_active]
+        self.active_games = [row for row in games if row.is_active]
+
+        # Per-subject game lists and counts, grouped once per catalog version
+        self.games_by_subject = {}
+        for row in games:
+            self.games_by_subject.setdefault(row.subject_id, []).append(row)
+        self._games_counts = {subject_id: len(rows) for subject_id, rows in self.games_by_subject.items()}
+
+        self.subjects_by_name = {}
+        for row in subjects:
+            self.subjects_by_name.setdefault(row.name.lower(), row)
+
+        # Sorted (lowercase name, id) pairs: exact and prefix lookups by bisection
+        self._game_names = sorted((row.name.lower(), row.id) for row in self.active_games)
+
+    def class_for(self, class_id):
+        """Class for a client-supplied id (int or numeric string), or None if it is missing or malformed"""
+        try:
+            return self.classes.get(int(class_id))
+        except (TypeError, ValueError):
+            return None
+
+    def games_count(self, subject_id):
+        """Number of games (active or not) attached to a subject"""
+        return self._games_counts.get(subject_id, 0)
+
+    def active_games_for(self, subject_id):
+        return [row for row in self.games_by_subject.get(subject_id, ()) if row.is_active]
+
+    def subject_named(self, name):
+        return self.subjects_by_name.get(name.lower())
+
+    def find_games(self, name, limit=10):
+        """Active games whose name equals or starts with name (case-insensitive), exact matches first"""
+        needle = name.strip().lower()
+        start = bisect.bisect_left(self._game_names, (needle, -1))
+        exact, prefix = [], []
+        for game_name, game_id in self._game_names[start:]:
+            if not game_name.startswith(needle):
+                break
+            (exact if game_name == needle else prefix).append(self.games[game_id])
+        return (exact + prefix)[:limit]
+
+class CatalogCache:
+    """Process-local read-through cache of the catalog, invalidated by the version stamp"""
+
+    def __init__(self):
+        self._snapshot = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        # Stamp and rows come from the same transaction, so the label matches the data
+        version = db.session.query(CatalogVersion.version).filter(
+            CatalogVersion.id == CatalogVersion.SINGLETON_ID
+        ).scalar() or 0
+        classes = [CachedRow(row.to_dict()) for row in Class.query.order_by(Class.id).all()]
+        subjects = [CachedRow(row.to_dict()) for row in Subject.query.order_by(Subject.id).all()]
+        games = [CachedRow(row.to_dict()) for row in Game.query.order_by(Game.id).all()]
+        return CatalogSnapshot(version, classes, subjects, games)
+
+    def snapshot(self):
+        """Current catalog snapshot; reloaded only when the catalog version has changed"""
+        version = current_version()
+        snapshot = self._snapshot
+        # Versions only grow, so a snapshot newer than our cached stamp is still good
+        if snapshot is not None and snapshot.version >= version:
+            return snapshot
+
+        with self._lock:
+            if self._snapshot is None or self._snapshot.version < version:
+                self._snapshot = self._load()
+            return self._snapshot
+
+    def clear(self):
+        with self._lock:
+            self._snapshot = None
+
+# Shared cache instance for the application process
+catalog_cache = CatalogCache()
@@ -0,0 +1,139 @@
+"""
+Response compression for StudyFun Backend
+JSON responses above COMPRESSION_MIN_SIZE bytes are compressed with brotli or
+gzip, whichever the client's Accept-Encoding prefers (brotli only when the
+package is installed). A compressed response gets its own strong ETag (the
+identity tag plus "-br" or "-gzip"). Catalog responses are compressed once per
+catalog version and encoding, then served from memory.
+"""
+import gzip
+import threading
+from collections import OrderedDict
+from flask import current_app, request
+from services.metrics import metrics
+
+try:
+    import brotli
+except ImportError:  # optional dependency
+    brotli = None
+
+ENCODINGS = ('br', 'gzip')
+COMPRESSIBLE_MIMETYPES = {'application/json', 'text/plain', 'text/csv'}
+
+compressed_total = metrics.counter('studyfun_responses_compressed_total',
+                                   'Responses sent compressed', ['encoding'])
+compressed_bytes_saved = metrics.counter('studyfun_compression_bytes_saved_total',
+                                         'Bytes not sent thanks to compression', ['encoding'])
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+def available_encodings():
+    return [encoding for encoding in ENCODINGS if encoding != 'br' or brotli is not None]
+
+def negotiate_encoding():
+    """Best encoding the client accepts, or None for identity"""
+    # Server preference breaks ties, so "gzip, br" still gets brotli
+    best, best_quality = None, 0
+    for encoding in available_encodings():
+        quality = request.accept_encodings[encoding]
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+def compress(data, encoding):
+    config = current_app.config
+    if encoding == 'br':
+        return brotli.compress(data, quality=config.get('COMPRESSION_BROTLI_QUALITY', 5))
+    # mtime=0 keeps the output byte-identical for identical input, as a strong ETag requires
+    return gzip.compress(data, compresslevel=config.get('COMPRESSION_GZIP_LEVEL', 6), mtime=0)
+
+def matching_etag(if_none_match, etag):
+    """The tag in If-None-Match naming any encoding of etag, or None"""
+    for candidate in [etag] + [f'{etag}-{encoding}' for encoding in ENCODINGS]:
+        if if_none_match.contains(candidate):
+            return candidate
+    return None
+
+def _cache_get(key):
+    with _cache_lock:
+        body = _cache.get(key)
+        if body is not None:
+            _cache.move_to_end(key)
+        return body
+
+def _cache_put(key, body):
+    max_size = current_app.config.get('COMPRESSION_CACHE_SIZE', 256)
+    with _cache_lock:
+        _cache[key] = body
+        _cache.move_to_end(key)
+        while len(_cache) > max_size:
+            _cache.popitem(last=False)
+
+def mark_precompressible(response, etag):
+    """Let the compressed body of this response be reused for every request with the same ETag"""
+    response.precompress_key = etag
+
+def precompressed_response(etag):
+    """Cached compressed response for etag in the encoding this client accepts, or None"""
+    if not current_app.config.get('COMPRESSION_ENABLED', True):
+        return None
+    encoding = negotiate_encoding()
+    if encoding is None:
+        return None
+    body = _cache_get((etag, encoding))
+    if body is None:
+        return None
+
+    response = current_app.response_class(body, mimetype='application/json')
+    response.headers['Content-Encoding'] = encoding
+    response.vary.add('Accept-Encoding')
+    response.set_etag(f'{etag}-{encoding}')
+    compressed_total.inc(encoding=encoding)
+    return response
+
+def _compressible(response):
+    if response.direct_passthrough or response.is_streamed:
+        return False
+    if not 200 <= response.status_code < 300 or response.status_code == 204:
+        return False
+    if 'Content-Encoding' in response.headers:
+        return False
+    return response.mimetype in COMPRESSIBLE_MIMETYPES
+
+def compress_response(response):
+    """after_request hook: compress the body if it is large enough and the client accepts it"""
+    config = current_app.config
+    if not config.get('COMPRESSION_ENABLED', True) or not _compressible(response):
+        return response
+
+    size = response.content_length or 0
+    if size < config.get('COMPRESSION_MIN_SIZE', 1024):
+        return response
+
+    # Caches must key on Accept-Encoding even when this client got the identity body
+    response.vary.add('Accept-Encoding')
+    encoding = negotiate_encoding()
+    if encoding is None:
+        return response
+
+    key = getattr(response, 'precompress_key', None)
+    body = _cache_get((key, encoding)) if key else None
+    if body is None:
+        body = compress(response.get_data(), encoding)
+        if len(body) >= size:
+            return response
+        if key:
+            _cache_put((key, encoding), body)
+
+    response.set_data(body)
+    response.headers['Content-Encoding'] = encoding
+    etag, weak = response.get_etag()
+    if etag:
+        response.set_etag(f'{etag}-{encoding}', weak)
+    compressed_total.inc(encoding=encoding)
+    compressed_bytes_saved.inc(size - len(body), encoding=encoding)
+    return response
+
+def init_compression(app):
+    app.after_request(compress_response)
\ No newline at end of file
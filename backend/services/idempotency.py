@@ -0,0 +1,100 @@
+"""
+Idempotent score submission for StudyFun Backend
+A client may send an Idempotency-Key header with POST /api/scores/, or an
+idempotency_key field with each item of POST /api/scores/batch. The key is
+stored with the new score's id in the same transaction as the score. A retry
+with the same key finds it and gets the original score back without a second
+insert. The same key with a different body is refused. Keys are kept for
+IDEMPOTENCY_KEY_TTL_HOURS, then purged.
+"""
+import hashlib
+import json
+import threading
+import time
+from datetime import datetime, timedelta
+from flask import current_app, request
+from database import db
+from models.idempotency_key import IdempotencyKey
+
+IDEMPOTENCY_HEADER = 'Idempotency-Key'
+MAX_KEY_LENGTH = 255
+
+_purge_lock = threading.Lock()
+_last_purge = 0.0
+
+class InvalidIdempotencyKey(ValueError):
+    """Key that is empty, too long or not a string"""
+
+def check_key(key):
+    """key if it is usable, else InvalidIdempotencyKey"""
+    if not isinstance(key, str) or not key.strip() or len(key) > MAX_KEY_LENGTH:
+        raise InvalidIdempotencyKey(f'Idempotency key must be a non-empty string of at most {MAX_KEY_LENGTH} characters')
+    return key
+
+def header_key():
+    """The request's Idempotency-Key header, or None"""
+    key = request.headers.get(IDEMPOTENCY_HEADER)
+    return check_key(key) if key is not None else None
+
+def fingerprint(data):
+    """Hash of a submission body, ignoring the key itself"""
+    body = {name: value for name, value in data.items() if name != 'idempotency_key'}
+    return hashlib.sha256(json.dumps(body, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+def _cutoff():
+    return datetime.utcnow() - timedelta(hours=current_app.config.get('IDEMPOTENCY_KEY_TTL_HOURS', 24))
+
+def lookup(user_id, keys):
+    """Unexpired keys among keys for user_id, as {key: IdempotencyKey}"""
+    if not keys:
+        return {}
+    rows = IdempotencyKey.query.filter(
+        IdempotencyKey.user_id == user_id,
+        IdempotencyKey.key.in_(set(keys)),
+        IdempotencyKey.created_at >= _cutoff()
+    ).all()
+    return {row.key: row for row in rows}
+
+def remember(user_id, key, request_hash, score_id):
+    """Store a key for a flushed score inside the caller's transaction; flush it last, it may conflict"""
+    # An expired row that has not been purged yet gives way; a live one makes the insert fail
+    IdempotencyKey.query.filter(
+        IdempotencyKey.user_id == user_id,
+        IdempotencyKey.key == key,
+        IdempotencyKey.created_at < _cutoff()
+    ).delete(synchronize_session=False)
+    row = IdempotencyKey(user_id=user_id, key=key, request_hash=request_hash, score_id=score_id)
+    db.session.add(row)
+    return row
+
+def remember_many(user_id, entries):
+    """Store (key, request_hash, score_id) entries for one user with one DELETE and one INSERT; may conflict"""
+    if not entries:
+        return
+    IdempotencyKey.query.filter(
+        IdempotencyKey.user_id == user_id,
+        IdempotencyKey.key.in_([key for key, _, _ in entries]),
+        IdempotencyKey.created_at < _cutoff()
+    ).delete(synchronize_session=False)
+    now = datetime.utcnow()
+    db.session.execute(IdempotencyKey.__table__.insert(), [
+        {'user_id': user_id, 'key': key, 'request_hash': request_hash, 'score_id': score_id, 'created_at': now}
+        for key, request_hash, score_id in entries
+    ])
+
+def purge_expired():
+    """Delete expired keys, at most once per IDEMPOTENCY_PURGE_INTERVAL seconds per process"""
+    global _last_purge
+    interval = current_app.config.get('IDEMPOTENCY_PURGE_INTERVAL', 300)
+    with _purge_lock:
+        now = time.monotonic()
+        if _last_purge and now - _last_purge < interval:
+            return 0
+        _last_purge = now
+    try:
+        deleted = IdempotencyKey.query.filter(IdempotencyKey.created_at < _cutoff()).delete(synchronize_session=False)
+        db.session.commit()
+        return deleted
+    except Exception:
+        db.session.rollback()
+        return 0
\ No newline at end of file
@@ -0,0 +1,103 @@
+"""
+User identity caching for StudyFun Backend
+Access tokens carry one extra claim, the user's token version. Handlers read
+the current user (active flag, selected class) from a small process-local LRU
+of user snapshots instead of querying the users table on every request. A committed change to a User row evicts it from this process;
+USER_CACHE_TTL bounds how long other processes can serve a stale copy.
+Raising a user's token_version revokes every token issued before the change.
+"""
+import threading
+import time
+from collections import OrderedDict
+from flask import current_app
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from database import db
+from models.user import User
+from services.catalog import CachedRow
+
+def identity_claims(user):
+    """Extra JWT claims for a user (ORM row or cached snapshot)"""
+    # Only the version: anything else in a token goes stale until the token expires
+    return {'token_version': user.token_version or 0}
+
+@event.listens_for(Session, 'before_flush')
+def _note_user_changes(session, flush_context, instances):
+    changed = {obj.id for obj in session.dirty if isinstance(obj, User) and obj.id is not None}
+    changed.update(obj.id for obj in session.deleted if isinstance(obj, User))
+    if changed:
+        session.info.setdefault('users_changed', set()).update(changed)
+
+@event.listens_for(Session, 'after_commit')
+def _evict_changed_users(session):
+    user_ids = session.info.pop('users_changed', None)
+    if user_ids:
+        user_cache.invalidate(user_ids)
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_user_changes(session):
+    session.info.pop('users_changed', None)
+
+class CachedUser(CachedRow):
+    """Read-only snapshot of a User row; to_dict() matches User.to_dict()"""
+    __slots__ = ('token_version', 'loaded_at')
+
+    def __init__(self, user):
+        super().__init__(user.to_dict())
+        self.token_version = user.token_version or 0
+        self.loaded_at = time.monotonic()
+
+class UserCache:
+    """Bounded LRU of user snapshots keyed by user id"""
+
+    def __init__(self):
+        self._users = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id):
+        """Snapshot of the user, or None if no such user exists"""
+        try:
+            user_id = int(user_id)
+        except (TypeError, ValueError):
+            return None
+
+        ttl = current_app.config.get('USER_CACHE_TTL', 60.0)
+        with self._lock:
+            cached = self._users.get(user_id)
+            if cached is not None and time.monotonic() - cached.loaded_at < ttl:
+                self._users.move_to_end(user_id)
+                return cached
+
+        user = db.session.get(User, user_id)
+        if user is None:
+            self.invalidate([user_id])
+            return None
+
+        cached = CachedUser(user)
+        max_size = current_app.config.get('USER_CACHE_SIZE', 1024)
+        with self._lock:
+            self._users[user_id] = cached
+            self._users.move_to_end(user_id)
+            while len(self._users) > max_size:
+                self._users.popitem(last=False)
+        return cached
+
+    def invalidate(self, user_ids):
+        with self._lock:
+            for user_id in user_ids:
+                self._users.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._users.clear()
+
+# Shared cache instance for the application process
+user_cache = UserCache()
+
+def is_token_revoked(jwt_header, jwt_payload):
+    """Reject tokens for missing or deactivated users, or issued before a token_version bump"""
+    user = user_cache.get(jwt_payload.get('sub'))
+    if user is None or not user.is_active:
+        return True
+    # Tokens issued before claims existed count as version 0
+    return jwt_payload.get('token_version', 0) != user.token_version
\ No newline at end of file
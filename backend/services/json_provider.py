@@ -0,0 +1,69 @@
+"""
+JSON serialization for StudyFun Backend
+A Flask JSON provider that encodes responses with orjson when it is installed
+and falls back to the standard library otherwise. Both backends write
+datetimes as ISO 8601 strings (the format to_dict() used to build by hand), so
+models hand datetime objects straight to the encoder.
+"""
+import json
+from datetime import date, datetime
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+JSON_BACKENDS = ('auto', 'orjson', 'stdlib')
+
+class StudyFunJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider; JSON_BACKEND picks 'orjson', 'stdlib' or 'auto' (orjson if importable)"""
+
+    def __init__(self, app):
+        super().__init__(app)
+        backend = app.config.get('JSON_BACKEND', 'auto')
+        if backend not in JSON_BACKENDS:
+            raise ValueError(f"JSON_BACKEND must be one of {', '.join(JSON_BACKENDS)}, got '{backend}'")
+        if backend == 'orjson' and orjson is None:
+            raise RuntimeError("JSON_BACKEND is 'orjson' but orjson is not installed")
+        self.backend = 'orjson' if backend != 'stdlib' and orjson is not None else 'stdlib'
+
+    @staticmethod
+    def default(o):
+        # Flask's default writes dates as HTTP dates; the API has always used ISO 8601
+        if isinstance(o, (datetime, date)):
+            return o.isoformat()
+        return DefaultJSONProvider.default(o)
+
+    def _orjson_options(self, indent=False):
+        options = orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            options |= orjson.OPT_SORT_KEYS
+        if indent:
+            options |= orjson.OPT_INDENT_2
+        return options
+
+    def dumps(self, obj, **kwargs):
+        if self.backend == 'orjson' and not kwargs:
+            return orjson.dumps(obj, default=self.default, option=self._orjson_options()).decode('utf-8')
+        kwargs.setdefault('default', self.default)
+        kwargs.setdefault('ensure_ascii', self.ensure_ascii)
+        kwargs.setdefault('sort_keys', self.sort_keys)
+        return json.dumps(obj, **kwargs)
+
+    def loads(self, s, **kwargs):
+        if self.backend == 'orjson' and not kwargs:
+            return orjson.loads(s)
+        return json.loads(s, **kwargs)
+
+    def response(self, *args, **kwargs):
+        if self.backend != 'orjson':
+            return super().response(*args, **kwargs)
+
+        obj = self._prepare_response_obj(args, kwargs)
+        # Same rule as Flask's provider: pretty-print in debug mode unless compact is forced
+        indent = self.compact is False or (self.compact is None and self._app.debug)
+        body = orjson.dumps(obj, default=self.default, option=self._orjson_options(indent))
+        if indent:
+            body += b'\n'
+        return self._app.response_class(body, mimetype=self.mimetype)
\ No newline at end of file
@@ -0,0 +1,104 @@
+"""
+Keyset pagination for StudyFun Backend
+A listing is ordered by a unique tuple of columns. Each page ends with an
+opaque cursor holding the last row's sort key (plus how many rows came
+before it and the last row's rank, so ranks carry across pages). The next page asks the database for
+rows strictly after that key, so deep pages cost the same as the first one
+and rows inserted meanwhile never shift or duplicate a page.
+"""
+import base64
+import json
+from datetime import datetime
+from flask import current_app, request
+from sqlalchemy import and_, or_
+
+class InvalidCursor(ValueError):
+    """Cursor that was not issued for this listing"""
+
+def page_size(default):
+    """The request's limit, clamped to 1..PAGE_MAX_SIZE"""
+    limit = request.args.get('limit', type=int, default=default)
+    return max(1, min(limit, current_app.config.get('PAGE_MAX_SIZE', 100)))
+
+def encode_cursor(scope, key, position, last=None):
+    """Opaque token for the page after key; scope ties it to one listing"""
+    payload = {
+        's': scope,
+        'k': [{'dt': value.isoformat()} if isinstance(value, datetime) else value for value in key],
+        'n': position
+    }
+    if last is not None:
+        # Tie value and rank of the last row, so a tie spanning two pages keeps one rank
+        payload['t'], payload['r'] = last
+    raw = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+def decode_cursor(token, scope):
+    """(key, position, (tie, rank) of the last row or None) from a cursor for this scope; raises InvalidCursor"""
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        payload = json.loads(raw)
+        if payload['s'] != scope:
+            raise InvalidCursor('cursor belongs to a different listing')
+        key = [datetime.fromisoformat(value['dt']) if isinstance(value, dict) else value
+               for value in payload['k']]
+        last = (payload['t'], int(payload['r'])) if 'r' in payload else None
+        return key, int(payload['n']), last
+    except InvalidCursor:
+        raise
+    except (ValueError, TypeError, KeyError):
+        raise InvalidCursor('cursor is malformed')
+
+def after_key(order, key):
+    """
+    Filter for rows that sort after key
+
+    order is a list of (column, descending) pairs matching the query's ORDER BY.
+    """
+    if len(order) != len(key):
+        raise InvalidCursor('cursor is malformed')
+    clauses = []
+    for i, (column, descending) in enumerate(order):
+        earlier = [order[j][0] == key[j] for j in range(i)]
+        clauses.append(and_(*earlier, column < key[i] if descending else column > key[i]))
+    # The redundant bound on the leading column lets the database seek instead of filtering
+    leading, descending = order[0]
+    return and_(leading <= key[0] if descending else leading >= key[0], or_(*clauses))
+
+def keyset_page(query, order, key_of, scope, limit, tie_of=None):
+    """
+    One page of query after the request's cursor
+
+    order lists (column, descending) pairs that make a unique sort key, and key_of
+    maps a result row to those values. Returns (rows, 1-based rank of each row,
+    next cursor or None when this is the last page). Rows are numbered in order,
+    unless tie_of maps a row to the value it is ranked on: then rows level on it
+    share the rank of the first of them (competition ranking, 1, 2, 2, 4).
+    """
+    position = 0
+    last = None
+    cursor = request.args.get('cursor')
+    if cursor:
+        key, position, last = decode_cursor(cursor, scope)
+        query = query.filter(after_key(order, key))
+
+    # One extra row tells whether another page exists
+    rows = query.order_by(*[column.desc() if descending else column.asc()
+                            for column, descending in order]).limit(limit + 1).all()
+    more = len(rows) > limit
+    rows = rows[:limit]
+
+    ranks = []
+    for i, row in enumerate(rows):
+        rank = position + i + 1
+        if tie_of is not None:
+            tie = tie_of(row)
+            if last is not None and last[0] == tie:
+                rank = last[1]
+            last = (tie, rank)
+        ranks.append(rank)
+
+    next_cursor = None
+    if more:
+        next_cursor = encode_cursor(scope, key_of(rows[-1]), position + limit, last if tie_of else None)
+    return rows, ranks, next_cursor
\ No newline at end of file
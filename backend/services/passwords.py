@@ -0,0 +1,103 @@
+"""
+Password hashing for StudyFun Backend
+PBKDF2 hashing and verification are CPU-bound and slow by design. They run in
+a small process pool so a burst of logins cannot occupy every request thread
+and starve other endpoints. At most PASSWORD_HASH_MAX_PENDING operations may
+be queued or running at once. A caller that cannot get a slot within
+PASSWORD_HASH_QUEUE_TIMEOUT seconds gets PasswordHasherBusy, which the auth
+routes turn into a 503.
+"""
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from flask import current_app, has_app_context
+from werkzeug.security import generate_password_hash, check_password_hash
+from services.metrics import metrics
+
+DEFAULTS = {
+    'PASSWORD_HASH_WORKERS': max(1, (os.cpu_count() or 2) // 2),
+    'PASSWORD_HASH_MAX_PENDING': 64,
+    'PASSWORD_HASH_QUEUE_TIMEOUT': 10.0,
+}
+
+queue_depth = metrics.gauge('studyfun_password_hash_queue_depth',
+                            'Password hash operations waiting for or holding a pool slot')
+hash_seconds = metrics.histogram('studyfun_password_hash_seconds',
+                                 'Time from request to result of a password hash operation', ['operation'])
+rejected_total = metrics.counter('studyfun_password_hash_rejected_total',
+                                 'Password hash operations refused because the pool was saturated')
+
+class PasswordHasherBusy(Exception):
+    """Raised when no hashing slot frees up within PASSWORD_HASH_QUEUE_TIMEOUT"""
+
+def _setting(name):
+    if has_app_context():
+        return current_app.config.get(name, DEFAULTS[name])
+    return DEFAULTS[name]
+
+class PasswordHasher:
+    """Bounded process pool for werkzeug password hashing; workers=0 hashes inline"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._executor = None
+        self._slots = None
+        self._workers = None
+
+    def _pool(self):
+        with self._lock:
+            if self._slots is None:
+                self._workers = _setting('PASSWORD_HASH_WORKERS')
+                self._slots = threading.BoundedSemaphore(_setting('PASSWORD_HASH_MAX_PENDING'))
+            if self._workers and self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self._workers)
+            return self._executor, self._slots
+
+    def _run(self, operation, fn, *args):
+        executor, slots = self._pool()
+        started = time.perf_counter()
+        queue_depth.inc()
+        try:
+            if not slots.acquire(timeout=_setting('PASSWORD_HASH_QUEUE_TIMEOUT')):
+                rejected_total.inc()
+                raise PasswordHasherBusy('Too many concurrent password operations')
+            try:
+                if executor is None:
+                    return fn(*args)
+                try:
+                    return executor.submit(fn, *args).result()
+                except BrokenProcessPool:
+                    # A worker died (e.g. OOM-killed); start a fresh pool next time and answer inline
+                    self._reset(executor)
+                    return fn(*args)
+            finally:
+                slots.release()
+        finally:
+            queue_depth.dec()
+            hash_seconds.observe(time.perf_counter() - started, operation=operation)
+
+    def _reset(self, executor):
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        executor.shutdown(wait=False)
+
+    def hash(self, password):
+        """werkzeug password hash of password"""
+        return self._run('hash', generate_password_hash, password)
+
+    def verify(self, password_hash, password):
+        """True if password matches password_hash"""
+        return self._run('verify', check_password_hash, password_hash, password)
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+            self._slots = None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+# Shared hasher for the application process
+password_hasher = PasswordHasher()
\ No newline at end of file
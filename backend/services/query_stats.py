@@ -0,0 +1,127 @@
+"""
+Per-request SQL instrumentation for StudyFun Backend
+before/after_cursor_execute hooks on the app's engine count the statements each
+request sends and the time spent waiting on them. Every request observes both
+in per-endpoint histograms on GET /api/metrics. In debug mode (or with
+QUERY_STATS_HEADERS) responses also carry X-Query-Count and X-Query-Time-Ms.
+
+Statements slower than SLOW_QUERY_MS are logged with their duration to the
+'studyfun.slow_queries' logger (and SLOW_QUERY_LOG_FILE when set). Bound
+parameters (passwords, emails, tokens) are never logged, only how many sets
+an executemany carried. A statement repeated QUERY_REPEAT_WARN times in one request, the shape
+of an N+1 loop, is logged once per request and counted.
+"""
+import logging
+import os
+import re
+import time
+from flask import g, has_request_context, request
+from sqlalchemy import event
+from database import db
+from services.metrics import metrics
+
+QUERY_COUNT_HEADER = 'X-Query-Count'
+QUERY_TIME_HEADER = 'X-Query-Time-Ms'
+
+request_queries = metrics.histogram('studyfun_request_queries', 'SQL statements executed per request', ['endpoint'],
+                                    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89, 144))
+request_sql_seconds = metrics.histogram('studyfun_request_sql_seconds', 'Time spent in SQL per request', ['endpoint'],
+                                        buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0))
+slow_queries_total = metrics.counter('studyfun_slow_queries_total',
+                                     'Statements slower than SLOW_QUERY_MS', ['endpoint'])
+repeated_queries_total = metrics.counter('studyfun_repeated_queries_total',
+                                         'Requests that repeated one statement QUERY_REPEAT_WARN times', ['endpoint'])
+
+slow_query_log = logging.getLogger('studyfun.slow_queries')
+
+class QueryStats:
+    """Statements and SQL time of one request"""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.statements = {}
+
+def _endpoint():
+    if not has_request_context():
+        return 'background'
+    # Unmatched URLs share one label so scanners cannot grow the metric without bound
+    return request.endpoint or 'unmatched'
+
+def _current():
+    return g.get('query_stats') if has_request_context() else None
+
+def _one_line(statement):
+    return re.sub(r'\s+', ' ', statement).strip()
+
+def _log_slow(seconds, statement, parameters, executemany):
+    endpoint = _endpoint()
+    slow_queries_total.inc(endpoint=endpoint)
+    rows = f' x{len(parameters)}' if executemany else ''
+    slow_query_log.warning('slow query %.1fms [%s] %s%s', seconds * 1000, endpoint, _one_line(statement), rows)
+
+def _attach(engine, slow_seconds, repeat_warn):
+    @event.listens_for(engine, 'before_cursor_execute')
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        context._query_started = time.perf_counter()
+
+    @event.listens_for(engine, 'after_cursor_execute')
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        seconds = time.perf_counter() - context._query_started
+        stats = _current()
+        if stats is not None:
+            stats.count += 1
+            stats.seconds += seconds
+            if repeat_warn:
+                seen = stats.statements.get(statement, 0) + 1
+                stats.statements[statement] = seen
+                if seen == repeat_warn:
+                    repeated_queries_total.inc(endpoint=_endpoint())
+                    slow_query_log.warning('statement repeated %d times in one request (N+1?) [%s] %s',
+                                           seen, _endpoint(), _one_line(statement))
+        if slow_seconds is not None and seconds >= slow_seconds:
+            _log_slow(seconds, statement, parameters, executemany)
+
+def _add_headers(response):
+    stats = _current()
+    # A streamed body runs its queries after the headers are sent; only the histograms see them
+    if stats is not None and g.get('query_stats_headers') and not response.is_streamed:
+        response.headers[QUERY_COUNT_HEADER] = str(stats.count)
+        response.headers[QUERY_TIME_HEADER] = f'{stats.seconds * 1000:.2f}'
+    return response
+
+def _finish_request(exception=None):
+    # Teardown runs after streamed bodies are drained, so their queries are counted too
+    stats = g.pop('query_stats', None)
+    if stats is not None:
+        endpoint = _endpoint()
+        request_queries.observe(stats.count, endpoint=endpoint)
+        request_sql_seconds.observe(stats.seconds, endpoint=endpoint)
+
+def init_query_stats(app):
+    """Instrument app's engine and record per-request query statistics"""
+    if not app.config.get('QUERY_STATS_ENABLED', True):
+        return
+
+    slow_ms = app.config.get('SLOW_QUERY_MS')
+    log_file = app.config.get('SLOW_QUERY_LOG_FILE')
+    if log_file:
+        log_file = os.path.abspath(log_file)
+    if log_file and not any(getattr(handler, 'baseFilename', None) == log_file for handler in slow_query_log.handlers):
+        handler = logging.FileHandler(log_file, encoding='utf-8')
+        handler.setFormatter(logging.Formatter('%(asctime)s %(process)d %(message)s'))
+        slow_query_log.addHandler(handler)
+
+    with app.app_context():
+        _attach(db.engine, slow_ms / 1000.0 if slow_ms else None, app.config.get('QUERY_REPEAT_WARN', 10))
+
+    headers = app.config.get('QUERY_STATS_HEADERS')
+
+    @app.before_request
+    def start_request():
+        g.query_stats = QueryStats()
+        # Debug mode may be switched on after create_app (app.run(debug=True)), so decide per request
+        g.query_stats_headers = app.debug if headers is None else headers
+
+    app.after_request(_add_headers)
+    app.teardown_request(_finish_request)
\ No newline at end of file
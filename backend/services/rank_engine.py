@@ -0,0 +1,257 @@
+"""
+In-memory rank engine for StudyFun Backend
+Keeps one order-statistic index per game so "what rank am I" is answered in
+O(log n) instead of a COUNT over the leaderboard. Players level on a
+percentage (at 0.01 resolution) share a rank, as on GET /api/scores/leaderboard.
+"""
+import threading
+import time
+from flask import current_app
+from database import db
+from models.user_game_best import UserGameBest
+
+# Percentages are bucketed at 0.01 resolution: 0.00 .. 100.00
+BUCKETS_PER_PERCENT = 100
+BUCKET_COUNT = 100 * BUCKETS_PER_PERCENT + 1
+
+class FenwickTree:
+    """Binary indexed tree of counts with prefix sums and k-th element search"""
+
+    def __init__(self, size):
+        self.size = size
+        self.tree = [0] * (size + 1)
+        self.total = 0
+        self._top_bit = 1 << (size.bit_length() - 1) if size else 0
+
+    def add(self, index, delta):
+        """Add delta to the count at a 0-based index"""
+        self.total += delta
+        i = index + 1
+        while i <= self.size:
+            self.tree[i] += delta
+            i += i & -i
+
+    def prefix_sum(self, index):
+        """Sum of counts over 0-based indexes [0, index]"""
+        result = 0
+        i = index + 1
+        while i > 0:
+            result += self.tree[i]
+            i -= i & -i
+        return result
+
+    def find_kth(self, k):
+        """Smallest 0-based index whose prefix sum reaches k (k is 1-based)"""
+        position = 0
+        step = self._top_bit
+        while step:
+            nxt = position + step
+            if nxt <= self.size and self.tree[nxt] < k:
+                position = nxt
+                k -= self.tree[nxt]
+            step >>= 1
+        return position
+
+def percentage_bucket(percentage):
+    """A percentage at the engine's resolution; players in the same bucket are tied"""
+    value = int(round((percentage or 0.0) * BUCKETS_PER_PERCENT))
+    return max(0, min(BUCKET_COUNT - 1, value))
+
+def _bucket_for(percentage):
+    """Map a percentage to a tree slot; slot 0 holds the highest scores"""
+    return BUCKET_COUNT - 1 - percentage_bucket(percentage)
+
+def _percentage_for(slot):
+    return (BUCKET_COUNT - 1 - slot) / BUCKETS_PER_PERCENT
+
+class TieBucket:
+    """Players level on one score, in the order they reached it, with O(log n) position lookups"""
+
+    def __init__(self):
+        self.users = []  # arrival order; None where a player has since moved up
+        self.arrival = {}  # user id -> index in users
+        self.present = FenwickTree(0)
+
+    def __len__(self):
+        return len(self.arrival)
+
+    def append(self, user_id):
+        if len(self.users) == self.present.size:
+            self._compact()
+        self.arrival[user_id] = len(self.users)
+        self.present.add(len(self.users), 1)
+        self.users.append(user_id)
+
+    def remove(self, user_id):
+        index = self.arrival.pop(user_id)
+        self.users[index] = None
+        self.present.add(index, -1)
+
+    def index(self, user_id):
+        """0-based position among the players still in the bucket"""
+        index = self.arrival[user_id]
+        return self.present.prefix_sum(index - 1) if index else 0
+
+    def __getitem__(self, position):
+        return self.users[self.present.find_kth(position + 1)]
+
+    def _compact(self):
+        # Drop departed players and double the capacity; amortised O(1) per append
+        self.users = [user_id for user_id in self.users if user_id is not None]
+        self.arrival = {user_id: index for index, user_id in enumerate(self.users)}
+        self.present = FenwickTree(max(8, 2 * len(self.users)))
+        for index in range(len(self.users)):
+            self.present.add(index, 1)
+
+class GameRankIndex:
+    """Order statistics over the best percentage of every player of one game"""
+
+    def __init__(self):
+        self.tree = FenwickTree(BUCKET_COUNT)
+        self.user_slot = {}
+        self.slot_users = {}  # slot -> user ids, in the order they reached that score
+        self.loaded_at = time.monotonic()
+
+    def update(self, user_id, percentage):
+        """Record a user's best; lower values than the current best are ignored"""
+        slot = _bucket_for(percentage)
+        current = self.user_slot.get(user_id)
+        if current is not None:
+            if slot >= current:
+                return
+            self.slot_users[current].remove(user_id)
+            if not self.slot_users[current]:
+                del self.slot_users[current]
+            self.tree.add(current, -1)
+
+        self.user_slot[user_id] = slot
+        bucket = self.slot_users.get(slot)
+        if bucket is None:
+            bucket = self.slot_users[slot] = TieBucket()
+        bucket.append(user_id)
+        self.tree.add(slot, 1)
+
+    @property
+    def total(self):
+        return self.tree.total
+
+    def _players_above(self, slot):
+        return self.tree.prefix_sum(slot - 1) if slot > 0 else 0
+
+    def rank_of(self, user_id):
+        """Competition rank (ties share a rank) or None if the user has not played"""
+        slot = self.user_slot.get(user_id)
+        if slot is None:
+            return None
+        return self._players_above(slot) + 1
+
+    def position_of(self, user_id):
+        """1-based position in the strict leaderboard order"""
+        slot = self.user_slot[user_id]
+        return self._players_above(slot) + self.slot_users[slot].index(user_id) + 1
+
+    def entry_at(self, position):
+        """(user_id, rank, percentage) at a 1-based leaderboard position"""
+        slot = self.tree.find_kth(position)
+        above = self._players_above(slot)
+        user_id = self.slot_users[slot][position - above - 1]
+        return user_id, above + 1, _percentage_for(slot)
+
+    def neighbours(self, user_id, radius):
+        """Entries within radius positions of the user, best first"""
+        position = self.position_of(user_id)
+        first = max(1, position - radius)
+        last = min(self.total, position + radius)
+        return [self.entry_at(p) for p in range(first, last + 1)]
+
+class RankEngine:
+    """Process-local registry of per-game rank indexes, seeded lazily from user_game_best"""
+
+    def __init__(self):
+        self._games = {}
+        self._seeding = {}  # game id -> (done event, bests recorded while the seed query runs)
+        self._lock = threading.RLock()
+
+    def _refresh_seconds(self):
+        return current_app.config.get('RANK_ENGINE_REFRESH_SECONDS', 300)
+
+    def _load(self, game_id):
+        rows = db.session.query(UserGameBest.user_id, UserGameBest.best_percentage).filter(
+            UserGameBest.game_id == game_id
+        ).order_by(
+            UserGameBest.best_percentage.desc(),
+            UserGameBest.best_achieved_at.asc(),
+            UserGameBest.user_id.asc()
+        ).all()
+        index = GameRankIndex()
+        for user_id, best_percentage in rows:
+            index.update(user_id, best_percentage)
+        return index
+
+    def get(self, game_id):
+        """Rank index for a game, (re)seeding it when missing or older than the refresh window"""
+        refresh_seconds = self._refresh_seconds()
+        while True:
+            with self._lock:
+                index = self._games.get(game_id)
+                if index is not None and time.monotonic() - index.loaded_at <= refresh_seconds:
+                    return index
+                seeding = self._seeding.get(game_id)
+                if seeding is None:
+                    seeding = self._seeding[game_id] = (threading.Event(), [])
+                    break
+                if index is not None:
+                    # Another thread is reseeding; the previous index serves meanwhile
+                    return index
+            seeding[0].wait()
+
+        # The seed query runs without the lock, so other games (and this one's writers) carry on
+        try:
+            index = self._load(game_id)
+        except Exception:
+            with self._lock:
+                del self._seeding[game_id]
+            seeding[0].set()
+            raise
+
+        with self._lock:
+            for user_id, best_percentage in seeding[1]:
+                index.update(user_id, best_percentage)
+            self._games[game_id] = index
+            del self._seeding[game_id]
+        seeding[0].set()
+        return index
+
+    def record(self, game_id, user_id, best_percentage):
+        """Apply a committed best score; games not yet loaded pick it up when seeded"""
+        with self._lock:
+            index = self._games.get(game_id)
+            if index is not None:
+                index.update(user_id, best_percentage)
+            seeding = self._seeding.get(game_id)
+            if seeding is not None:
+                # The seed query may have read the table before this commit
+                seeding[1].append((user_id, best_percentage))
+
+    def standing(self, game_id, user_id, radius=2):
+        """Rank, player count, percentile and neighbouring entries for a user"""
+        index = self.get(game_id)
+        with self._lock:
+            rank = index.rank_of(user_id)
+            total = index.total
+            if rank is None:
+                return {'rank': None, 'total_players': total, 'percentile': None, 'neighbours': []}
+            return {
+                'rank': rank,
+                'total_players': total,
+                # Share of players this user is level with or ahead of
+                'percentile': round((total - rank + 1) / total * 100, 2),
+                'neighbours': index.neighbours(user_id, radius)
+            }
+
+    def clear(self):
+        with self._lock:
+            self._games.clear()
+
+# Shared engine instance for the application process
+rank_engine = RankEngine()
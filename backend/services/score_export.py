@@ -0,0 +1,94 @@
+"""
+Score history export for StudyFun Backend
+Streams rows of the scores table as NDJSON or CSV. The query is read with
+yield_per (a server-side cursor on PostgreSQL), and rows are written out one
+batch at a time, so memory use does not grow with the size of the export.
+"""
+import csv
+import io
+from flask import current_app
+from database import db
+from models.score import Score
+from models.user import User
+
+EXPORT_FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv'
+}
+
+EXPORT_FIELDS = (
+    'id', 'user_id', 'username', 'class_id', 'game_id', 'game_name', 'subject_id',
+    'score', 'max_score', 'percentage', 'time_taken', 'attempts', 'is_completed', 'created_at'
+)
+
+def export_query(user_id=None, class_id=None, game_id=None, start=None, end=None):
+    """Score rows (as plain tuples) matching the filters, in id order; end is exclusive"""
+    query = db.session.query(
+        Score.id, Score.user_id, User.username, User.selected_class_id, Score.game_id,
+        Score.score, Score.max_score, Score.percentage, Score.time_taken,
+        Score.attempts, Score.is_completed, Score.created_at
+    ).join(User, User.id == Score.user_id)
+
+    if user_id is not None:
+        query = query.filter(Score.user_id == user_id)
+    if class_id is not None:
+        query = query.filter(User.selected_class_id == class_id)
+    if game_id is not None:
+        query = query.filter(Score.game_id == game_id)
+    if start is not None:
+        query = query.filter(Score.created_at >= start)
+    if end is not None:
+        query = query.filter(Score.created_at < end)
+
+    # Primary key order streams straight off the table without a sort
+    return query.order_by(Score.id)
+
+def _records(query, catalog, batch_size):
+    """Yield lists of up to batch_size export records, with game names from the catalog"""
+    batch = []
+    for (score_id, user_id, username, class_id, game_id, score, max_score, percentage,
+         time_taken, attempts, is_completed, created_at) in query.yield_per(batch_size):
+        game = catalog.games.get(game_id)
+        batch.append({
+            'id': score_id,
+            'user_id': user_id,
+            'username': username,
+            'class_id': class_id,
+            'game_id': game_id,
+            'game_name': game.name if game else None,
+            'subject_id': game.subject_id if game else None,
+            'score': score,
+            'max_score': max_score,
+            'percentage': round(percentage, 2),
+            'time_taken': time_taken,
+            'attempts': attempts,
+            'is_completed': is_completed,
+            'created_at': created_at
+        })
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def stream_ndjson(query, catalog, batch_size):
+    """One JSON object per line"""
+    dumps = current_app.json.dumps
+    for batch in _records(query, catalog, batch_size):
+        yield ''.join(dumps(record) + '\n' for record in batch)
+
+def stream_csv(query, catalog, batch_size):
+    """Header row, then one row per score (timestamps in ISO 8601)"""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS)
+    writer.writeheader()
+    for batch in _records(query, catalog, batch_size):
+        for record in batch:
+            record['created_at'] = record['created_at'].isoformat() if record['created_at'] else None
+        writer.writerows(batch)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        # Header of an empty export
+        yield buffer.getvalue()
\ No newline at end of file
@@ -0,0 +1,427 @@
+"""
+Write-behind score ingestion for StudyFun Backend
+With SCORE_INGEST_MODE=buffered, POST /api/scores/ hands each validated score to
+a per-process buffer instead of committing it. A flusher thread commits the
+buffer in groups: every SCORE_INGEST_FLUSH_MS milliseconds, or sooner once
+SCORE_INGEST_BATCH_SIZE scores are waiting. That costs one transaction (one
+fsync) per group rather than per score. SCORE_INGEST_DURABILITY picks when the
+client gets its answer:
+
+- 'flush': after the group containing its score has committed (201, as before)
+- 'log':   as soon as the score is fsynced to an append-only log (202). After a
+           crash, scores in the log past the committed checkpoint are replayed.
+
+Each process appends to its own log file (ingest-<n>.log in SCORE_INGEST_LOG_DIR)
+and holds an exclusive lock on it. A process that finds an unlocked log left
+behind by a dead one takes it over and replays it.
+"""
+import atexit
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from datetime import datetime
+from sqlalchemy.exc import DataError, IntegrityError
+from database import db, begin_write
+from models.score import Score
+from models.user_game_best import UserGameBest
+from models.user_stats import UserStats
+from models.ingest_checkpoint import IngestCheckpoint
+from services.idempotency import remember
+from services.metrics import metrics
+from services.rank_engine import rank_engine
+
+try:
+    import fcntl
+except ImportError:  # Windows: one process per log directory
+    fcntl = None
+
+INGEST_DURABILITY = ('flush', 'log')
+# Only these failures are the row's own fault; anything else (a locked or unreachable database) is retried
+DETERMINISTIC_ERRORS = (IntegrityError, DataError)
+RETRY_INITIAL_SECONDS = 0.05
+RETRY_MAX_SECONDS = 5.0
+REPLAY_ATTEMPTS = 10
+
+pending_gauge = metrics.gauge('studyfun_score_ingest_pending', 'Scores buffered and not yet committed')
+flush_seconds = metrics.histogram('studyfun_score_ingest_flush_seconds',
+                                  'Time to commit one group of buffered scores')
+batch_rows = metrics.histogram('studyfun_score_ingest_batch_size', 'Scores committed per group',
+                               buckets=(1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000))
+rejected_total = metrics.counter('studyfun_score_ingest_rejected_total',
+                                 'Scores refused because the ingest buffer was full')
+failed_total = metrics.counter('studyfun_score_ingest_failed_total',
+                               'Buffered scores that could not be committed')
+retries_total = metrics.counter('studyfun_score_ingest_retries_total',
+                                'Group commits retried after a transient database error')
+
+logger = logging.getLogger('studyfun.score_ingest')
+
+class ScoreIngestBusy(Exception):
+    """Raised when the buffer already holds SCORE_INGEST_MAX_PENDING scores"""
+
+class ScoreIngestTimeout(Exception):
+    """Raised when a score is queued but its group did not commit within SCORE_INGEST_ACK_TIMEOUT"""
+
+def ingest_record(user_id, game, data, idempotency_key=None, request_hash=None):
+    """Plain-data form of a validated submission, as buffered and logged"""
+    record = {
+        'user_id': user_id,
+        'game_id': game.id,
+        'subject_id': game.subject_id,
+        'score': data['score'],
+        'max_score': game.max_score,
+        'time_taken': data.get('time_taken'),
+        'is_completed': data.get('is_completed', True),
+        'created_at': datetime.utcnow().isoformat()
+    }
+    if idempotency_key is not None:
+        record['idempotency_key'] = idempotency_key
+        record['request_hash'] = request_hash
+    return record
+
+def _score_from_record(record):
+    score = Score(
+        user_id=record['user_id'],
+        game_id=record['game_id'],
+        score=record['score'],
+        max_score=record['max_score'],
+        time_taken=record['time_taken'],
+        attempts=1,
+        is_completed=record['is_completed']
+    )
+    score.created_at = datetime.fromisoformat(record['created_at'])
+    return score
+
+class IngestLog:
+    """Append-only, fsynced log of acknowledged scores, exclusively locked by its owner"""
+
+    def __init__(self, path):
+        handle = open(path, 'a+', encoding='utf-8')
+        if fcntl is not None:
+            try:
+                fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                handle.close()
+                raise
+        self.path = path
+        self.name = os.path.basename(path)
+        self._handle = handle
+        # Group fsync: one sync covers every record written before it started
+        self._sync_lock = threading.Lock()
+        self._written = 0
+        self._synced = 0
+
+    @classmethod
+    def acquire(cls, directory):
+        """The lowest-numbered log in directory that no live process holds"""
+        os.makedirs(directory, exist_ok=True)
+        slot = 0
+        while True:
+            try:
+                return cls(os.path.join(directory, f'ingest-{slot}.log'))
+            except OSError:
+                slot += 1
+
+    @classmethod
+    def orphans(cls, directory, owned):
+        """Lock and yield every other log in directory that no live process holds"""
+        for name in sorted(os.listdir(directory)):
+            if name == owned or not (name.startswith('ingest-') and name.endswith('.log')):
+                continue
+            try:
+                yield cls(os.path.join(directory, name))
+            except OSError:
+                continue
+
+    def read(self):
+        """Every complete record in the log; a torn last line from a crash is dropped"""
+        self._handle.seek(0)
+        records = []
+        for line in self._handle:
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                break
+        return records
+
+    def append(self, record):
+        """Write a record without syncing it; returns the position to pass to sync()"""
+        self._handle.write(json.dumps(record, separators=(',', ':')) + '\n')
+        self._handle.flush()
+        self._written += 1
+        return self._written
+
+    def sync(self, position):
+        """Block until the record at position is on disk; waiters behind one fsync share it"""
+        with self._sync_lock:
+            if self._synced >= position:
+                return
+            target = self._written
+            os.fsync(self._handle.fileno())
+            self._synced = target
+
+    def reject(self, record, reason):
+        """Keep a record that can never be committed next to the log for an operator to inspect"""
+        with open(self.path + '.rejected', 'a', encoding='utf-8') as handle:
+            handle.write(json.dumps({'record': record, 'reason': reason}) + '\n')
+
+    def truncate(self):
+        """Empty the log; not synced here, since replay skips committed records and the next sync() covers it"""
+        self._handle.truncate(0)
+        self._handle.flush()
+
+    def close(self):
+        with self._sync_lock:
+            self._handle.close()
+
+class _TransientFailure(Exception):
+    """A commit failed for a reason other than the rows; `remaining` are still uncommitted"""
+
+    def __init__(self, error, remaining):
+        super().__init__(str(error))
+        self.error = error
+        self.remaining = remaining
+
+class ScoreIngestor:
+    """Bounded per-process buffer of validated scores, committed in groups by one flusher thread"""
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._pending = deque()  # (sequence, record, future or None)
+        self._app = None
+        self._thread = None
+        self._log = None
+        self._stopping = False
+        self._sequence = 0
+        self._committed = 0
+
+    def _start(self, app):
+        """Open (and replay) the log and start the flusher; caller holds _cond"""
+        config = app.config
+        self._app = app
+        self._durability = config.get('SCORE_INGEST_DURABILITY', 'flush')
+        if self._durability not in INGEST_DURABILITY:
+            raise ValueError(f"SCORE_INGEST_DURABILITY must be one of {', '.join(INGEST_DURABILITY)}")
+        self._flush_seconds = config.get('SCORE_INGEST_FLUSH_MS', 20) / 1000.0
+        self._batch_size = config.get('SCORE_INGEST_BATCH_SIZE', 200)
+        self._max_pending = config.get('SCORE_INGEST_MAX_PENDING', 5000)
+        self._ack_timeout = config.get('SCORE_INGEST_ACK_TIMEOUT', 10.0)
+        self._stopping = False
+
+        if self._durability == 'log':
+            directory = config.get('SCORE_INGEST_LOG_DIR', 'ingest_log')
+            self._log = IngestLog.acquire(directory)
+            with app.app_context():
+                self._committed = IngestCheckpoint.last_committed(self._log.name)
+                self._replay_orphans(directory)
+            self._sequence = self._committed
+            for record in self._log.read():
+                sequence = record.pop('seq')
+                self._sequence = max(self._sequence, sequence)
+                if sequence > self._committed:
+                    # Acknowledged before a crash but never committed
+                    self._pending.append((sequence, record, None))
+            pending_gauge.set(len(self._pending))
+
+        self._thread = threading.Thread(target=self._run, name='score-ingest-flusher', daemon=True)
+        self._thread.start()
+        atexit.register(self.shutdown)
+
+    def _replay_orphans(self, directory):
+        """Commit what logs left by dead processes still owe, then clear them"""
+        for log in IngestLog.orphans(directory, self._log.name):
+            committed = IngestCheckpoint.last_committed(log.name)
+            entries = []
+            for record in log.read():
+                sequence = record.pop('seq')
+                if sequence > committed:
+                    entries.append((sequence, record, None))
+            try:
+                for start in range(0, len(entries), self._batch_size):
+                    self._flush_until_done(entries[start:start + self._batch_size], log, REPLAY_ATTEMPTS)
+                log.truncate()
+            finally:
+                # Left intact if the database stayed unavailable; the next start replays it again
+                log.close()
+
+    def submit(self, app, record):
+        """
+        Buffer one ingest_record()
+
+        Returns (score dict, committed). With 'flush' durability this waits for the
+        commit and returns the stored score; with 'log' it returns the score as
+        soon as it is on disk in the log, without an id yet.
+        """
+        with self._cond:
+            if self._thread is None:
+                self._start(app)
+            if len(self._pending) >= self._max_pending:
+                rejected_total.inc()
+                raise ScoreIngestBusy('Score ingest buffer is full')
+
+            self._sequence += 1
+            log, future, position = self._log, None, None
+            if log is not None:
+                # Written in sequence order under the lock; the fsync happens outside it
+                position = log.append(dict(record, seq=self._sequence))
+            else:
+                future = Future()
+            self._pending.append((self._sequence, record, future))
+            pending_gauge.inc()
+            self._cond.notify()
+
+        if future is None:
+            log.sync(position)
+            return _score_from_record(record).to_dict(), False
+        try:
+            return future.result(timeout=self._ack_timeout), True
+        except FutureTimeout:
+            raise ScoreIngestTimeout('Score is queued but not yet committed')
+
+    def _take_batch(self):
+        """Block until a group is due; returns [] once stopped and drained"""
+        with self._cond:
+            while not self._pending and not self._stopping:
+                self._cond.wait()
+            deadline = time.monotonic() + self._flush_seconds
+            while len(self._pending) < self._batch_size and not self._stopping:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            count = min(len(self._pending), self._batch_size)
+            return [self._pending.popleft() for _ in range(count)]
+
+    def _run(self):
+        while True:
+            batch = self._take_batch()
+            if not batch:
+                return
+            started = time.perf_counter()
+            try:
+                with self._app.app_context():
+                    self._flush_until_done(batch, self._log)
+            except Exception as e:
+                # Only post-commit work can get here; keep the flusher alive for the next group
+                logger.exception('Score ingest flusher failed after committing a group')
+                for _, _, future in batch:
+                    if future is not None and not future.done():
+                        future.set_exception(e)
+            flush_seconds.observe(time.perf_counter() - started)
+            batch_rows.observe(len(batch))
+            pending_gauge.dec(len(batch))
+            self._after_commit(batch[-1][0])
+
+    def _flush_until_done(self, batch, log, attempts=None):
+        """Flush, retrying what a transient error left uncommitted with exponential backoff"""
+        delay = RETRY_INITIAL_SECONDS
+        attempt = 1
+        while True:
+            try:
+                self._flush(batch, log)
+                return
+            except _TransientFailure as failure:
+                if attempts is not None and attempt >= attempts:
+                    raise failure.error
+                retries_total.inc()
+                logger.warning('Score ingest commit failed (%s); retrying %d scores in %.2fs',
+                               failure.error, len(failure.remaining), delay)
+                batch = failure.remaining
+                time.sleep(delay)
+                delay = min(delay * 2, RETRY_MAX_SECONDS)
+                attempt += 1
+
+    def _flush(self, batch, log):
+        """Commit a group; if a row is at fault, retry row by row so one bad score cannot sink the rest"""
+        try:
+            scores, bests = self._commit(batch, log)
+        except DETERMINISTIC_ERRORS:
+            db.session.rollback()
+            for index, entry in enumerate(batch):
+                try:
+                    committed = self._commit_one(entry, log)
+                except Exception as e:
+                    db.session.rollback()
+                    raise _TransientFailure(e, batch[index:])
+                if committed:
+                    self._publish([entry], *committed)
+            return
+        except Exception as e:
+            db.session.rollback()
+            raise _TransientFailure(e, batch)
+        self._publish(batch, scores, bests)
+
+    def _commit_one(self, entry, log):
+        """(scores, bests) for one committed score, or None if it was set aside; other failures propagate"""
+        sequence, record, future = entry
+        try:
+            return self._commit([entry], log)
+        except DETERMINISTIC_ERRORS as e:
+            db.session.rollback()
+            duplicate = isinstance(e, IntegrityError) and record.get('idempotency_key') is not None
+            if not duplicate:
+                failed_total.inc()
+            if future is not None:
+                future.set_exception(e)
+                return None
+            # Already acknowledged: set it aside (a retried duplicate is simply dropped)
+            # and move the checkpoint past it
+            if not duplicate:
+                log.reject(dict(record, seq=sequence), str(e))
+            IngestCheckpoint.advance(log.name, sequence)
+            db.session.commit()
+            return None
+
+    def _commit(self, batch, log):
+        begin_write()
+        scores = [_score_from_record(record) for _, record, _ in batch]
+        db.session.add_all(scores)
+        db.session.flush()
+
+        # Same rollup order as the batch endpoint: oldest first so ties keep the earliest best
+        ordered = sorted(scores, key=lambda score: (score.created_at, score.id))
+        bests = UserGameBest.record_many(ordered)
+        UserStats.record_many(ordered, {record['game_id']: record['subject_id'] for _, record, _ in batch})
+        for (_, record, _), score in zip(batch, scores):
+            if record.get('idempotency_key') is not None:
+                # A key repeated within the group fails it; the row-by-row retry keeps the first
+                remember(record['user_id'], record['idempotency_key'], record['request_hash'], score.id)
+        if log is not None:
+            IngestCheckpoint.advance(log.name, batch[-1][0])
+        db.session.commit()
+        return scores, bests
+
+    def _publish(self, batch, scores, bests):
+        """Post-commit work: waiting requests first, then the rank index"""
+        for (_, _, future), score in zip(batch, scores):
+            if future is not None:
+                future.set_result(score.to_dict())
+        for best in bests.values():
+            rank_engine.record(best.game_id, best.user_id, best.best_percentage)
+
+    def _after_commit(self, sequence):
+        with self._cond:
+            self._committed = sequence
+            # Everything appended so far is in the database; start the log afresh
+            if self._log is not None and not self._pending and self._sequence == sequence:
+                self._log.truncate()
+
+    def shutdown(self, timeout=30):
+        """Commit whatever is buffered and stop the flusher"""
+        with self._cond:
+            thread, self._stopping = self._thread, True
+            self._cond.notify_all()
+        if thread is not None:
+            thread.join(timeout)
+        with self._cond:
+            if self._log is not None:
+                self._log.close()
+                self._log = None
+            self._thread = None
+
+# Shared ingestor for the application process
+score_ingestor = ScoreIngestor()
\ No newline at end of file
@@ -0,0 +1,4 @@
+from main import create_app
+
+# WSGI entry point for servers that import an application object, e.g. gunicorn wsgi:app
+app = create_app()
\ No newline at end of file
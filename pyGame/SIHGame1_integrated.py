@@ -140,6 +140,9 @@ def run_game():
     # Game loop
     game_running = True
     while game_running:
+        # Deliver finished backend calls (session start, background submissions)
+        integration.poll()
+        
         screen.fill((135, 206, 235))  # Sky blue background
         
         # Draw race track
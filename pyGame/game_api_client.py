@@ -6,29 +6,63 @@ Connects PyGame educational games with the StudyFun Flask backend API
 
 import requests
 import json
+import os
+import threading
 import time
-from typing import Optional, Dict, Any
-from datetime import datetime
+import uuid
+from urllib.parse import quote
+from typing import Optional, Dict, Any, Tuple
+from datetime import datetime, timezone
+from score_journal import ScoreJournal
 
 class GameAPIClient:
     """
     Client to integrate PyGame games with StudyFun backend API
     """
     
-    def __init__(self, base_url: str = "http://localhost:5000"):
+    # Offline journal flushing
+    FLUSH_BATCH_SIZE = 100
+    # Expired session, timeout or rate limit: the score is fine, so journal it and retry later
+    RETRY_STATUSES = (401, 408, 429)
+    FLUSH_INTERVAL = 5.0
+    MAX_FLUSH_BACKOFF = 300.0
+    
+    # Resolved game name -> ID mappings are trusted for this long
+    GAME_ID_TTL = 24 * 60 * 60.0
+    
+    def __init__(self, base_url: str = "http://localhost:5000", journal_path: Optional[str] = None,
+                 request_timeout: float = 5.0, game_cache_path: Optional[str] = None):
         """
         Initialize API client
         
         Args:
             base_url: Backend API base URL
+            journal_path: Optional SQLite file where unsent scores are queued
+            request_timeout: Seconds to wait for any backend request
+            game_cache_path: Optional JSON file that persists resolved game IDs between runs
         """
         self.base_url = base_url
+        self.request_timeout = request_timeout
         self.session = requests.Session()
         self.session.headers.update({'Content-Type': 'application/json'})
         self.access_token = None
         self.user_data = None
         self.current_game_session = None
         
+        # Catalog responses keyed by path: (ETag, parsed JSON) for conditional GETs
+        self._catalog_cache: Dict[str, Tuple[str, Dict[str, Any]]] = {}
+        
+        # Game name (lowercase) -> (game ID, resolved at), optionally mirrored to disk
+        self.game_cache_path = game_cache_path
+        self._game_ids_lock = threading.Lock()
+        self._game_ids: Dict[str, Tuple[int, float]] = self._load_game_ids()
+        
+        # Durable offline queue, drained by a background flusher
+        self.journal = ScoreJournal(journal_path) if journal_path else None
+        self._flush_thread = None
+        self._flush_wakeup = threading.Event()
+        self._flush_stop = threading.Event()
+        
     def authenticate_user(self, username: str, password: str) -> Dict[str, Any]:
         """
         Authenticate user with backend API
@@ -43,7 +77,8 @@ class GameAPIClient:
         try:
             response = self.session.post(
                 f"{self.base_url}/api/auth/login",
-                json={"username": username, "password": password}
+                json={"username": username, "password": password},
+                timeout=self.request_timeout
             )
             
             if response.status_code == 200:
@@ -57,6 +92,10 @@ class GameAPIClient:
                         'Authorization': f'Bearer {self.access_token}'
                     })
                     
+                    # Resume delivering anything this user queued while offline
+                    if self.pending_score_count():
+                        self.start_background_flush()
+                    
                     return {
                         'success': True,
                         'user': self.user_data,
@@ -79,39 +118,105 @@ class GameAPIClient:
                 'message': f'Network error: {str(e)}'
             }
     
+    def get_catalog(self, path: str) -> Optional[Dict[str, Any]]:
+        """
+        GET a catalog endpoint, revalidating a cached copy with If-None-Match
+        
+        Args:
+            path: Endpoint path, e.g. "/api/games/"
+            
+        Returns:
+            Parsed JSON body, or None on failure
+        """
+        cached = self._catalog_cache.get(path)
+        headers = {'If-None-Match': cached[0]} if cached else {}
+        
+        response = self.session.get(f"{self.base_url}{path}", headers=headers, timeout=self.request_timeout)
+        
+        if response.status_code == 304 and cached:
+            return cached[1]
+        
+        if response.status_code == 200:
+            data = response.json()
+            etag = response.headers.get('ETag')
+            if etag:
+                self._catalog_cache[path] = (etag, data)
+            return data
+        
+        return None
+    
     def get_game_info(self, game_name: str) -> Optional[Dict[str, Any]]:
         """
         Get game information from backend
         
         Args:
-            game_name: Name of the game
+            game_name: Name of the game (case-insensitive; a name prefix also matches)
             
         Returns:
             Game data or None if not found
         """
         try:
-            response = self.session.get(f"{self.base_url}/api/games/")
+            data = self.get_catalog(f"/api/games/lookup?name={quote(game_name.strip())}")
             
-            if response.status_code == 200:
-                data = response.json()
-                if data.get('success'):
-                    games = data['data']['games']
-                    
-                    # Find game by name (case-insensitive)
-                    for game in games:
-                        if game['name'].lower() == game_name.lower():
-                            return game
-                    
-                    # If exact match not found, try partial match
-                    for game in games:
-                        if game_name.lower() in game['name'].lower():
-                            return game
+            if data and data.get('success'):
+                return data['data']['game']
             
             return None
             
         except requests.exceptions.RequestException:
             return None
     
+    def resolve_game_id(self, game_name: str) -> Optional[int]:
+        """
+        Resolve a game name to its backend ID, answering from the local cache when possible
+        
+        Args:
+            game_name: Name of the game
+            
+        Returns:
+            Game ID or None if the backend has no such game
+        """
+        key = game_name.strip().lower()
+        with self._game_ids_lock:
+            cached = self._game_ids.get(key)
+        if cached and time.time() - cached[1] < self.GAME_ID_TTL:
+            return cached[0]
+        
+        game = self.get_game_info(game_name)
+        if not game:
+            # Offline or unknown: a stale mapping still beats no mapping
+            return cached[0] if cached else None
+        
+        with self._game_ids_lock:
+            self._game_ids[key] = (game['id'], time.time())
+            self._save_game_ids()
+        return game['id']
+    
+    def _load_game_ids(self) -> Dict[str, Tuple[int, float]]:
+        """Read persisted game ID mappings, ignoring a missing or corrupt file"""
+        if not self.game_cache_path:
+            return {}
+        try:
+            with open(self.game_cache_path, 'r', encoding='utf-8') as f:
+                stored = json.load(f)
+            return {name: (int(entry['id']), float(entry['resolved_at'])) for name, entry in stored.items()}
+        except (OSError, ValueError, KeyError, TypeError, AttributeError):
+            return {}
+    
+    def _save_game_ids(self) -> None:
+        """Atomically rewrite the game ID cache file (caller holds _game_ids_lock)"""
+        if not self.game_cache_path:
+            return
+        stored = {name: {'id': game_id, 'resolved_at': resolved_at}
+                  for name, (game_id, resolved_at) in self._game_ids.items()}
+        tmp_path = f"{self.game_cache_path}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(stored, f)
+            os.replace(tmp_path, self.game_cache_path)
+        except OSError:
+            pass
+    
     def start_game_session(self, game_id: int) -> Dict[str, Any]:
         """
         Start a new game session
@@ -123,7 +228,7 @@ class GameAPIClient:
             Session start response
         """
         try:
-            response = self.session.post(f"{self.base_url}/api/games/start/{game_id}")
+            response = self.session.post(f"{self.base_url}/api/games/start/{game_id}", timeout=self.request_timeout)
             
             if response.status_code == 200:
                 data = response.json()
@@ -143,7 +248,7 @@ class GameAPIClient:
             return {'success': False, 'message': f'Network error: {str(e)}'}
     
     def submit_game_score(self, game_id: int, score: int, max_score: int = 100, 
-                         time_taken: Optional[int] = None) -> Dict[str, Any]:
+                         time_taken: Optional[int] = None, defer: bool = False) -> Dict[str, Any]:
         """
         Submit game score to backend
         
@@ -152,9 +257,11 @@ class GameAPIClient:
             score: Player's score
             max_score: Maximum possible score for the game
             time_taken: Time taken in seconds (optional)
+            defer: Queue the score in the journal without contacting the backend
             
         Returns:
-            Score submission response
+            Score submission response ('queued' is True when the score was journaled for retry,
+            'rejected' is True when the backend refused it and it went to the dead-letter table)
         """
         if not self.access_token:
             return {'success': False, 'message': 'User not authenticated'}
@@ -163,19 +270,31 @@ class GameAPIClient:
         if time_taken is None and self.current_game_session:
             time_taken = int(time.time() - self.current_game_session['start_time'])
         
+        payload = {
+            'game_id': game_id,
+            'score': score,
+            'max_score': max_score,
+            'time_taken': time_taken,
+            'is_completed': True,
+            'played_at': datetime.now(timezone.utc).isoformat(),
+            # Travels with the score into the journal, so the server stores it once however often it is resent
+            'idempotency_key': str(uuid.uuid4())
+        }
+        
+        if defer and self.journal:
+            self.current_game_session = None
+            return self._queue_score(payload)
+        
         try:
             response = self.session.post(
                 f"{self.base_url}/api/scores/",
-                json={
-                    'game_id': game_id,
-                    'score': score,
-                    'max_score': max_score,
-                    'time_taken': time_taken,
-                    'is_completed': True
-                }
+                json=payload,
+                headers={'Idempotency-Key': payload['idempotency_key']},
+                timeout=self.request_timeout
             )
             
-            if response.status_code == 201:
+            # 202: accepted by a server that group-commits scores; it is stored shortly
+            if response.status_code in (201, 202):
                 data = response.json()
                 if data.get('success'):
                     # Clear current session after successful score submission
@@ -187,12 +306,163 @@ class GameAPIClient:
                     }
                 else:
                     return {'success': False, 'message': data.get('message', 'Score submission failed')}
+            elif self.journal and (response.status_code >= 500 or response.status_code in self.RETRY_STATUSES):
+                self.current_game_session = None
+                return self._queue_score(payload)
+            elif self.journal and response.status_code >= 400:
+                # Refused outright: keep it in the dead-letter table rather than losing it
+                self.current_game_session = None
+                return self._reject_score(payload, response)
             else:
                 return {'success': False, 'message': f'HTTP {response.status_code}: Score submission failed'}
                 
         except requests.exceptions.RequestException as e:
+            if self.journal:
+                self.current_game_session = None
+                return self._queue_score(payload)
             return {'success': False, 'message': f'Network error: {str(e)}'}
     
+    def _queue_score(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Journal a score for later delivery and make sure the flusher is running
+        """
+        user_id = self.user_data['id'] if self.user_data else None
+        entry_id = self.journal.enqueue(payload, user_id)
+        self.start_background_flush()
+        self._flush_wakeup.set()
+        return {
+            'success': True,
+            'queued': True,
+            'journal_id': entry_id,
+            'message': 'Score saved offline - it will be submitted when the backend is reachable'
+        }
+    
+    def _reject_score(self, payload: Dict[str, Any], response: requests.Response) -> Dict[str, Any]:
+        """
+        Record a score the backend refused in the journal's dead-letter table
+        """
+        try:
+            reason = response.json().get('message')
+        except ValueError:
+            reason = None
+        reason = reason or f"HTTP {response.status_code}"
+        user_id = self.user_data['id'] if self.user_data else None
+        entry_id = self.journal.enqueue(payload, user_id)
+        self.journal.reject({entry_id: reason})
+        return {
+            'success': False,
+            'rejected': True,
+            'journal_id': entry_id,
+            'message': f'Score refused by the backend: {reason}'
+        }
+    
+    def pending_score_count(self) -> int:
+        """
+        Number of journaled scores waiting for the current user
+        """
+        if not self.journal:
+            return 0
+        return self.journal.count(self.user_data['id'] if self.user_data else None)
+    
+    def flush_journal(self) -> Dict[str, Any]:
+        """
+        Deliver queued scores for the current user through /api/scores/batch
+        
+        Returns:
+            Dict with 'success', 'sent', 'dropped' and 'remaining' counts. Dropped scores were
+            refused by the backend; they stay in the journal's dead-letter table (journal.rejected())
+        """
+        if not self.journal or not self.access_token or not self.user_data:
+            return {'success': False, 'sent': 0, 'dropped': 0, 'remaining': self.pending_score_count()}
+        
+        # The flusher has its own HTTP session; requests.Session is not thread-safe
+        session = requests.Session()
+        session.headers.update(self.session.headers)
+        
+        sent = dropped = 0
+        try:
+            while True:
+                entries = self.journal.pending(self.user_data['id'], self.FLUSH_BATCH_SIZE)
+                if not entries:
+                    break
+                
+                response = session.post(
+                    f"{self.base_url}/api/scores/batch",
+                    json={'scores': [entry['payload'] for entry in entries]},
+                    timeout=self.request_timeout
+                )
+                
+                if response.status_code >= 500 or response.status_code in self.RETRY_STATUSES + (404, 422):
+                    # Server trouble or an expired session: keep everything for the next round
+                    self.journal.mark_attempted([entry['id'] for entry in entries])
+                    return {'success': False, 'sent': sent, 'dropped': dropped,
+                            'remaining': self.pending_score_count()}
+                
+                body = response.json()
+                results = body.get('data', {}).get('results', [])
+                if not results:
+                    # Whole batch refused (e.g. malformed); set it aside rather than retrying forever
+                    reason = body.get('message') or f"HTTP {response.status_code}"
+                    self.journal.reject({entry['id']: reason for entry in entries})
+                    dropped += len(entries)
+                    continue
+                
+                # Accepted items are done; refused ones are kept in the dead-letter table, not deleted
+                accepted = [entries[result['index']]['id'] for result in results if result.get('success')]
+                refused = {entries[result['index']]['id']: result.get('message') or 'rejected'
+                           for result in results if not result.get('success')}
+                self.journal.remove(accepted)
+                self.journal.reject(refused)
+                sent += len(accepted)
+                dropped += len(refused)
+        except (requests.exceptions.RequestException, ValueError):
+            return {'success': False, 'sent': sent, 'dropped': dropped, 'remaining': self.pending_score_count()}
+        finally:
+            session.close()
+        
+        return {'success': True, 'sent': sent, 'dropped': dropped, 'remaining': 0}
+    
+    def start_background_flush(self) -> None:
+        """
+        Start the daemon thread that drains the journal once the backend is reachable
+        """
+        if not self.journal or (self._flush_thread and self._flush_thread.is_alive()):
+            return
+        
+        self._flush_stop.clear()
+        self._flush_thread = threading.Thread(target=self._flush_loop, name="score-journal-flusher", daemon=True)
+        self._flush_thread.start()
+    
+    def stop_background_flush(self, timeout: Optional[float] = None) -> None:
+        """
+        Stop the background flusher thread
+        """
+        self._flush_stop.set()
+        self._flush_wakeup.set()
+        if self._flush_thread:
+            self._flush_thread.join(timeout)
+            self._flush_thread = None
+    
+    def _flush_loop(self) -> None:
+        """
+        Flusher thread body: retry with exponential backoff while the backend is down
+        """
+        delay = self.FLUSH_INTERVAL
+        while not self._flush_stop.is_set():
+            self._flush_wakeup.wait(delay)
+            self._flush_wakeup.clear()
+            if self._flush_stop.is_set():
+                break
+            
+            if not self.pending_score_count():
+                delay = self.FLUSH_INTERVAL
+                continue
+            
+            if self.check_backend_connection() and self.flush_journal()['success']:
+                delay = self.FLUSH_INTERVAL
+            else:
+                delay = min(delay * 2, self.MAX_FLUSH_BACKOFF)
+    
     def get_user_progress(self) -> Dict[str, Any]:
         """
         Get current user's game progress
@@ -204,7 +474,7 @@ class GameAPIClient:
             return {'success': False, 'message': 'User not authenticated'}
         
         try:
-            response = self.session.get(f"{self.base_url}/api/games/my-progress")
+            response = self.session.get(f"{self.base_url}/api/games/my-progress", timeout=self.request_timeout)
             
             if response.status_code == 200:
                 data = response.json()
@@ -222,23 +492,28 @@ class GameAPIClient:
         except requests.exceptions.RequestException as e:
             return {'success': False, 'message': f'Network error: {str(e)}'}
     
-    def get_leaderboard(self, game_id: Optional[int] = None, limit: int = 10) -> Dict[str, Any]:
+    def get_leaderboard(self, game_id: Optional[int] = None, limit: int = 10,
+                        cursor: Optional[str] = None) -> Dict[str, Any]:
         """
         Get leaderboard for a specific game or overall
         
         Args:
             game_id: Specific game ID (None for overall leaderboard)
-            limit: Number of top players to retrieve
+            limit: Number of players per page (the server caps it)
+            cursor: next_cursor from the previous page, to continue down the leaderboard
             
         Returns:
-            Leaderboard data
+            Leaderboard data, with next_cursor (None on the last page)
         """
         try:
             params = {'limit': limit}
             if game_id:
                 params['game_id'] = game_id
+            if cursor:
+                params['cursor'] = cursor
             
-            response = self.session.get(f"{self.base_url}/api/scores/leaderboard", params=params)
+            response = self.session.get(f"{self.base_url}/api/scores/leaderboard", params=params,
+                                        timeout=self.request_timeout)
             
             if response.status_code == 200:
                 data = response.json()
@@ -246,6 +521,7 @@ class GameAPIClient:
                     return {
                         'success': True,
                         'leaderboard': data['data']['leaderboard'],
+                        'next_cursor': data['data'].get('next_cursor'),
                         'message': 'Leaderboard loaded successfully'
                     }
                 else:
@@ -264,7 +540,7 @@ class GameAPIClient:
             True if backend is accessible, False otherwise
         """
         try:
-            response = self.session.get(f"{self.base_url}/api/health", timeout=5)
+            response = requests.get(f"{self.base_url}/api/health", timeout=self.request_timeout)
             return response.status_code == 200
         except requests.exceptions.RequestException:
             return False
@@ -276,15 +552,21 @@ class GameAPIClient:
         self.access_token = None
         self.user_data = None
         self.current_game_session = None
+        self.stop_background_flush(timeout=self.request_timeout)
         if 'Authorization' in self.session.headers:
             del self.session.headers['Authorization']
 
 # Game integration helper functions
-def create_game_client() -> GameAPIClient:
+def create_game_client(journal_path: Optional[str] = None,
+                       game_cache_path: Optional[str] = None) -> GameAPIClient:
     """
     Create and return a new GameAPIClient instance
+    
+    Args:
+        journal_path: Optional SQLite file for queuing scores while offline
+        game_cache_path: Optional JSON file for remembering resolved game IDs
     """
-    return GameAPIClient()
+    return GameAPIClient(journal_path=journal_path, game_cache_path=game_cache_path)
 
 def get_or_create_math_game(client: GameAPIClient, game_name: str) -> Optional[int]:
     """
@@ -309,17 +591,18 @@ def get_or_create_math_game(client: GameAPIClient, game_name: str) -> Optional[i
     }
     
     backend_game_name = game_mapping.get(game_name, game_name)
-    game_info = client.get_game_info(backend_game_name)
+    game_id = client.resolve_game_id(backend_game_name)
     
-    if game_info:
-        return game_info['id']
+    if game_id:
+        return game_id
     else:
         # If game not found, try to use the first math game as default
-        math_games_response = client.session.get(f"{client.base_url}/api/games/math-games")
-        if math_games_response.status_code == 200:
-            data = math_games_response.json()
-            if data.get('success') and data['data']['games']:
-                return data['data']['games'][0]['id']
+        try:
+            data = client.get_catalog("/api/games/math-games")
+        except requests.exceptions.RequestException:
+            data = None
+        if data and data.get('success') and data['data']['games']:
+            return data['data']['games'][0]['id']
     
     return None
 
@@ -4,40 +4,91 @@ StudyFun PyGame Integration Helper
 Easy-to-use wrapper for integrating PyGame games with the backend API
 """
 
+import math
 import pygame
-import sys
-from typing import Optional, Tuple, Dict, Any
-from game_api_client import GameAPIClient, create_game_client, get_or_create_math_game
+from concurrent.futures import Future
+from typing import Optional, Tuple, Dict, Any, Callable
+from game_api_client import GameAPIClient, get_or_create_math_game
+from network_worker import BackendWorker
 
 class StudyFunGameIntegration:
     """
     Easy integration wrapper for PyGame games with StudyFun backend
     """
     
-    def __init__(self, game_name: str, backend_url: str = "http://localhost:5000"):
+    def __init__(self, game_name: str, backend_url: str = "http://localhost:5000",
+                 game_cache_path: Optional[str] = None, journal_path: Optional[str] = "studyfun_scores.db"):
         """
         Initialize game integration
         
         Args:
             game_name: Name of your PyGame (e.g., "SIHGame1", "fraction_race")
             backend_url: Backend API URL
+            game_cache_path: Optional JSON file so later launches resolve the game ID without a request
+            journal_path: SQLite file where scores wait while the backend is unreachable (None disables it)
         """
         self.game_name = game_name
-        self.client = GameAPIClient(backend_url)
+        self.client = GameAPIClient(backend_url, journal_path=journal_path, game_cache_path=game_cache_path)
         self.game_id = None
         self.is_connected = False
+        self.connection_checked = False
         self.current_user = None
         self.game_started = False
         
+        # All backend calls run here so the pygame loop never blocks on HTTP
+        self.worker = BackendWorker()
+        
         # Try to connect to backend
         self._initialize_connection()
     
     def _initialize_connection(self):
-        """Initialize backend connection"""
-        self.is_connected = self.client.check_backend_connection()
+        """Start checking the backend connection in the background"""
+        self.worker.submit(self.client.check_backend_connection, callback=self._on_connection_checked)
+    
+    def _on_connection_checked(self, result):
+        self.is_connected = result is True
+        self.connection_checked = True
         if not self.is_connected:
             print(f"⚠️  Backend not accessible - {self.game_name} will run in offline mode")
     
+    def _login_job(self, username: str, password: str) -> Dict[str, Any]:
+        """Worker-thread half of the login: authenticate, then resolve this game's ID"""
+        auth_result = self.client.authenticate_user(username, password)
+        game_id = None
+        if auth_result['success']:
+            game_id = get_or_create_math_game(self.client, self.game_name)
+        return {'auth': auth_result, 'game_id': game_id}
+    
+    def poll(self) -> int:
+        """
+        Deliver finished backend calls; call once per frame from your game loop
+        
+        Returns:
+            Number of results delivered
+        """
+        return self.worker.poll()
+    
+    @staticmethod
+    def draw_spinner(screen, center: Tuple[int, int], color=(70, 130, 180), radius: int = 14):
+        """
+        Draw a rotating loading indicator (animated from the pygame clock)
+        
+        Args:
+            screen: Pygame screen surface
+            center: Spinner center position
+            color: Dot color
+            radius: Spinner radius in pixels
+        """
+        dots = 8
+        step = (pygame.time.get_ticks() // 100) % dots
+        for i in range(dots):
+            angle = 2 * math.pi * i / dots
+            fade = ((i - step) % dots + 1) / dots
+            dot_color = tuple(int(255 - (255 - c) * fade) for c in color)
+            x = center[0] + int(radius * math.cos(angle))
+            y = center[1] + int(radius * math.sin(angle))
+            pygame.draw.circle(screen, dot_color, (x, y), 3)
+    
     def show_login_screen(self, screen, font) -> bool:
         """
         Display login screen and handle user authentication
@@ -49,9 +100,6 @@ class StudyFunGameIntegration:
         Returns:
             True if login successful, False otherwise
         """
-        if not self.is_connected:
-            return False
-        
         # Colors
         WHITE = (255, 255, 255)
         BLACK = (0, 0, 0)
@@ -66,9 +114,45 @@ class StudyFunGameIntegration:
         message = "Enter your StudyFun credentials"
         message_color = BLACK
         
+        # Filled in by worker callbacks delivered through poll()
+        login = {'pending': False, 'result': None}
+        start_at = None  # tick at which to leave the screen after a successful login
+        
+        def on_login(result):
+            login['pending'] = False
+            login['result'] = result
+        
         clock = pygame.time.Clock()
         
         while True:
+            self.poll()
+            
+            if self.connection_checked and not self.is_connected:
+                return False
+            
+            if start_at is not None and pygame.time.get_ticks() >= start_at:
+                return True
+            
+            if login['result'] is not None:
+                result = login['result']
+                login['result'] = None
+                auth_result = result.get('auth', result)
+                if auth_result['success']:
+                    self.current_user = auth_result['user']
+                    self.game_id = result.get('game_id')
+                    if self.game_id:
+                        message = f"Welcome {self.current_user['username']}! Starting game..."
+                        message_color = GREEN
+                        start_at = pygame.time.get_ticks() + 1500
+                    else:
+                        message = "Game not found in backend"
+                        message_color = RED
+                else:
+                    message = auth_result['message']
+                    message_color = RED
+            
+            busy = not self.connection_checked or login['pending'] or start_at is not None
+            
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
                     return False
@@ -77,31 +161,17 @@ class StudyFunGameIntegration:
                     if event.key == pygame.K_ESCAPE:
                         return False
                     
+                    elif busy:
+                        # Ignore typing while a backend call is in flight
+                        continue
+                    
                     elif event.key == pygame.K_RETURN:
                         if username and password:
-                            # Attempt login
+                            # Attempt login in the background
                             message = "Authenticating..."
                             message_color = BLUE
-                            pygame.display.flip()
-                            
-                            auth_result = self.client.authenticate_user(username, password)
-                            if auth_result['success']:
-                                self.current_user = auth_result['user']
-                                
-                                # Get game ID
-                                self.game_id = get_or_create_math_game(self.client, self.game_name)
-                                if self.game_id:
-                                    message = f"Welcome {self.current_user['username']}! Starting game..."
-                                    message_color = GREEN
-                                    pygame.display.flip()
-                                    pygame.time.wait(1500)
-                                    return True
-                                else:
-                                    message = "Game not found in backend"
-                                    message_color = RED
-                            else:
-                                message = auth_result['message']
-                                message_color = RED
+                            login['pending'] = True
+                            self.worker.submit(self._login_job, username, password, callback=on_login)
                         else:
                             message = "Please enter both username and password"
                             message_color = RED
@@ -176,9 +246,15 @@ class StudyFunGameIntegration:
             screen.blit(password_surface, (password_rect.x + 10, password_rect.y + 5))
             
             # Message
-            message_surface = font.render(message, True, message_color)
+            if not self.connection_checked:
+                message_surface = font.render("Connecting to StudyFun...", True, BLUE)
+            else:
+                message_surface = font.render(message, True, message_color)
             screen.blit(message_surface, (screen.get_width()//2 - message_surface.get_width()//2, 480))
             
+            if not self.connection_checked or login['pending']:
+                self.draw_spinner(screen, (screen.get_width()//2 + message_surface.get_width()//2 + 25, 492))
+            
             # Buttons
             login_button = pygame.Rect(250, 520, 100, 40)
             skip_button = pygame.Rect(450, 520, 100, 40)
@@ -195,23 +271,32 @@ class StudyFunGameIntegration:
             pygame.display.flip()
             clock.tick(60)
     
-    def start_game_session(self) -> bool:
+    def start_game_session(self, callback: Optional[Callable[[Dict[str, Any]], None]] = None) -> bool:
         """
-        Start a new game session with the backend
+        Start a new game session with the backend (in the background)
         
+        Args:
+            callback: Optional function called from poll() with the session start result
+            
         Returns:
-            True if session started successfully
+            True once the session request is queued, not when the session has started.
+            game_started (and the callback) report the outcome after poll() delivers it.
+            False if there is no connection, user or game ID to start a session with.
         """
         if not self.is_connected or not self.current_user or not self.game_id:
             return False
         
-        result = self.client.start_game_session(self.game_id)
-        self.game_started = result['success']
-        return self.game_started
+        def on_started(result):
+            self.game_started = result['success']
+            if callback:
+                callback(result)
+        
+        self.worker.submit(self.client.start_game_session, self.game_id, callback=on_started)
+        return True
     
     def submit_score(self, score: int, max_score: int = 100, time_taken: Optional[int] = None) -> Dict[str, Any]:
         """
-        Submit game score to backend
+        Submit game score to backend (blocks until the request finishes; see submit_score_async)
         
         Args:
             score: Player's final score
@@ -226,6 +311,28 @@ class StudyFunGameIntegration:
         
         return self.client.submit_game_score(self.game_id, score, max_score, time_taken)
     
+    def submit_score_async(self, score: int, max_score: int = 100, time_taken: Optional[int] = None,
+                           callback: Optional[Callable[[Dict[str, Any]], None]] = None) -> Optional[Future]:
+        """
+        Submit game score to backend (in the background)
+        
+        Args:
+            score: Player's final score
+            max_score: Maximum possible score
+            time_taken: Time taken in seconds (optional)
+            callback: Optional function called from poll() with the submission result dictionary
+            
+        Returns:
+            Future resolving to the submission result, or None if not connected
+        """
+        if not self.is_connected or not self.current_user or not self.game_id:
+            if callback:
+                callback({'success': False, 'message': 'Not connected to backend'})
+            return None
+        
+        return self.worker.submit(self.client.submit_game_score, self.game_id, score, max_score, time_taken,
+                                  callback=callback)
+    
     def show_game_over_screen(self, screen, font, score: int, max_score: int = 100, 
                             time_taken: Optional[int] = None) -> bool:
         """
@@ -241,13 +348,16 @@ class StudyFunGameIntegration:
         Returns:
             True to restart game, False to quit
         """
-        # Submit score if connected
-        score_submitted = False
-        score_result = None
+        # Submit score in the background if connected
+        submission = {'pending': False, 'result': None}
+        
+        def on_submitted(result):
+            submission['pending'] = False
+            submission['result'] = result
         
         if self.is_connected and self.current_user:
-            score_result = self.submit_score(score, max_score, time_taken)
-            score_submitted = score_result['success']
+            submission['pending'] = True
+            self.submit_score_async(score, max_score, time_taken, callback=on_submitted)
         
         # Colors
         WHITE = (255, 255, 255)
@@ -260,6 +370,10 @@ class StudyFunGameIntegration:
         clock = pygame.time.Clock()
         
         while True:
+            self.poll()
+            score_result = submission['result']
+            score_submitted = bool(score_result and score_result['success'])
+            
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
                     return False
@@ -292,7 +406,14 @@ class StudyFunGameIntegration:
             # Score submission status
             y_offset = 320
             if self.is_connected and self.current_user:
-                if score_submitted:
+                if submission['pending']:
+                    pending_text = font.render("Submitting score...", True, BLUE)
+                    screen.blit(pending_text, (screen.get_width()//2 - pending_text.get_width()//2, y_offset))
+                    self.draw_spinner(screen, (screen.get_width()//2 + pending_text.get_width()//2 + 25, y_offset + 12))
+                elif score_submitted and score_result.get('queued'):
+                    queued_text = font.render("Score saved - it will sync when the backend is back", True, BLUE)
+                    screen.blit(queued_text, (screen.get_width()//2 - queued_text.get_width()//2, y_offset))
+                elif score_submitted:
                     success_text = font.render("✅ Score submitted successfully!", True, GREEN)
                     screen.blit(success_text, (screen.get_width()//2 - success_text.get_width()//2, y_offset))
                     
@@ -330,6 +451,12 @@ class StudyFunGameIntegration:
         """
         return self.current_user
     
+    def close(self) -> None:
+        """
+        Stop the background network worker (queued calls still finish)
+        """
+        self.worker.shutdown(wait=False)
+    
     def is_online(self) -> bool:
         """
         Check if connected to backend
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Background network worker for PyGame games
+Runs blocking backend calls off the game loop and hands the results back through a queue
+"""
+
+import queue
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+class BackendWorker:
+    """
+    Executes backend calls on a worker thread; the game loop collects results with poll()
+    """
+
+    def __init__(self, max_workers: int = 1):
+        """
+        Initialize the worker
+
+        Args:
+            max_workers: Number of worker threads. Keep 1 when the calls share a requests.Session
+        """
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="studyfun-net")
+        self._completed: "queue.Queue" = queue.Queue()
+        self._lock = threading.Lock()
+        self._in_flight = 0
+
+    def submit(self, fn: Callable[..., Any], *args, callback: Optional[Callable[[Any], None]] = None,
+               **kwargs) -> Future:
+        """
+        Run fn(*args, **kwargs) in the background
+
+        Args:
+            fn: Blocking function to run (e.g. a GameAPIClient method)
+            callback: Called from poll() on the game loop thread with the result. If fn raised,
+                it receives {'success': False, 'message': ...} instead
+
+        Returns:
+            Future for the call
+        """
+        with self._lock:
+            self._in_flight += 1
+        future = self._executor.submit(fn, *args, **kwargs)
+        future.add_done_callback(lambda done: self._completed.put((done, callback)))
+        return future
+
+    def poll(self) -> int:
+        """
+        Deliver finished calls to their callbacks; call once per frame from the game loop
+
+        Returns:
+            Number of results delivered
+        """
+        delivered = 0
+        while True:
+            try:
+                future, callback = self._completed.get_nowait()
+            except queue.Empty:
+                return delivered
+
+            with self._lock:
+                self._in_flight -= 1
+            delivered += 1
+
+            if callback is None:
+                continue
+
+            error = future.exception()
+            if error is not None:
+                callback({'success': False, 'message': f'Error: {str(error)}'})
+            else:
+                callback(future.result())
+
+    @property
+    def busy(self) -> bool:
+        """
+        True while any call is queued, running or waiting to be polled
+        """
+        with self._lock:
+            return self._in_flight > 0
+
+    def shutdown(self, wait: bool = False) -> None:
+        """
+        Stop accepting work
+
+        Args:
+            wait: Block until queued calls have finished
+        """
+        self._executor.shutdown(wait=wait)
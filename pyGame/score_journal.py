@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Durable score journal for the PyGame-Backend integration
+Keeps score submissions on disk (SQLite) until the backend has accepted them.
+Scores the backend refuses are moved to a dead-letter table, never deleted.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Optional, Dict, Any, List
+
+class ScoreJournal:
+    """
+    Append-only queue of pending score submissions stored in a local SQLite file
+    """
+
+    def __init__(self, path: str):
+        """
+        Open (or create) the journal
+
+        Args:
+            path: File path of the SQLite journal
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=FULL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS pending_scores ("
+            " id TEXT PRIMARY KEY,"
+            " user_id INTEGER,"
+            " payload TEXT NOT NULL,"
+            " queued_at REAL NOT NULL,"
+            " attempts INTEGER NOT NULL DEFAULT 0)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS rejected_scores ("
+            " id TEXT PRIMARY KEY,"
+            " user_id INTEGER,"
+            " payload TEXT NOT NULL,"
+            " queued_at REAL NOT NULL,"
+            " rejected_at REAL NOT NULL,"
+            " reason TEXT)"
+        )
+
+    def enqueue(self, payload: Dict[str, Any], user_id: Optional[int] = None) -> str:
+        """
+        Durably queue a score payload
+
+        Args:
+            payload: JSON body for one score (as sent to /api/scores/)
+            user_id: Backend user the score belongs to
+
+        Returns:
+            Journal entry ID
+        """
+        entry_id = uuid.uuid4().hex
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO pending_scores (id, user_id, payload, queued_at) VALUES (?, ?, ?, ?)",
+                (entry_id, user_id, json.dumps(payload), time.time())
+            )
+        return entry_id
+
+    def pending(self, user_id: Optional[int] = None, limit: int = 100) -> List[Dict[str, Any]]:
+        """
+        Oldest pending entries first
+
+        Args:
+            user_id: Only return entries for this user (None for all users)
+            limit: Maximum number of entries
+
+        Returns:
+            List of entries with 'id', 'user_id', 'payload' and 'attempts'
+        """
+        query = "SELECT id, user_id, payload, attempts FROM pending_scores"
+        params: tuple = ()
+        if user_id is not None:
+            query += " WHERE user_id = ?"
+            params = (user_id,)
+        query += " ORDER BY queued_at LIMIT ?"
+
+        with self._lock:
+            rows = self._conn.execute(query, params + (limit,)).fetchall()
+
+        return [
+            {'id': row[0], 'user_id': row[1], 'payload': json.loads(row[2]), 'attempts': row[3]}
+            for row in rows
+        ]
+
+    def remove(self, entry_ids: List[str]) -> None:
+        """
+        Drop entries the backend has accepted
+        """
+        if not entry_ids:
+            return
+        with self._lock:
+            self._conn.executemany("DELETE FROM pending_scores WHERE id = ?", [(i,) for i in entry_ids])
+
+    def reject(self, reasons: Dict[str, str]) -> None:
+        """
+        Move entries the backend refused to the dead-letter table
+
+        Args:
+            reasons: Reason given by the backend, keyed by journal entry ID
+        """
+        if not reasons:
+            return
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO rejected_scores (id, user_id, payload, queued_at, rejected_at, reason)"
+                    " SELECT id, user_id, payload, queued_at, ?, ? FROM pending_scores WHERE id = ?",
+                    [(now, reason, entry_id) for entry_id, reason in reasons.items()]
+                )
+                self._conn.executemany("DELETE FROM pending_scores WHERE id = ?", [(i,) for i in reasons])
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def rejected(self, user_id: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Entries the backend refused, oldest first
+
+        Args:
+            user_id: Only return entries for this user (None for all users)
+
+        Returns:
+            List of entries with 'id', 'user_id', 'payload', 'rejected_at' and 'reason'
+        """
+        query = "SELECT id, user_id, payload, rejected_at, reason FROM rejected_scores"
+        params: tuple = ()
+        if user_id is not None:
+            query += " WHERE user_id = ?"
+            params = (user_id,)
+        query += " ORDER BY queued_at"
+
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+
+        return [
+            {'id': row[0], 'user_id': row[1], 'payload': json.loads(row[2]), 'rejected_at': row[3], 'reason': row[4]}
+            for row in rows
+        ]
+
+    def requeue_rejected(self, entry_ids: List[str]) -> None:
+        """
+        Move dead-lettered entries back to the pending queue (e.g. after fixing the cause)
+        """
+        if not entry_ids:
+            return
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO pending_scores (id, user_id, payload, queued_at)"
+                    " SELECT id, user_id, payload, queued_at FROM rejected_scores WHERE id = ?",
+                    [(i,) for i in entry_ids]
+                )
+                self._conn.executemany("DELETE FROM rejected_scores WHERE id = ?", [(i,) for i in entry_ids])
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def mark_attempted(self, entry_ids: List[str]) -> None:
+        """
+        Record a failed delivery attempt for entries
+        """
+        if not entry_ids:
+            return
+        with self._lock:
+            self._conn.executemany(
+                "UPDATE pending_scores SET attempts = attempts + 1 WHERE id = ?",
+                [(i,) for i in entry_ids]
+            )
+
+    def count(self, user_id: Optional[int] = None) -> int:
+        """
+        Number of pending entries
+        """
+        with self._lock:
+            if user_id is None:
+                return self._conn.execute("SELECT COUNT(*) FROM pending_scores").fetchone()[0]
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM pending_scores WHERE user_id = ?", (user_id,)
+            ).fetchone()[0]
+
+    def close(self) -> None:
+        """
+        Close the underlying database connection
+        """
+        with self._lock:
+            self._conn.close()